@@ -0,0 +1,178 @@
+"""
+Throughput benchmark of BreachChecker against the local mock breach API.
+
+Every scenario (input size x concurrency) runs in its own process so peak
+RSS is measured per scenario. Results are written as a JSON list, one
+record per scenario, so runs can be compared to spot regressions:
+
+    python benchmarks/throughput.py --sizes 1000,100000 --concurrency 10,100,500 -o bench.json
+"""
+import logging
+import sys
+from argparse import ArgumentParser
+from array import array
+from asyncio import all_tasks, create_task, run, sleep
+from datetime import datetime, timezone
+from json import dumps as json_dumps, loads as json_loads
+from platform import python_version
+from resource import RUSAGE_SELF, getrusage
+from socket import create_connection, socket
+from subprocess import DEVNULL, PIPE, Popen, run as run_process
+from time import perf_counter, sleep as blocking_sleep
+
+from breach_check.breach import BreachChecker
+from breach_check.logger import logger
+from breach_check.mock_server import MockBreachServer
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+async def run_scenario(base_url: str, size: int, concurrency: int, backends: list[str]) -> dict:
+    latencies = array('d')
+
+    class TimedBreachChecker(BreachChecker):
+        async def check(self, email=None, backend=None):
+            start = perf_counter()
+            try:
+                return await super().check(email, backend=backend)
+            finally:
+                latencies.append(perf_counter() - start)
+
+    breach_checker = TimedBreachChecker(
+        backend=backends,
+        rate_limit=10 ** 9,
+        ssl=False,
+        concurrency=concurrency,
+        api_urls=MockBreachServer.api_urls(base_url),
+        show_progress=False,
+    )
+
+    peak_tasks = 0
+
+    async def sample_tasks():
+        nonlocal peak_tasks
+        while True:
+            peak_tasks = max(peak_tasks, len(all_tasks()))
+            await sleep(0.05)
+
+    sampler = create_task(sample_tasks())
+    results = 0
+    start = perf_counter()
+    async for _ in breach_checker.iter_check(f'user{i}@example.com' for i in range(size)):
+        results += 1
+    elapsed = perf_counter() - start
+    sampler.cancel()
+
+    # ru_maxrss is reported in KiB on Linux
+    peak_rss_mib = getrusage(RUSAGE_SELF).ru_maxrss / 1024
+    sorted_latencies = sorted(latencies)
+
+    return {
+        'size': size,
+        'concurrency': concurrency,
+        'backends': backends,
+        'results': results,
+        'elapsed_s': round(elapsed, 3),
+        'emails_per_s': round(results / elapsed, 1) if elapsed else 0,
+        'latency_p50_ms': round(percentile(sorted_latencies, 0.50) * 1000, 3),
+        'latency_p99_ms': round(percentile(sorted_latencies, 0.99) * 1000, 3),
+        'peak_rss_mib': round(peak_rss_mib, 1),
+        'peak_tasks': peak_tasks,
+    }
+
+
+def free_port() -> int:
+    with socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_mock_server(args) -> tuple[Popen, str]:
+    port = free_port()
+    server = Popen(
+        [
+            sys.executable, '-m', 'breach_check.mock_server',
+            '--port', str(port),
+            '--latency', str(args.latency),
+            '--latency-jitter', str(args.latency_jitter),
+            '--throttle-rate', str(args.throttle_rate),
+            '--error-rate', str(args.error_rate),
+        ],
+        stdout=DEVNULL,
+        stderr=DEVNULL,
+    )
+
+    for _ in range(100):
+        try:
+            create_connection(('127.0.0.1', port), timeout=0.1).close()
+            break
+        except OSError:
+            blocking_sleep(0.1)
+    else:
+        server.kill()
+        raise RuntimeError('mock server did not start')
+
+    return server, f'http://127.0.0.1:{port}'
+
+
+def main():
+    parser = ArgumentParser('breach-check-benchmark')
+    parser.add_argument('--sizes', dest='sizes', help='comma separated input sizes', default='1000,100000,1000000', type=str)
+    parser.add_argument('--concurrency', dest='concurrency', help='comma separated concurrency levels', default='10,100,500', type=str)
+    parser.add_argument('-b', '--backend', dest='backends', help='comma separated backends', default='leakcheck', type=str)
+    parser.add_argument('--latency', dest='latency', help='mock server response delay in seconds', default=0.005, type=float)
+    parser.add_argument('--latency-jitter', dest='latency_jitter', help='mock server random extra delay in seconds', default=0.005, type=float)
+    parser.add_argument('--throttle-rate', dest='throttle_rate', help='probability of a 429 response', default=0.0, type=float)
+    parser.add_argument('--error-rate', dest='error_rate', help='probability of a 500 response', default=0.0, type=float)
+    parser.add_argument('-o', '--output', dest='output_file', help='write results as JSON to this file', default=None, type=str)
+    parser.add_argument('--scenario', dest='scenario', help='internal: run a single size,concurrency scenario', default=None, type=str)
+    parser.add_argument('--base-url', dest='base_url', help='internal: mock server base URL', default=None, type=str)
+    args = parser.parse_args()
+    backends = args.backends.split(',')
+
+    if args.scenario:
+        logger.setLevel(logging.CRITICAL)
+        size, concurrency = map(int, args.scenario.split(','))
+        print(json_dumps(run(run_scenario(args.base_url, size, concurrency, backends))))
+        return
+
+    server, base_url = start_mock_server(args)
+    records = []
+    try:
+        for size in map(int, args.sizes.split(',')):
+            for concurrency in map(int, args.concurrency.split(',')):
+                scenario = run_process(
+                    [
+                        sys.executable, __file__,
+                        '--scenario', f'{size},{concurrency}',
+                        '--base-url', base_url,
+                        '-b', args.backends,
+                    ],
+                    stdout=PIPE,
+                    check=True,
+                )
+                record = json_loads(scenario.stdout.decode().strip().splitlines()[-1])
+                record.update({
+                    'mock_latency_s': args.latency,
+                    'mock_throttle_rate': args.throttle_rate,
+                    'mock_error_rate': args.error_rate,
+                    'python': python_version(),
+                    'timestamp': datetime.now(timezone.utc).isoformat(),
+                })
+                records.append(record)
+                print(json_dumps(record), flush=True)
+    finally:
+        server.terminate()
+        server.wait()
+
+    if args.output_file:
+        with open(args.output_file, 'w') as f:
+            f.write(json_dumps(records, indent=2))
+
+
+if __name__ == '__main__':
+    main()
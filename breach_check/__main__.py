@@ -1,9 +1,47 @@
-from asyncio import run
-from argparse import ArgumentParser
+from argparse import SUPPRESS, ArgumentParser, ArgumentTypeError, BooleanOptionalAction
 
-from breach_check.breach import BreachChecker, BreachCheckerBackendChoices
-from breach_check.results import Results
-from breach_check.utils import generate_unique_filename, extract_emails
+from breach_check.breach_factory.registry import available_backends
+from breach_check.cache import DEFAULT_CACHE_FILE
+from breach_check.corpus import DEFAULT_CORPUS_FILE
+from breach_check.dedupe import DEFAULT_DOT_DOMAINS, DEFAULT_PLUS_TAG_DOMAINS
+from breach_check.logger import LogFormat, configure_logging
+from breach_check.results import OutputFormat
+
+
+def parse_backends(value: str) -> list[str]:
+    backends = [name.strip() for name in value.split(',') if name.strip()]
+    available = available_backends()
+    for name in backends:
+        if name not in available:
+            raise ArgumentTypeError(f'invalid backend {name!r}, available backends: {", ".join(available)}')
+
+    return backends
+
+
+def parse_rate_limits(value: str) -> float | dict[str, float]:
+    """
+    Parses either one rate applied to every backend sending requests or comma separated name=rate pairs
+    """
+    entries = [entry.strip() for entry in value.split(',') if entry.strip()]
+    try:
+        if len(entries) == 1 and '=' not in entries[0]:
+            return float(entries[0])
+
+        rate_limits = {}
+        for entry in entries:
+            name, separator, rate = entry.partition('=')
+            if not separator:
+                raise ArgumentTypeError('give either one rate or name=rate pairs, e.g. hudsonrock=5,leakcheck=2')
+            rate_limits[name.strip()] = float(rate)
+    except ValueError:
+        raise ArgumentTypeError(f'invalid rate limit {value!r}') from None
+
+    available = available_backends()
+    for name in rate_limits:
+        if name not in available:
+            raise ArgumentTypeError(f'invalid backend {name!r}, available backends: {", ".join(available)}')
+
+    return rate_limits
 
 
 def main():
@@ -12,58 +50,372 @@ def main():
         '-i',
         '--input',
         dest='input_file',
-        help='input file containing emails on each line',
+        help='input file containing emails on each line, - for stdin. gzip/bz2/xz files are supported',
         type=str,
-        required=True
+        required=False,
+        default=None
     )
     parser.add_argument(
         '-o',
         '--output',
         dest='output_file',
-        help='output json file path',
+        help='output file path (defaults to output_<timestamp>.json)',
         required=False,
-        default=generate_unique_filename(),
+        default=None,
         type=str
     )
+    parser.add_argument(
+        '-f',
+        '--format',
+        dest='output_format',
+        help='output file format, results are written incrementally as they complete',
+        required=False,
+        default=None,
+        choices=list(OutputFormat),
+        type=OutputFormat
+    )
     parser.add_argument(
         '-b',
         '--backend',
         dest='backend',
+        help=f'comma separated backends queried for every email: {",".join(available_backends())}',
         required=False,
-        default=BreachCheckerBackendChoices.LEAKCHECK,
-        choices=list(BreachCheckerBackendChoices),
-        type=BreachCheckerBackendChoices
+        default=['leakcheck'],
+        type=parse_backends
     )
     parser.add_argument(
         '-r',
         '--rate-limit',
         dest='rate_limit',
-        help='rate limit for making HTTP requests per second',
+        help='requests per second overriding the built-in budget of every backend sending requests, or of single backends as name=rate pairs, e.g. hudsonrock=5,leakcheck=2',
+        required=False,
+        default=None,
+        type=parse_rate_limits
+    )
+    parser.add_argument(
+        '-c',
+        '--concurrency',
+        dest='concurrency',
+        help='maximum number of emails being checked at the same time',
+        required=False,
+        default=100,
+        type=int
+    )
+    parser.add_argument(
+        '-p',
+        '--proxy',
+        dest='proxies',
+        help='proxy URL requests are sent through, repeat to use a pool of proxies',
+        required=False,
+        default=[],
+        action='append',
+        type=str
+    )
+    parser.add_argument(
+        '--proxy-file',
+        dest='proxy_file',
+        help='file with one proxy URL per line, added to the proxy pool',
+        required=False,
+        default=None,
+        type=str
+    )
+    parser.add_argument(
+        '--proxy-rate-limit',
+        dest='proxy_rate_limit',
+        help='requests per second sent through each proxy',
+        required=False,
+        default=None,
+        type=float
+    )
+    parser.add_argument(
+        '-w',
+        '--workers',
+        dest='workers',
+        help='number of processes checking shards of the input, the backend rate limits are split between them',
+        required=False,
+        default=1,
+        type=int
+    )
+    parser.add_argument(
+        '--coordinator',
+        dest='coordinator',
+        help='serve the input to worker nodes joining from other machines at [HOST:]PORT instead of checking it locally',
+        required=False,
+        default=None,
+        type=str
+    )
+    parser.add_argument(
+        '--join',
+        dest='join',
+        help='check batches leased from the coordinator at this URL, e.g. http://10.0.0.1:8765',
+        required=False,
+        default=None,
+        type=str
+    )
+    parser.add_argument(
+        '--batch-size',
+        dest='batch_size',
+        help='emails leased to a worker node at once',
+        required=False,
+        default=500,
+        type=int
+    )
+    parser.add_argument(
+        '--lease-timeout',
+        dest='lease_timeout',
+        help='seconds after which batches of unresponsive worker nodes are leased to other nodes',
+        required=False,
+        default=120,
+        type=float
+    )
+    parser.add_argument(
+        '--token',
+        dest='token',
+        help='shared secret between the coordinator and its worker nodes, required unless the coordinator only listens on localhost',
+        required=False,
+        default=None,
+        type=str
+    )
+    parser.add_argument(
+        '--connections-per-host',
+        dest='connections_per_host',
+        help='maximum number of pooled connections per backend host (0 for unlimited)',
         required=False,
-        default=60,
+        default=0,
         type=int
     )
+    parser.add_argument(
+        '--fold-plus-tags',
+        dest='fold_plus_tags',
+        help=f'comma separated domains whose plus tags are ignored when deduplicating emails, * for all domains (default: {",".join(DEFAULT_PLUS_TAG_DOMAINS)})',
+        required=False,
+        default='',
+        const=','.join(DEFAULT_PLUS_TAG_DOMAINS),
+        nargs='?',
+        type=str
+    )
+    parser.add_argument(
+        '--fold-dots',
+        dest='fold_dots',
+        help=f'comma separated domains whose local part dots are ignored when deduplicating emails, * for all domains (default: {",".join(DEFAULT_DOT_DOMAINS)})',
+        required=False,
+        default='',
+        const=','.join(DEFAULT_DOT_DOMAINS),
+        nargs='?',
+        type=str
+    )
+    parser.add_argument(
+        '--bloom-capacity',
+        dest='bloom_capacity',
+        help='expected number of unique emails, deduplicates using a fixed size Bloom filter for very large inputs, duplicates whose result is no longer kept in memory are checked again',
+        required=False,
+        default=None,
+        type=int
+    )
+    parser.add_argument(
+        '--max-attempts',
+        dest='max_attempts',
+        help='maximum attempts per HTTP request on network errors and 5xx responses, throttled emails are requeued behind the rate limiter',
+        required=False,
+        default=3,
+        type=int
+    )
+    parser.add_argument(
+        '--retry-budget',
+        dest='retry_budget',
+        help='retries allowed per request sent during the run, limits load on failing backends',
+        required=False,
+        default=0.2,
+        type=float
+    )
+    parser.add_argument(
+        '--cache',
+        dest='cache',
+        help='cache lookup results on disk and reuse them in later runs',
+        required=False,
+        default=False,
+        action=BooleanOptionalAction
+    )
+    parser.add_argument(
+        '--cache-file',
+        dest='cache_file',
+        help='path of the lookup cache database',
+        required=False,
+        default=DEFAULT_CACHE_FILE,
+        type=str
+    )
+    parser.add_argument(
+        '--cache-ttl',
+        dest='cache_ttl',
+        help='seconds after which cached results expire',
+        required=False,
+        default=86400,
+        type=float
+    )
+    parser.add_argument(
+        '--cache-negative-ttl',
+        dest='cache_negative_ttl',
+        help='seconds after which cached results without breaches expire (defaults to --cache-ttl)',
+        required=False,
+        default=None,
+        type=float
+    )
+    parser.add_argument(
+        '--refresh',
+        dest='refresh',
+        help='ignore cached results but store the fresh ones',
+        required=False,
+        default=False,
+        action='store_true'
+    )
+    parser.add_argument(
+        '--journal',
+        dest='journal_file',
+        help='record completed checks in a journal file so an interrupted run can be resumed',
+        required=False,
+        default=None,
+        type=str
+    )
+    parser.add_argument(
+        '--resume',
+        dest='resume_file',
+        help='resume an interrupted run from its journal, skipping completed emails and appending to its output',
+        required=False,
+        default=None,
+        type=str
+    )
+    parser.add_argument(
+        '--baseline',
+        dest='baseline_file',
+        help='output of a previous run (json or ndjson), only breaches added or removed since then are written',
+        required=False,
+        default=None,
+        type=str
+    )
+    parser.add_argument(
+        '--metrics-file',
+        dest='metrics_file',
+        help='write run metrics to this file in Prometheus text format',
+        required=False,
+        default=None,
+        type=str
+    )
+    parser.add_argument(
+        '--metrics-port',
+        dest='metrics_port',
+        help='serve live run metrics at http://127.0.0.1:<port>/metrics during the run',
+        required=False,
+        default=None,
+        type=int
+    )
+    parser.add_argument(
+        '--corpus-file',
+        dest='corpus_file',
+        help='path of the local breach corpus checked by the corpus backend',
+        required=False,
+        default=DEFAULT_CORPUS_FILE,
+        type=str
+    )
+    parser.add_argument(
+        '--table-rows',
+        dest='table_rows',
+        help='breached results listed in the end of run table, top sources and domains always cover every result',
+        required=False,
+        default=50,
+        type=int
+    )
+    parser.add_argument(
+        '--progress',
+        dest='progress',
+        help='render a progress bar, disable for headless/CI runs',
+        required=False,
+        default=True,
+        action=BooleanOptionalAction
+    )
+    parser.add_argument(
+        '-v',
+        '--verbose',
+        dest='verbosity',
+        help='log more details, repeat for debug output',
+        default=0,
+        action='count'
+    )
+    parser.add_argument(
+        '-q',
+        '--quiet',
+        dest='quietness',
+        help='only log warnings, repeat to only log errors',
+        default=0,
+        action='count'
+    )
+    parser.add_argument(
+        '--log-format',
+        dest='log_format',
+        help='log output format, auto uses rich on terminals and JSON lines otherwise',
+        required=False,
+        default=LogFormat.AUTO,
+        choices=list(LogFormat),
+        type=LogFormat
+    )
+
+    subparsers = parser.add_subparsers(dest='command', metavar='command')
+    index_parser = subparsers.add_parser('index', help='add breach dumps to the local corpus checked by the corpus backend')
+    index_parser.add_argument(
+        'dumps',
+        help='dump files with an email on each line (CSV, combo lists, plain lists), gzip/bz2/xz files are supported',
+        nargs='+',
+        type=str
+    )
+    index_parser.add_argument(
+        '--source',
+        dest='source',
+        help='breach source reported for the emails of the dumps (defaults to the file name)',
+        required=False,
+        default=None,
+        type=str
+    )
+    index_parser.add_argument(
+        '--reindex',
+        dest='reindex',
+        help='index dumps again even if they were indexed before',
+        required=False,
+        default=False,
+        action='store_true'
+    )
+    index_parser.add_argument(
+        '--corpus-file',
+        dest='corpus_file',
+        help='path of the local breach corpus',
+        required=False,
+        default=SUPPRESS,
+        type=str
+    )
 
     args = parser.parse_args()
+    configure_logging(verbosity=args.verbosity - args.quietness, log_format=args.log_format)
+    if args.command == 'index':
+        from breach_check.cli import run_index
 
-    emails = extract_emails(args.input_file)
-    result_handler = Results()
+        run_index(args)
+        return
 
-    if not emails:
-        exit(-1)
+    if args.join is None and args.input_file is None:
+        parser.error('the following arguments are required: -i/--input')
+    if args.join and args.coordinator:
+        parser.error('--join and --coordinator cannot be used together')
+    if args.join and args.baseline_file:
+        parser.error('--baseline is applied by the coordinator, not by worker nodes')
+    if args.coordinator and not args.token:
+        from breach_check.distributed import is_loopback
 
-    breach_checker = BreachChecker(
-        rate_limit=args.rate_limit,
-        backend=args.backend
-    )
-    results = run(breach_checker.mass_check(emails=emails))
+        host = args.coordinator.rpartition(':')[0] or '127.0.0.1'
+        if not is_loopback(host):
+            parser.error(f'--token is required to serve worker nodes on {host}')
 
-    result_handler.write_json_results_to_file(
-        output_file=args.output_file,
-        results=results
-    )
+    # the HTTP client, backends and rich are only imported once a check is run, keeping --help fast
+    from breach_check.cli import run_cli
 
-    result_handler.generate_table(results=breach_checker.result_schemas)
+    run_cli(args)
 
 
 if __name__ == '__main__':
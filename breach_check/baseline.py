@@ -0,0 +1,173 @@
+"""
+module for diffing the results of a run against the output of a previous run
+"""
+from collections.abc import Iterator
+from itertools import chain
+from json import JSONDecoder
+from re import compile
+
+from breach_check.breach import BreachChecker
+from breach_check.corpus import email_digest
+from breach_check.logger import logger
+from breach_check.utils import json_loads, open_input_file
+
+
+# whitespace and commas between the elements of a JSON array
+_ARRAY_SEPARATORS = compile(r'[\s,]*')
+
+
+def iter_result_records(file_path: str, chunk_size: int = 1 << 20) -> Iterator[dict]:
+    """
+    Streams the records of a results file written as a JSON array or as JSON
+    lines, holding at most one chunk of the file in memory. A truncated last
+    record, e.g. of an interrupted run, is skipped.
+
+    Args:
+        file_path (str): path of the results file, gzip/bz2/xz files are supported
+        chunk_size (int): characters read at once from JSON array files
+
+    Yields:
+        dict: result records in file order
+    """
+    with open_input_file(file_path) as f:
+        first_char = f.read(1)
+        while first_char.isspace():
+            first_char = f.read(1)
+
+        if not first_char:
+            return
+
+        if first_char != '[':
+            for line in chain([first_char + f.readline()], f):
+                if not line.strip():
+                    continue
+                try:
+                    yield json_loads(line)
+                except ValueError:
+                    logger.warning('Skipping malformed record in %s', file_path)
+            return
+
+        # the array writer puts every record on a single line, decode them one at a time from a sliding buffer
+        decoder = JSONDecoder()
+        buffer = ''
+        position = 0
+        is_eof = False
+        while True:
+            position = _ARRAY_SEPARATORS.match(buffer, position).end()
+            if position == len(buffer) and not is_eof:
+                chunk = f.read(chunk_size)
+                buffer, position, is_eof = buffer[position:] + chunk, 0, not chunk
+                continue
+
+            if position == len(buffer) or buffer[position] == ']':
+                return
+
+            try:
+                record, position = decoder.raw_decode(buffer, position)
+            except ValueError:
+                if is_eof:
+                    logger.warning('Skipping truncated last record of %s', file_path)
+                    return
+
+                # the record continues in the next chunk
+                chunk = f.read(chunk_size)
+                buffer, position, is_eof = buffer[position:] + chunk, 0, not chunk
+                continue
+
+            yield record
+
+
+class BaselineDiff:
+    """
+    Reduces results to the breaches added or removed since a baseline run.
+
+    The baseline output is streamed once into an index of 64 bit email
+    digests to the set of breach sources reported for them. Only breached
+    emails are indexed and identical source sets are shared between emails,
+    so the index stays a fraction of the size of the baseline file. Results
+    of the current run are then compared one at a time as they are written.
+    """
+
+    def __init__(self, file_path: str, backend: str | list[str] = 'leakcheck') -> None:
+        """BaselineDiff class constructor
+
+        Args:
+            file_path (str): output file of the baseline run, JSON array or JSON lines
+            backend (str | list[str]): backends of the current run, used to read the breach sources of records
+
+        Returns:
+            None
+        """
+        self.file_path = file_path
+        # backends are only used to parse records, they never send requests
+        self._parser = BreachChecker(backend=backend, show_progress=False, summary_rows=0)
+        self._index: dict[int, frozenset[str]] = {}
+        self._source_sets: dict[frozenset[str], frozenset[str]] = {}
+
+        self.baseline_records = 0
+        self.added = 0
+        self.removed = 0
+        self.unchanged = 0
+        self.inconclusive = 0
+
+    def load(self) -> None:
+        """Indexes the breach sources of the baseline results"""
+        for record in iter_result_records(self.file_path):
+            self.baseline_records += 1
+            if not isinstance(record, dict) or not (email := record.get('email')):
+                continue
+
+            result = self._parser.to_result(email, record)
+            if result.is_breached:
+                sources = frozenset(result.breaches)
+                self._index[email_digest(email)] = self._source_sets.setdefault(sources, sources)
+
+        logger.info('Loaded %d baseline results with %d breached emails from %s', self.baseline_records, len(self._index), self.file_path)
+
+    def diff(self, record: dict | None) -> dict | None:
+        """
+        Compares a result record against the baseline.
+
+        Args:
+            record (dict | None): result record of the current run
+
+        Returns:
+            dict | None: email with its added and removed breach sources, None if nothing changed or the check was inconclusive
+        """
+        if not record or not (email := record.get('email')):
+            return None
+
+        result = self._parser.to_result(email, record)
+        if result.duplicate_of:
+            # changes are reported once, for the canonical address
+            return None
+        if not result.is_conclusive:
+            # a failed check is not a removed breach
+            self.inconclusive += 1
+            return None
+
+        previous = self._index.get(email_digest(email), frozenset())
+        current = frozenset(result.breaches)
+        added = sorted(current - previous)
+        removed = sorted(previous - current)
+        if not added and not removed:
+            self.unchanged += 1
+            return None
+
+        if added:
+            self.added += 1
+        if removed:
+            self.removed += 1
+
+        return {
+            'email': email,
+            'added': added,
+            'removed': removed,
+            'total': result.total,
+        }
+
+    def log_stats(self) -> None:
+        logger.info(
+            'Baseline diff: %d emails with new breaches, %d with removed breaches, %d unchanged, %d inconclusive',
+            self.added, self.removed, self.unchanged, self.inconclusive
+        )
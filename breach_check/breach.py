@@ -1,42 +1,190 @@
 """
 This module contains the BreachChecker class which is used to check if an email address has been involved in any data breaches.
 """
-from asyncio import ensure_future, gather
+from asyncio import Condition, Lock, Queue, Task, create_task, gather
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Mapping, Sized
+from contextlib import aclosing
 from enum import Enum
+from itertools import count
 from re import compile
+from types import MappingProxyType
+from typing import NamedTuple
 
 from aiohttp.client_exceptions import ClientProxyConnectionError
-from rich.progress import Progress, TaskID
 
+from breach_check.cache import LookupCache
+from breach_check.coalesce import LookupCoalescer
+from breach_check.dedupe import EmailDeduplicator
 from breach_check.http import AsyncRequests
-from breach_check.logger import logger, console
-from breach_check.breach_factory.base import ResultSchema
-from breach_check.breach_factory.leakcheck import LeakCheck
-from breach_check.breach_factory.hudsonrock import HudsonRock
+from breach_check.logger import logger
+from breach_check.metrics import metrics
+from breach_check.progress import RunProgress
+from breach_check.ratelimit import RateLimit
+from breach_check.retry import RetryPolicy
+from breach_check.summary import BreachSummary
+from breach_check.breach_factory.base import BaseBreachBackend, RateLimitedError, ResultSchema
+from breach_check.breach_factory.batching import BatchingAdapter
+from breach_check.breach_factory.registry import load_backend
 
 class BreachCheckerBackendChoices(Enum):
     """
-    Enum for breach checker backend choices.
+    Enum for the bundled breach checker backend choices, any backend of
+    the registry can also be selected by name.
     """
     LEAKCHECK = 'leakcheck'
     HUDSONROCK = 'hudsonrock'
+    CORPUS = 'corpus'
+
+_DONE = object()
+_CLOSED = object()
+
+
+async def _iter_emails(emails: Iterable[str] | AsyncIterable[str]) -> AsyncIterator[str]:
+    if isinstance(emails, AsyncIterable):
+        async for email in emails:
+            yield email
+    else:
+        for email in emails:
+            yield email
+
+
+class _Dispatcher:
+    """
+    Hands the emails of a single input to every backend, each backend pulling
+    them at its own pace. A backend runs at most `max_lead` emails ahead of
+    the slowest one, which bounds the emails buffered here and the partial
+    results waiting for the slow backend.
+    """
+
+    def __init__(self, read: Callable[[], Awaitable[tuple[int, str] | None]], backends: list[str], max_lead: int) -> None:
+        self.max_lead = max_lead
+
+        self._read = read
+        self._positions = dict.fromkeys(backends, 0)
+        # emails handed to some backends but not all, the first one at position _start
+        self._buffer: deque[tuple[int, str]] = deque()
+        self._start = 0
+        self._exhausted = False
+        self._reading = Lock()
+        self._advanced = Condition()
+
+    async def next(self, backend: str) -> tuple[int, str] | None:
+        """
+        Returns the next email of a backend.
+
+        Args:
+            backend (str): name of the backend
+
+        Returns:
+            tuple[int, str] | None: input index and canonical email, None once the input is exhausted
+        """
+        position = self._positions[backend]
+        if position - self._start >= self.max_lead:
+            async with self._advanced:
+                await self._advanced.wait_for(lambda: position - self._start < self.max_lead)
+
+        if position == self._start + len(self._buffer):
+            async with self._reading:
+                if position == self._start + len(self._buffer):
+                    if self._exhausted or (item := await self._read()) is None:
+                        self._exhausted = True
+                        return None
+                    self._buffer.append(item)
+
+        item = self._buffer[position - self._start]
+        self._positions[backend] = position + 1
+
+        if position == self._start and (slowest := min(self._positions.values())) > self._start:
+            # every backend received these emails
+            for _ in range(slowest - self._start):
+                self._buffer.popleft()
+            self._start = slowest
+            async with self._advanced:
+                self._advanced.notify_all()
+
+        return item
+
+
+EMAIL_PATTERN = compile(r"^[^@\s']+@[^@\s']+\.[^@\s']+$")
+
+
+def is_valid_email(email: str) -> bool:
+    return EMAIL_PATTERN.match(email) is not None
+
+
+class BreachResult(NamedTuple):
+    """
+    Typed result of a breach check.
+
+    Attributes:
+        email (str): checked email address, as given by the caller
+        total (int | None): number of breaches, None if the email is invalid or a backend gave no conclusive answer
+        breaches (tuple[str, ...]): breach sources reported by every backend
+        backends (Mapping[str, ResultSchema]): summarized result of every backend keyed by backend name, read-only when empty
+        duplicate_of (str | None): canonical address checked earlier in the same run, whose result is no longer kept
+    """
+    email: str
+    total: int | None
+    breaches: tuple[str, ...] = ()
+    # shared by every result without backend results, so it must not be mutable
+    backends: Mapping[str, ResultSchema] = MappingProxyType({})
+    duplicate_of: str | None = None
+
+    @property
+    def is_breached(self) -> bool:
+        return bool(self.total)
+
+    @property
+    def is_conclusive(self) -> bool:
+        return self.total is not None
+
 
 class BreachChecker:
     """
     Wrapper for checking email breaches using breach factory.
+
+    Used as an async context manager, the connection pool is opened once
+    and reused by every check until the context exits:
+
+        async with BreachChecker(backend='leakcheck') as breach_checker:
+            result = await breach_checker.check_one('user@example.com')
+            async for result in breach_checker.check_many(emails):
+                ...
+
+    Per instance state is bounded: summaries keep a fixed number of rows
+    and deduplication state only lives for the duration of a bulk check.
     """
 
-    def __init__(self, *args, rate_limit: int = 60, headers: dict | None = None, proxy: str | None = None, ssl: bool | None = True, allow_redirects: bool | None = True, backend:str='leakcheck',**kwargs) -> None:
+    def __init__(self, *args, rate_limit: float | dict[str, float] | None = None, headers: dict | None = None, proxy: str | list[str] | None = None, ssl: bool | None = True, allow_redirects: bool | None = True, backend: str | BreachCheckerBackendChoices | type[BaseBreachBackend] | list[str | BreachCheckerBackendChoices | type[BaseBreachBackend]] = BreachCheckerBackendChoices.LEAKCHECK, connection_limit: int = 100, connection_limit_per_host: int = 0, keepalive_timeout: float = 30, dns_cache_ttl: int | None = 300, concurrency: int = 100, cache: LookupCache | None = None, throttle_retries: int = 10, retry_policy: RetryPolicy | None = None, deduplicator: EmailDeduplicator | None = None, api_urls: dict[str, str] | None = None, show_progress: bool = False, summary_rows: int = 50, rate_share: float = 1, proxy_rate_limit: float | None = None, batch_delay: float = 0.01, recent_results: int = 0, recent_ttl: float = 30, **kwargs) -> None:
         """
         Initialize the BreachCheck object.
 
         Args:
-            rate_limit (int): The rate limit for making HTTP requests. Defaults to 60.
+            rate_limit (float | dict[str, float] | None): Requests per second overriding the default budget of the backends, either of every backend sending requests or keyed by backend name. Defaults to None.
             delay (float | None): The delay between consecutive HTTP requests. Defaults to None.
             headers (dict | None): The headers to be included in the HTTP requests. Defaults to None.
-            proxy (str | None): The proxy server to be used for making HTTP requests. Defaults to None.
+            proxy (str | list[str] | None): Proxy URL or pool of proxy URLs used for making HTTP requests. Defaults to None.
             ssl (bool | None): Whether to use SSL for making HTTP requests. Defaults to True.
             allow_redirects (bool | None): Whether to allow HTTP redirects. Defaults to True.
+            backend (str | BreachCheckerBackendChoices | type[BaseBreachBackend] | list): Registered backend name, backend class, or list of them queried for every email. Defaults to leakcheck.
+            connection_limit (int): Total number of pooled connections. Defaults to 100.
+            connection_limit_per_host (int): Pooled connections per backend host, 0 for unlimited. Defaults to 0.
+            keepalive_timeout (float): Seconds an idle pooled connection is kept alive. Defaults to 30.
+            dns_cache_ttl (int | None): Seconds DNS lookups are cached for. Defaults to 300.
+            concurrency (int): Maximum number of in-flight email checks per backend. Defaults to 100.
+            cache (LookupCache | None): Opened on-disk cache used to skip repeated lookups. Defaults to None.
+            throttle_retries (int): Times a throttled email is retried once the backend limiter allows it. Defaults to 10.
+            retry_policy (RetryPolicy | None): Backoff and budget used to retry failed HTTP requests. Defaults to None.
+            deduplicator (EmailDeduplicator | None): Canonicalization and deduplication settings of input emails, every bulk check tracks its emails in a copy and adds its statistics here. Defaults to case-insensitive deduplication.
+            api_urls (dict[str, str] | None): Endpoint overrides keyed by backend name, e.g. to target a mock server. Defaults to None.
+            show_progress (bool): Render a progress bar while checking emails. Defaults to False.
+            summary_rows (int): Breached emails kept in the summary for display. Defaults to 50.
+            rate_share (float): Share of every backend request budget used by this instance, e.g. 1/N when N processes query the same backends. Defaults to 1.
+            proxy_rate_limit (float | None): Requests per second sent through each proxy. Defaults to None.
+            batch_delay (float): Seconds a partial batch of a bulk backend waits for more emails. Defaults to 0.01.
+            recent_results (int): Completed results kept in memory to answer repeated lookups, 0 disables it. Defaults to 0.
+            recent_ttl (float): Seconds a completed result kept in memory stays valid. Defaults to 30.
             **kwargs: Additional keyword arguments.
 
         Returns:
@@ -47,63 +195,178 @@ class BreachChecker:
                 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36'
             }
 
-        self.progress = Progress(console=console)
-        self.progress_task_id: TaskID | None = None
+        self.progress = RunProgress(enabled=show_progress)
+        self.concurrency = concurrency
 
         self._http_client = AsyncRequests(
-            rate_limit=rate_limit, 
+            rate_limit=None,
             headers=headers,
             proxies=proxy,
             ssl=ssl,
-            allow_redirects=allow_redirects
+            allow_redirects=allow_redirects,
+            connection_limit=connection_limit,
+            connection_limit_per_host=connection_limit_per_host,
+            keepalive_timeout=keepalive_timeout,
+            dns_cache_ttl=dns_cache_ttl,
+            retry_policy=retry_policy,
+            proxy_rate_limit=proxy_rate_limit,
         )
 
-        breachfactory = None
-        match backend:
-            case BreachCheckerBackendChoices.HUDSONROCK:
-                breachfactory = HudsonRock
-            case BreachCheckerBackendChoices.LEAKCHECK:
-                breachfactory = LeakCheck
-            case _:
-                raise ValueError('Invalid Backend Choice!')
-            
-        self._breach_factory = breachfactory(self._http_client)
-        self.result_schemas:list[ResultSchema] = []
-        
+        if isinstance(backend, (str, BreachCheckerBackendChoices, type)):
+            backend = [backend]
+
+        api_urls = api_urls or {}
+        self._breach_factories: list[BaseBreachBackend] = []
+        for backend_choice in backend:
+            if isinstance(backend_choice, type):
+                breachfactory = backend_choice
+            else:
+                breachfactory = load_backend(getattr(backend_choice, 'value', backend_choice))
+
+            breach_factory = breachfactory(
+                self._http_client,
+                rate_limit=self._backend_rate_limit(breachfactory, rate_limit),
+                api_url=api_urls.get(breachfactory.name)
+            )
+            breach_factory.summary = BreachSummary(max_rows=summary_rows)
+            self._breach_factories.append(breach_factory)
+
+        if not self._breach_factories:
+            raise ValueError('At least one backend is required!')
+
+        # backends answering several emails per request are queried through batching adapters
+        self._batchers = {
+            breach_factory.name: BatchingAdapter(breach_factory, max_delay=batch_delay)
+            for breach_factory in self._breach_factories
+            if breach_factory.supports_batching
+        }
 
-    async def mass_check(self, emails: list[str] | None = None):
+        # full request budget of each backend, before sharing it with other instances
+        self._rate_limits = {
+            breach_factory.name: self._backend_rate_limit(breach_factory, rate_limit) or breach_factory.rate_limit
+            for breach_factory in self._breach_factories
+        }
+        self.rate_share = 1
+        self.set_rate_share(rate_share)
+
+        self._cache = cache
+        # concurrent lookups of the same email share one request per backend
+        self._coalescer = LookupCoalescer(recent_size=recent_results, recent_ttl=recent_ttl)
+        # producer and worker tasks and result queue of running iterators, cancelled on close
+        self._active_runs: list[tuple[list[Task], Queue]] = []
+        # the pool is kept open until close once opened, otherwise only while checks use it
+        self._opened = False
+        self._session_users = 0
+        self.throttle_retries = throttle_retries
+        self.deduplicator = deduplicator or EmailDeduplicator()
+        self.summary_rows = summary_rows
+        self.summary = BreachSummary(max_rows=summary_rows)
+
+
+    async def __aenter__(self) -> "BreachChecker":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        """Opens the connection pool shared by every check until close is called"""
+        self._opened = True
+        await self._http_client.open()
+
+    async def _acquire_session(self) -> None:
+        # checks running outside of open/close share a pool closed by the last of them
+        self._session_users += 1
+        try:
+            await self._http_client.open()
+        except BaseException:
+            await self._release_session()
+            raise
+
+    async def _release_session(self) -> None:
+        self._session_users -= 1
+        if not self._session_users and not self._opened:
+            await self._http_client.close()
+
+    async def close(self) -> None:
+        """Closes the connection pool and resources held by the backends, cancelling checks of iterators still running"""
+        self._opened = False
+        for tasks, completed in list(self._active_runs):
+            for task in tasks:
+                task.cancel()
+            await gather(*tasks, return_exceptions=True)
+
+            # wake up the iterator, its queued results are dropped
+            while not completed.empty():
+                completed.get_nowait()
+            completed.put_nowait(_CLOSED)
+
+        self._coalescer.cancel()
+        await self._http_client.close()
+        for breach_factory in self._breach_factories:
+            breach_factory.close()
+
+    @property
+    def backends(self) -> list[BaseBreachBackend]:
+        """Backends queried for every email"""
+        return self._breach_factories
+
+    @staticmethod
+    def _backend_rate_limit(breach_factory: type[BaseBreachBackend] | BaseBreachBackend, rate_limit: float | dict[str, float] | None) -> RateLimit | None:
         """
-        Perform a mass check for breaches using a list of emails.
+        Request budget overriding the default budget of a backend.
 
         Args:
-            emails (list[str] | None): A list of email addresses to check for breaches. Defaults to None.
+            breach_factory (type[BaseBreachBackend] | BaseBreachBackend): backend class or instance
+            rate_limit (float | dict[str, float] | None): requests per second of every backend sending requests or keyed by backend name
 
         Returns:
-            list: A list of results from the breach check.
+            RateLimit | None: None to keep the backend default budget
+        """
+        if isinstance(rate_limit, dict):
+            rate_limit = rate_limit.get(breach_factory.name)
+        elif breach_factory.local:
+            # a local lookup is never held back by a budget meant for remote APIs
+            rate_limit = None
+
+        return RateLimit(max_rate=rate_limit) if rate_limit else None
 
+    def set_rate_share(self, rate_share: float) -> None:
         """
-        if not emails or len(emails) == 0:
-            return []
+        Use only a share of every backend request budget, e.g. 1/N when N
+        processes or machines query the same backends.
 
-        self.progress.start()
-        self.progress_task_id = self.progress.add_task(
-            '[orange] Checking for Breaches:',
-            total=len(emails)
-        )
+        Args:
+            rate_share (float): share of the budget between 0 and 1.
+        """
+        if rate_share == self.rate_share:
+            return
 
-        tasks = []
-        for email in emails:
-            tasks.append(
-                ensure_future(
-                    self.check(email)
-                )
-            )
+        self.rate_share = rate_share
+        for breach_factory in self._breach_factories:
+            rate_limit = self._rate_limits[breach_factory.name]
+            breach_factory.rate_limiter.set_max_rate(rate_limit.max_rate * rate_share)
+
+    async def mass_check(self, emails: Iterable[str] | None = None, concurrency: int | None = None) -> list:
+        """
+        Perform a mass check for breaches using a list of emails.
 
+        Args:
+            emails (Iterable[str] | None): Email addresses to check for breaches. Defaults to None.
+            concurrency (int | None): Maximum number of in-flight checks. Defaults to the instance concurrency.
+
+        Returns:
+            list: A list of results from the breach check in completion order.
+
+        """
+        if not emails:
+            return []
+
+        results = []
         try:
-            results = await gather(*tasks)
-            self.progress.stop()
-            self.result_schemas = self._breach_factory.result_schemas
-            return results
+            async for result in self.iter_check(emails=emails, concurrency=concurrency):
+                results.append(result)
         except Exception as e:
             logger.error(
                 f'[*] Exception occurred while gathering results: {e}',
@@ -111,12 +374,337 @@ class BreachChecker:
             )
             return []
 
-    async def check(self, email: str | None = None) -> dict:
+        return results
+
+    async def check_one(self, email: str) -> BreachResult:
+        """
+        Check a single email against every backend. Outside of `async with`
+        the connection pool is only kept open while checks are running.
+
+        Args:
+            email (str): The email address to check.
+
+        Returns:
+            BreachResult: typed result of the check.
+        """
+        if not is_valid_email(email):
+            return BreachResult(email=email, total=None)
+
+        record = await self.check(self.deduplicator.canonicalize(email))
+        return self.to_result(email, record)
+
+    async def check_many(self, emails: Iterable[str] | AsyncIterable[str], concurrency: int | None = None) -> AsyncIterator[BreachResult]:
+        """
+        Check emails for breaches, yielding typed results as they complete.
+        See iter_check for the scheduling and deduplication of emails.
+
+        Wrap the iterator in `contextlib.aclosing` when the loop may stop
+        early, so its in-flight checks are cancelled right away instead of
+        when the iterator is garbage collected:
+
+            async with aclosing(breach_checker.check_many(emails)) as results:
+                async for result in results:
+                    ...
+
+        Args:
+            emails (Iterable[str] | AsyncIterable[str]): Email addresses to check for breaches.
+            concurrency (int | None): Maximum number of in-flight checks per backend. Defaults to the instance concurrency.
+
+        Yields:
+            BreachResult: typed result of each input email in completion order.
+        """
+        # close the inner generator right away if the caller stops early, cancelling in-flight checks
+        async with aclosing(self._iter_check(emails, concurrency)) as results:
+            async for email, record in results:
+                yield self.to_result(email, record)
+
+    async def iter_check(self, emails: Iterable[str] | AsyncIterable[str], concurrency: int | None = None) -> AsyncIterator[dict]:
+        """
+        Check emails for breaches using a bounded pool of workers, yielding
+        results as soon as they complete.
+
+        Emails are pulled lazily from the iterable, so at most `concurrency`
+        checks per backend are in flight and only a bounded number of
+        emails/results are buffered at any time regardless of the input size.
+        Every backend pulls emails through its own producer, queue and
+        workers, so a slow or failing backend does not hold up requests to
+        the others until they run `16 * concurrency` emails ahead of it.
+        Results are merged into one record per email once all backends are
+        done.
+
+        Emails are canonicalized and deduplicated before being dispatched,
+        the result of a canonical address is then returned for every input
+        email it was derived from.
+
+        Args:
+            emails (Iterable[str] | AsyncIterable[str]): Email addresses to check for breaches.
+            concurrency (int | None): Maximum number of in-flight checks per backend. Defaults to the instance concurrency.
+
+        Yields:
+            dict: result of each breach check in completion order.
+        """
+        async with aclosing(self._iter_check(emails, concurrency)) as results:
+            async for _, result in results:
+                yield result
+
+    async def _iter_check(self, emails: Iterable[str] | AsyncIterable[str], concurrency: int | None = None) -> AsyncIterator[tuple[str, dict]]:
+        concurrency = max(1, concurrency or self.concurrency)
+        backends = self._breach_factories
+        # every run tracks its own emails, concurrent runs on one checker must not see each other's
+        deduplicator = self.deduplicator.spawn()
+
+        self.progress.start(total=len(emails) if isinstance(emails, Sized) else None)
+
+        pending: dict[str, Queue] = {
+            backend.name: Queue(maxsize=concurrency * 2) for backend in backends
+        }
+        completed: Queue = Queue(maxsize=concurrency * 2 * len(backends))
+
+        input_emails = aiter(_iter_emails(emails))
+        input_index = 0
+        input_error = None
+
+        async def read() -> tuple[int, str] | None:
+            nonlocal input_index, input_error
+            try:
+                async for email in input_emails:
+                    input_index += 1
+                    if not is_valid_email(email):
+                        logger.warning('%s is not a valid email', email)
+                        deduplicator.invalid += 1
+                        await completed.put((None, email, None, {}))
+                        continue
+
+                    canonical_email = deduplicator.canonicalize(email)
+                    if not deduplicator.track(canonical_email, email):
+                        # duplicates of pending emails receive their result once it completes
+                        if not deduplicator.is_pending(canonical_email):
+                            await completed.put((None, email, None, deduplicator.resolve_duplicate(canonical_email, email)))
+                        continue
+
+                    return input_index, canonical_email
+            except Exception as e:
+                # reported once the workers drained the queues
+                input_error = e
+
+            return None
+
+        # every backend pulls emails on its own, a slow backend only holds up the others once they are far ahead
+        dispatcher = _Dispatcher(read, [backend.name for backend in backends], max_lead=concurrency * 16)
+
+        async def produce(backend: BaseBreachBackend):
+            backend_queue = pending[backend.name]
+            while (item := await dispatcher.next(backend.name)) is not None:
+                await backend_queue.put(item)
+
+            # let workers drain the queue and exit
+            for _ in range(concurrency):
+                await backend_queue.put(_DONE)
+
+        async def work(backend: BaseBreachBackend):
+            backend_queue = pending[backend.name]
+            while (item := await backend_queue.get()) is not _DONE:
+                index, email = item
+                try:
+                    result = await self.check(email, backend=backend)
+                except Exception as e:
+                    logger.error('Check failed for %s on %s: %s', email, backend.name, str(e))
+                    result = {}
+                await completed.put((index, email, backend.name, result))
+
+            await completed.put(_DONE)
+
+        # share a single pooled session across the whole run
+        await self._acquire_session()
+
+        tasks = []
+        for backend in backends:
+            tasks.append(create_task(produce(backend)))
+            tasks.extend(create_task(work(backend)) for _ in range(concurrency))
+        run = (tasks, completed)
+        self._active_runs.append(run)
+
+        # partial results of emails still being checked by other backends
+        partial_results: dict[int, dict[str, dict]] = {}
+        try:
+            running_workers = concurrency * len(backends)
+            while running_workers:
+                item = await completed.get()
+                if item is _CLOSED:
+                    raise RuntimeError('BreachChecker was closed while checking emails')
+                if item is _DONE:
+                    running_workers -= 1
+                    continue
+
+                index, email, backend_name, result = item
+                if backend_name is None:
+                    # invalid and duplicate emails are resolved without being dispatched
+                    self.progress.advance()
+                    yield email, result
+                    continue
+
+                if len(backends) > 1:
+                    email_results = partial_results.setdefault(index, {})
+                    email_results[backend_name] = result
+                    if len(email_results) < len(backends):
+                        continue
+
+                    result = self._merge_results(email, partial_results.pop(index))
+
+                for input_email, email_result in deduplicator.fan_out(email, result):
+                    self.progress.advance()
+                    yield input_email, email_result
+
+            # surface errors raised while reading the input
+            if input_error:
+                raise input_error
+        finally:
+            for task in tasks:
+                task.cancel()
+            await gather(*tasks, return_exceptions=True)
+            self._active_runs.remove(run)
+            await input_emails.aclose()
+            self.deduplicator.add_stats(deduplicator)
+
+            await self._release_session()
+
+            self.progress.stop()
+            self.summary = BreachSummary.merged(
+                (backend.summary for backend in backends),
+                max_rows=self.summary_rows
+            )
+
+    def _merge_results(self, email: str, results: dict[str, dict]) -> dict:
+        """
+        Merge results of every backend into a single record.
+
+        Args:
+            email (str): The checked email address.
+            results (dict[str, dict]): Results keyed by backend name.
+
+        Returns:
+            dict: merged record, total is None unless every backend returned a conclusive result.
+        """
+        backend_results = {}
+        total = 0
+        for backend in self._breach_factories:
+            result = results.get(backend.name) or {}
+            backend_results[backend.name] = result
+
+            if total is not None and result.get('total') is not None:
+                total += result['total']
+            else:
+                total = None
+
+        return {
+            'email': email,
+            'total': total,
+            'backends': backend_results,
+        }
+
+    def to_result(self, email: str, record: dict | None) -> BreachResult:
+        """
+        Build the typed result of an input email from its result record, e.g.
+        a record read back from the output of a previous run.
+
+        Args:
+            email (str): The input email address.
+            record (dict | None): result record returned by check or iter_check.
+
+        Returns:
+            BreachResult: typed result.
+        """
+        if not record:
+            return BreachResult(email=email, total=None)
+
+        if duplicate_of := record.get('duplicate_of'):
+            return BreachResult(email=email, total=None, duplicate_of=duplicate_of)
+
+        if 'backends' in record:
+            # merged record of a multi backend check
+            backend_records = record['backends']
+        else:
+            backend_records = {self._breach_factories[0].name: record}
+
+        backends = {}
+        for backend in self._breach_factories:
+            backend_record = backend_records.get(backend.name) or {}
+            backends[backend.name] = backend.get_result_schema({**backend_record, 'email': email})
+
+        return BreachResult(
+            email=email,
+            total=record.get('total'),
+            breaches=tuple(dict.fromkeys(
+                breach for result_schema in backends.values() for breach in result_schema.breaches
+            )),
+            backends=backends,
+        )
+
+    def log_stats(self) -> None:
+        """
+        Logs request, retry and throttling statistics of the run.
+        """
+        self.deduplicator.log_stats()
+        self._http_client.retry_policy.log_stats()
+        self._http_client._proxy.log_stats()
+        for backend in self._breach_factories:
+            limiter = backend.rate_limiter
+            logger.info(
+                '%s: throttled responses: %d, current rate: %.2f req/s',
+                backend.name, limiter.throttled_count, limiter.rate
+            )
+
+    async def _query_backend(self, email: str, backend: BaseBreachBackend) -> dict:
+        batcher = self._batchers.get(backend.name)
+        query = batcher.check_email_breaches if batcher else backend.check_email_breaches
+        for attempt in count(1):
+            try:
+                return await query(email)
+            except RateLimitedError as e:
+                # the backend limiter has already backed off, requeue the email behind it
+                if attempt > self.throttle_retries:
+                    logger.error('Giving up on %s after %d throttled attempts', email, attempt)
+                    return e.res_data
+
+    async def _timed_query_backend(self, email: str, backend: BaseBreachBackend) -> dict:
+        with metrics.time('backend_check_duration_seconds', backend=backend.name):
+            res_data = await self._query_backend(email, backend)
+
+        match (res_data or {}).get('total'):
+            case None:
+                outcome = 'inconclusive'
+            case 0:
+                outcome = 'clean'
+            case _:
+                outcome = 'breached'
+        metrics.inc('checks_total', backend=backend.name, outcome=outcome)
+        return res_data
+
+    async def _check_email_breaches(self, email: str, backend: BaseBreachBackend) -> dict:
+        return await self._coalescer.lookup(backend.name, email, lambda: self._lookup(email, backend))
+
+    async def _lookup(self, email: str, backend: BaseBreachBackend) -> dict:
+        if self._cache is None:
+            return await self._timed_query_backend(email, backend)
+
+        res_data = self._cache.get(backend.name, email)
+        if res_data is not None:
+            metrics.inc('cache_lookups_total', backend=backend.name, result='hit')
+            backend.add_result_schema(res_data)
+            return res_data
+
+        metrics.inc('cache_lookups_total', backend=backend.name, result='miss')
+        res_data = await self._timed_query_backend(email, backend)
+        self._cache.set(backend.name, email, res_data)
+        return res_data
+
+    async def check(self, email: str | None = None, backend: BaseBreachBackend | None = None) -> dict:
         """
         Check if an email has been involved in any data breaches.
 
         Args:
             email (str, optional): The email address to check. Defaults to None.
+            backend (BaseBreachBackend, optional): Only query this backend. Defaults to querying every backend.
 
         Returns:
             dict: A dictionary containing the email, breaches, and total number of breaches.
@@ -129,27 +717,29 @@ class BreachChecker:
             logger.warning('email param cannot be None')
             return {}
 
-        
-        res_data = {}
-        try:
-            email_validator = compile(r"^[^@\s']+@[^@\s']+\.[^@\s']+$")
-            if email_validator.match(email):
-                res_data = await self._breach_factory.check_email_breaches(email)
-            else:
-                logger.warning('%s is not a valid email', email)
+        if not is_valid_email(email):
+            logger.warning('%s is not a valid email', email)
+            return {}
 
-            # advance progress bar
-            if self.progress_task_id is not None:
-                self.progress.update(self.progress_task_id,
-                                        advance=1, refresh=True)
-            else:
-                logger.error('No Progress Bar Task Found!')
+        await self._acquire_session()
+        try:
+            if backend is not None:
+                return await self._check_email_breaches(email, backend)
 
-            if self.progress and self.progress.finished:
-                self.progress.stop()
+            if len(self._breach_factories) == 1:
+                return await self._check_email_breaches(email, self._breach_factories[0])
 
-            return res_data
+            results = await gather(*(
+                self._check_email_breaches(email, breach_factory)
+                for breach_factory in self._breach_factories
+            ))
+            return self._merge_results(email, {
+                breach_factory.name: result
+                for breach_factory, result in zip(self._breach_factories, results)
+            })
         except ConnectionRefusedError:
             logger.error('Connection Failed! Server refused Connection!!')
         except ClientProxyConnectionError as e:
             logger.error('Proxy Connection Error: %s', str(e))
+        finally:
+            await self._release_session()
@@ -1,18 +1,38 @@
 """
 Base class for breach backends.
 """
-from dataclasses import dataclass, fields
-from breach_check.http import AsyncRequests
+from asyncio import gather
+from hashlib import new as new_hash
+from typing import TYPE_CHECKING, NamedTuple
 
-@dataclass
-class ResultSchema:
+from breach_check.ratelimit import AdaptiveRateLimiter, RateLimit
+from breach_check.summary import BreachSummary
+
+if TYPE_CHECKING:
+    # backends are registered without importing the HTTP client
+    from breach_check.http import AsyncRequests
+
+class ResultSchema(NamedTuple):
     email: str
-    breaches: list[str]
+    breaches: tuple[str, ...]
     total: int
 
     @classmethod
     def get_fields(cls) -> list[str]:
-        return sorted([field.name for field in fields(cls)])
+        return sorted(cls._fields)
+
+class RateLimitedError(Exception):
+    """
+    Raised by backends when the breach API throttled the request.
+
+    Args:
+        res_data (dict): inconclusive result returned if the check is given up.
+    """
+
+    def __init__(self, res_data: dict) -> None:
+        super().__init__(f'Rate limited while checking {res_data.get("email")}')
+        self.res_data = res_data
+
 
 class BaseBreachBackend:
     """
@@ -20,14 +40,38 @@ class BaseBreachBackend:
 
     Args:
         http_client (AsyncRequests): An instance of the HTTP client used for making requests.
+        rate_limit (RateLimit | None): Overrides the default request budget of the backend.
+        api_url (str | None): Overrides the default endpoint of the backend API.
+
+    Backends may answer several emails per request. Bulk APIs set
+    `max_batch_size` and override `check_emails_breaches`. APIs answering a
+    whole group of emails at once, e.g. every breached address of a domain
+    or of a hash prefix, override `group_key` and `query_group`. The
+    BatchingAdapter groups concurrent lookups accordingly.
 
     Attributes:
+        name (str): Unique name of the backend, used as the cache namespace.
+        rate_limit (RateLimit): Default request budget of the backend API.
+        api_url (str): Default endpoint of the backend API.
+        max_batch_size (int): Emails sent in one check_emails_breaches request, 1 without a bulk API.
+        batch_delay (float | None): Seconds a partial batch waits for more emails, None for the checker default.
+        local (bool): Lookups never leave the machine, a rate limit given for every backend does not apply.
+        rate_limiter (AdaptiveRateLimiter): Limiter shared by every request sent to the backend.
+        summary (BreachSummary): Aggregated results of the breached emails found by the backend.
         _http_client (AsyncRequests): The HTTP client used for making requests.
     """
+    name: str = 'base'
+    rate_limit: RateLimit = RateLimit(max_rate=60, time_period=1)
+    api_url: str = ''
+    max_batch_size: int = 1
+    batch_delay: float | None = None
+    local: bool = False
 
-    def __init__(self, http_client: AsyncRequests) -> None:
+    def __init__(self, http_client: "AsyncRequests", rate_limit: RateLimit | None = None, api_url: str | None = None) -> None:
         self._http_client = http_client
-        self.result_schemas:list[ResultSchema] = []
+        self._api_url = api_url or self.api_url
+        self.rate_limiter = AdaptiveRateLimiter.from_rate_limit(rate_limit or self.rate_limit, name=self.name)
+        self.summary = BreachSummary()
 
     async def check_email_breaches(self, email: str):
         """
@@ -38,5 +82,137 @@ class BaseBreachBackend:
 
         Returns:
             dict: A dictionary containing the results of the breach check.
+
+        Raises:
+            RateLimitedError: If the backend API throttled the request.
+        """
+        raise NotImplementedError
+
+    async def check_emails_breaches(self, emails: list[str]) -> dict[str, dict]:
+        """
+        Check several emails for breaches, in as few requests as the backend API allows.
+        Sends one request per email unless overridden by a bulk backend.
+
+        Args:
+            emails (list[str]): at most max_batch_size email addresses.
+
+        Returns:
+            dict[str, dict]: results of check_email_breaches keyed by email.
+
+        Raises:
+            RateLimitedError: If the backend API throttled the request.
+        """
+        results = await gather(*(self.check_email_breaches(email) for email in emails))
+        return dict(zip(emails, results))
+
+    def group_key(self, email: str) -> str | None:
+        """
+        Key of the group of emails answered by a single query_group request,
+        e.g. the email domain or a prefix of the email hash.
+
+        Args:
+            email (str): The email address.
+
+        Returns:
+            str | None: group key, None if the backend cannot query groups.
+        """
+        return None
+
+    def group_member_key(self, email: str) -> str:
+        """Key of an email within the results returned by query_group"""
+        return email
+
+    async def query_group(self, key: str) -> dict[str, dict]:
+        """
+        Fetch every breached email of a group.
+
+        Args:
+            key (str): group key returned by group_key.
+
+        Returns:
+            dict[str, dict]: results of the breached emails of the group keyed by group_member_key.
+
+        Raises:
+            RateLimitedError: If the backend API throttled the request.
         """
         raise NotImplementedError
+
+    def result_from_group(self, email: str, group: dict[str, dict]) -> dict:
+        """
+        Build the result of an email from the results of its group.
+
+        Args:
+            email (str): The email address.
+            group (dict[str, dict]): results returned by query_group.
+
+        Returns:
+            dict: A dictionary containing the results of the breach check.
+        """
+        res_data = group.get(self.group_member_key(email))
+        if res_data is None:
+            return {'email': email, 'breaches': [], 'fields': [], 'total': 0}
+
+        res_data = {**res_data, 'email': email}
+        self.add_result_schema(res_data)
+        return res_data
+
+    @property
+    def supports_batching(self) -> bool:
+        """Returns True if the backend answers several emails per request"""
+        return self.max_batch_size > 1 or type(self).query_group is not BaseBreachBackend.query_group
+
+    def close(self) -> None:
+        """Releases resources held by the backend, e.g. local databases"""
+
+    def get_result_schema(self, res_data: dict) -> ResultSchema:
+        """
+        Build the summarized result for a breached email from the backend result.
+
+        Args:
+            res_data (dict): result returned by check_email_breaches.
+
+        Returns:
+            ResultSchema: summarized breach result.
+        """
+        raise NotImplementedError
+
+    def add_result_schema(self, res_data: dict) -> None:
+        """
+        Record the summarized result of a breached email.
+
+        Args:
+            res_data (dict): result returned by check_email_breaches.
+        """
+        if res_data and res_data.get('total'):
+            self.summary.add(self.get_result_schema(res_data))
+
+
+class HashRangeBackend(BaseBreachBackend):
+    """
+    Base class for backends with k-anonymity range lookups: only a short
+    prefix of the email hash is sent, the API returns the hash suffixes of
+    every breached email sharing it, and matching happens locally. Plaintext
+    emails never leave the machine and a single request answers every email
+    of the same prefix.
+
+    Subclasses implement query_group, returning results keyed by the
+    lowercase hex digest suffix following the prefix.
+
+    Attributes:
+        hash_name (str): hashlib algorithm applied to the lowercased email.
+        prefix_length (int): hex characters of the hash sent to the API.
+    """
+    hash_name: str = 'sha1'
+    prefix_length: int = 5
+
+    def email_hash(self, email: str) -> str:
+        return new_hash(self.hash_name, email.strip().lower().encode()).hexdigest()
+
+    def group_key(self, email: str) -> str:
+        return self.email_hash(email)[:self.prefix_length]
+
+    def group_member_key(self, email: str) -> str:
+        return self.email_hash(email)[self.prefix_length:]
+
+    async def check_email_breaches(self, email: str) -> dict:
+        return self.result_from_group(email, await self.query_group(self.group_key(email)))
@@ -0,0 +1,153 @@
+"""
+Adapter grouping concurrent lookups of a backend into batched requests.
+"""
+from asyncio import Future, Task, TimerHandle, create_task, get_running_loop, shield
+from collections import OrderedDict
+from time import monotonic
+
+from breach_check.breach_factory.base import BaseBreachBackend, RateLimitedError
+from breach_check.metrics import metrics
+
+
+def _inconclusive(email: str) -> dict:
+    return {'email': email, 'breaches': [], 'fields': [], 'total': None}
+
+
+class BatchingAdapter:
+    """
+    Sends concurrent lookups of a backend in as few requests as it allows.
+
+    Backends answering groups of emails (a domain, a hash prefix) are
+    queried once per group, concurrent lookups of the same group share the
+    request and the last `group_cache_size` group results answer later
+    lookups without any request for `group_ttl` seconds. Bulk backends receive up to
+    `max_batch_size` pending emails per request, a batch is sent once full
+    or `max_delay` seconds after its first email arrived.
+    """
+
+    def __init__(self, backend: BaseBreachBackend, max_delay: float = 0.01, group_cache_size: int = 16384, group_ttl: float = 300) -> None:
+        """BatchingAdapter class constructor
+
+        Args:
+            backend (BaseBreachBackend): backend receiving the batched requests
+            max_delay (float): seconds a partial batch waits for more emails
+            group_cache_size (int): group results kept for later lookups
+            group_ttl (float): seconds a group result answers later lookups
+
+        Returns:
+            None
+        """
+        self.backend = backend
+        self.max_delay = max_delay if backend.batch_delay is None else backend.batch_delay
+        self.group_cache_size = group_cache_size
+        self.group_ttl = group_ttl
+
+        self._batch: list[tuple[str, Future]] = []
+        self._timer: TimerHandle | None = None
+        # expiry time and result of recently queried groups
+        self._groups: OrderedDict[str, tuple[float, dict[str, dict]]] = OrderedDict()
+        self._group_requests: dict[str, Task] = {}
+        self._tasks: set[Task] = set()
+
+    async def check_email_breaches(self, email: str) -> dict:
+        """
+        Check an email for breaches as part of a batched request.
+
+        Args:
+            email (str): The email address to check for breaches.
+
+        Returns:
+            dict: A dictionary containing the results of the breach check.
+
+        Raises:
+            RateLimitedError: If the backend API throttled the batched request.
+        """
+        key = self.backend.group_key(email)
+        if key is not None:
+            try:
+                group = await self._query_group(key)
+            except RateLimitedError:
+                raise RateLimitedError(_inconclusive(email))
+            return self.backend.result_from_group(email, group)
+
+        if self.backend.max_batch_size > 1:
+            return await self._submit(email)
+
+        return await self.backend.check_email_breaches(email)
+
+    async def _query_group(self, key: str) -> dict[str, dict]:
+        if (cached := self._groups.get(key)) is not None:
+            expires_at, group = cached
+            if expires_at > monotonic():
+                self._groups.move_to_end(key)
+                metrics.inc('batched_lookups_total', backend=self.backend.name, result='group_cached')
+                return group
+            # long running nodes must not answer from stale group results
+            del self._groups[key]
+
+        if (request := self._group_requests.get(key)) is None:
+            metrics.inc('batched_lookups_total', backend=self.backend.name, result='group_query')
+            request = create_task(self._fetch_group(key))
+            self._group_requests[key] = request
+            request.add_done_callback(lambda task: self._group_done(key, task))
+        else:
+            metrics.inc('batched_lookups_total', backend=self.backend.name, result='group_shared')
+
+        # a cancelled lookup must not cancel the request shared with other lookups
+        return await shield(request)
+
+    async def _fetch_group(self, key: str) -> dict[str, dict]:
+        group = await self.backend.query_group(key)
+        self._groups[key] = (monotonic() + self.group_ttl, group)
+        if len(self._groups) > self.group_cache_size:
+            self._groups.popitem(last=False)
+        return group
+
+    def _group_done(self, key: str, task: Task) -> None:
+        del self._group_requests[key]
+        if not task.cancelled():
+            # mark failures retrieved, they are raised to every waiting lookup
+            task.exception()
+
+    async def _submit(self, email: str) -> dict:
+        future = get_running_loop().create_future()
+        self._batch.append((email, future))
+
+        if len(self._batch) >= self.backend.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = get_running_loop().call_later(self.max_delay, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._batch = self._batch, []
+        if batch:
+            task = create_task(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: list[tuple[str, Future]]) -> None:
+        emails = list(dict.fromkeys(email for email, _ in batch))
+        metrics.inc('batched_requests_total', backend=self.backend.name)
+        metrics.inc('batched_lookups_total', len(batch), backend=self.backend.name, result='bulk')
+        try:
+            results = await self.backend.check_emails_breaches(emails)
+        except Exception as e:
+            for email, future in batch:
+                if future.done():
+                    continue
+                if isinstance(e, RateLimitedError):
+                    # every lookup of the batch is requeued behind the backend limiter on its own
+                    future.set_exception(RateLimitedError(_inconclusive(email)))
+                else:
+                    future.set_exception(e)
+            return
+
+        for email, future in batch:
+            if not future.done():
+                future.set_result(results.get(email) or _inconclusive(email))
@@ -0,0 +1,63 @@
+"""
+This module contains the implementation of LocalCorpus class which checks email breaches against locally indexed breach dumps.
+"""
+from breach_check.breach_factory.base import BaseBreachBackend, ResultSchema
+from breach_check.corpus import DEFAULT_CORPUS_FILE, CorpusIndex
+from breach_check.logger import logger
+from breach_check.ratelimit import RateLimit
+
+
+class LocalCorpus(BaseBreachBackend):
+    """
+    Checks email breaches against breach dumps indexed with `breach-check index`,
+    no request leaves the machine. The api_url override is the path of the corpus index.
+    """
+    name = 'corpus'
+    # lookups are local, the limiter never holds them back
+    rate_limit = RateLimit(max_rate=10_000_000, time_period=1)
+    local = True
+    api_url = DEFAULT_CORPUS_FILE
+    max_batch_size = 1000
+    # lookups are cheap, send whatever was queued in the same event loop iteration
+    batch_delay = 0
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._index = CorpusIndex(self._api_url)
+
+    async def check_email_breaches(self, email: str) -> dict:
+        return (await self.check_emails_breaches([email]))[email]
+
+    async def check_emails_breaches(self, emails: list[str]) -> dict[str, dict]:
+        self._index.open()
+        found = self._index.lookup(emails)
+
+        results = {}
+        for email in emails:
+            sources = found.get(email, [])
+            res_data = {
+                'email': email,
+                'breaches': [{'name': source} for source in sources],
+                'fields': [],
+                'total': len(sources),
+            }
+
+            if sources:
+                logger.info('Breaches found for %s', email)
+                self.add_result_schema(res_data)
+            else:
+                logger.debug('No breaches found for %s', email)
+
+            results[email] = res_data
+
+        return results
+
+    def get_result_schema(self, res_data: dict) -> ResultSchema:
+        return ResultSchema(
+            email=res_data.get('email'),
+            breaches=tuple(breach.get('name', '') for breach in res_data.get('breaches', [])),
+            total=res_data.get('total')
+        )
+
+    def close(self) -> None:
+        self._index.close()
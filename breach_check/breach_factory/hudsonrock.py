@@ -1,10 +1,10 @@
 """
 This module contains the implementation of MozillaMonitor class which checks email breaches using mozilla monitor API.
 """
-from json import loads as json_loads
-from breach_check.breach_factory.base import BaseBreachBackend
+from breach_check.breach_factory.base import BaseBreachBackend, RateLimitedError
 from breach_check.logger import logger
-from breach_check.http import AsyncRequests
+from breach_check.utils import json_loads
+from breach_check.ratelimit import RateLimit
 from breach_check.breach_factory.base import ResultSchema
 
 
@@ -12,11 +12,10 @@ class HudsonRock(BaseBreachBackend):
     """
     Checks email for info stealer breaches using hudson rock public API.
     """
-
-    def __init__(self, http_client: AsyncRequests, *args, **kwargs) -> None:
-        super().__init__(http_client, *args, **kwargs)
-        # 50 requests/10sec
-        self._api_url = 'https://cavalier.hudsonrock.com/api/json/v2/osint-tools/search-by-email'
+    name = 'hudsonrock'
+    # 50 requests/10sec
+    rate_limit = RateLimit(max_rate=50, time_period=10)
+    api_url = 'https://cavalier.hudsonrock.com/api/json/v2/osint-tools/search-by-email'
 
     async def check_email_breaches(self, email: str) -> dict:
         res_data = {
@@ -32,41 +31,46 @@ class HudsonRock(BaseBreachBackend):
         response = await self._http_client.request(
             url=self._api_url,
             method='GET',
-            params=payload
+            params=payload,
+            rate_limiter=self.rate_limiter,
         )
 
         status_code = response.get('status')
 
         match status_code:
             case 200:
-                res_body = json_loads(response.get('res_body', '{}'))
+                res_body = json_loads(response.get('res_body') or b'{}')
                 fields_compromised = []
                 stolen_data = res_body.get('stealers', [])
                 total = len(stolen_data)
 
-                logger.warning('Breaches found for %s', email)
+                logger.info('Breaches found for %s', email)
                 res_data['breaches'] = stolen_data
                 res_data['fields'] = fields_compromised
                 res_data['total'] = total
 
-                # get malware paths
-                breaches = list(map(lambda stolen_data: f'malware: {stolen_data.get("malware_path","")}', stolen_data))
-
-                self.result_schemas.append(ResultSchema(
-                    email=email,
-                    breaches=breaches,
-                    total=total
-                ))
+                self.add_result_schema(res_data)
 
             case 400:
-                logger.info('No breaches found for %s', email)
+                logger.debug('No breaches found for %s', email)
                 res_data['total'] = 0
 
             case 429:
                 logger.warning('Rate Limited')
+                raise RateLimitedError(res_data)
 
             case _:
                 logger.error('Failed with status code: %s', str(status_code))
                 logger.error('Response: %s\nResponse Body: %s', str(response), str(response.get("res_body", {})))
 
         return res_data
+
+    def get_result_schema(self, res_data: dict) -> ResultSchema:
+        # get malware paths
+        breaches = tuple(map(lambda stolen_data: f'malware: {stolen_data.get("malware_path","")}', res_data.get('breaches', [])))
+
+        return ResultSchema(
+            email=res_data.get('email'),
+            breaches=breaches,
+            total=res_data.get('total')
+        )
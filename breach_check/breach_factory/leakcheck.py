@@ -1,20 +1,17 @@
 """
 This module contains the implementation of LeakCheck class which checks email breaches using mozilla monitor API.
 """
-from json import loads as json_loads
-from breach_check.breach_factory.base import BaseBreachBackend, ResultSchema
+from breach_check.breach_factory.base import BaseBreachBackend, RateLimitedError, ResultSchema
 from breach_check.logger import logger
-from breach_check.http import AsyncRequests
+from breach_check.utils import json_loads
 
 
 class LeakCheck(BaseBreachBackend):
     """
     Checks email breaches using leakcheck public API.
     """
-
-    def __init__(self, http_client: AsyncRequests, *args, **kwargs) -> None:
-        super().__init__(http_client, *args, **kwargs)
-        self._api_url = 'https://leakcheck.io/api/public'
+    name = 'leakcheck'
+    api_url = 'https://leakcheck.io/api/public'
 
     async def check_email_breaches(self, email: str) -> dict:
         res_data = {
@@ -30,42 +27,47 @@ class LeakCheck(BaseBreachBackend):
         response = await self._http_client.request(
             url=self._api_url,
             method='GET',
-            params=payload
+            params=payload,
+            rate_limiter=self.rate_limiter,
         )
 
         status_code = response.get('status')
-        res_body = json_loads(response.get('res_body', '{}'))
+        if status_code == 429:
+            logger.warning('Rate Limited')
+            raise RateLimitedError(res_data)
+
+        res_body = json_loads(response.get('res_body') or b'{}')
         is_success = res_body.get('success', False)
         breach_sources = res_body.get('sources', [])
         total = res_body.get('found', -1)
 
         if status_code == 200 and is_success:
-            logger.warning('Breaches found for %s', email)
+            logger.info('Breaches found for %s', email)
             res_data['breaches'] = breach_sources
             res_data['fields'] = res_body.get('fields', [])
             res_data['total'] = total
 
-            breaches = list(filter(
-                lambda domain: domain.strip() if domain else '',
-                [breach.get('name', '').strip()
-                 for breach in breach_sources]
-            ))
-
-            self.result_schemas.append(ResultSchema(
-                email=email,
-                breaches=breaches,
-                total=total
-            ))
+            self.add_result_schema(res_data)
 
         elif status_code == 200:
-            logger.info('No breaches found for %s', email)
+            logger.debug('No breaches found for %s', email)
             res_data['total'] = 0
 
-        elif status_code == 429:
-            logger.warning('Rate Limited')
-
         else:
             logger.error('Failed with status code: %s', str(status_code))
             logger.error('Response: %s\nResponse Body: %s', str(response), str(res_body))
 
         return res_data
+
+    def get_result_schema(self, res_data: dict) -> ResultSchema:
+        breaches = tuple(filter(
+            lambda domain: domain.strip() if domain else '',
+            [breach.get('name', '').strip()
+             for breach in res_data.get('breaches', [])]
+        ))
+
+        return ResultSchema(
+            email=res_data.get('email'),
+            breaches=breaches,
+            total=res_data.get('total')
+        )
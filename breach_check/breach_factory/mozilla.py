@@ -1,22 +1,23 @@
 """
 This module contains the implementation of MozillaMonitor class which checks email breaches using mozilla monitor API.
 """
-from json import loads as json_loads
-from breach_check.breach_factory.base import BaseBreachBackend, ResultSchema
+from breach_check.breach_factory.base import BaseBreachBackend, RateLimitedError, ResultSchema
 from breach_check.logger import logger
 from breach_check.http import AsyncRequests
+from breach_check.utils import json_loads
 
 
 class MozillaMonitor(BaseBreachBackend):
     """
     Checks email breaches using mozilla monitor API.
     """
+    name = 'mozilla'
+    api_url = 'https://monitor.firefox.com/api/v1/scan'
 
     def __init__(self, http_client: AsyncRequests, *args, **kwargs) -> None:
         logger.warning(
             'MozillaMonitor is deprecated since it API is no longer available. Please use other breach backends.')
         super().__init__(http_client, *args, **kwargs)
-        self._api_url = 'https://monitor.firefox.com/api/v1/scan'
 
     async def check_email_breaches(self, email: str) -> dict:
         res_data = {
@@ -32,11 +33,15 @@ class MozillaMonitor(BaseBreachBackend):
             url=self._api_url,
             method='POST',
             json=json_payload,
+            rate_limiter=self.rate_limiter,
         )
 
         status_code = response.get('status')
-        res_body = json_loads(response.get('res_body', '{}'))
-        breach_sources = response.get('',[])
+        if status_code == 429:
+            logger.warning('Rate Limited')
+            raise RateLimitedError(res_data)
+
+        res_body = json_loads(response.get('res_body') or b'{}')
         is_success = res_body.get('success', False)
 
         if status_code == 200 and is_success:
@@ -45,23 +50,23 @@ class MozillaMonitor(BaseBreachBackend):
             res_data['breaches'] = breaches
             res_data['total'] = total
 
-            breaches = list(filter(
-                lambda domain: domain.strip() if domain else '',
-                [breach.get('Domain', '').strip()
-                 for breach in breach_sources]
-            ))
-
-            self.result_schemas.append(ResultSchema(
-                email=email,
-                breaches=breaches,
-                total=total,
-            ))
-
-        elif status_code == 429:
-            logger.warning('Rate Limited')
+            self.add_result_schema(res_data)
 
         else:
             logger.error('Failed with status code: %s', str(status_code))
             logger.error(response, res_body)
 
         return res_data
+
+    def get_result_schema(self, res_data: dict) -> ResultSchema:
+        breaches = tuple(filter(
+            lambda domain: domain.strip() if domain else '',
+            [breach.get('Domain', '').strip()
+             for breach in res_data.get('breaches', [])]
+        ))
+
+        return ResultSchema(
+            email=res_data.get('email'),
+            breaches=breaches,
+            total=res_data.get('total'),
+        )
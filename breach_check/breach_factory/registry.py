@@ -0,0 +1,96 @@
+"""
+Registry of breach backends, discovered from entry points and imported only when selected.
+
+Third party packages register backends under the `breach_check.backends`
+entry point group, e.g. in pyproject.toml:
+
+    [tool.poetry.plugins."breach_check.backends"]
+    mybackend = "my_package.backend:MyBackend"
+
+Entry points named like a bundled backend are ignored with a warning.
+
+Each backend class declares its own request budget (`rate_limit`), batch
+capability (`max_batch_size`, `query_group`) and response parser
+(`get_result_schema`), see BaseBreachBackend.
+"""
+from importlib import import_module
+from importlib.metadata import entry_points
+
+from breach_check.logger import logger
+
+
+ENTRY_POINT_GROUP = 'breach_check.backends'
+
+# import paths of the bundled backends, modules are imported on first use
+BUILTIN_BACKENDS = {
+    'leakcheck': 'breach_check.breach_factory.leakcheck:LeakCheck',
+    'hudsonrock': 'breach_check.breach_factory.hudsonrock:HudsonRock',
+    'corpus': 'breach_check.breach_factory.corpus:LocalCorpus',
+}
+
+_backends: dict[str, str | type] | None = None
+# entry points named like a bundled backend, reported once the backend is loaded
+_shadowed: dict[str, str] = {}
+
+
+def _registry() -> dict[str, str | type]:
+    global _backends
+    if _backends is None:
+        _backends = dict(BUILTIN_BACKENDS)
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            # bundled backends cannot be shadowed by plugins
+            if entry_point.name in BUILTIN_BACKENDS:
+                _shadowed[entry_point.name] = entry_point.value
+            else:
+                _backends.setdefault(entry_point.name, entry_point.value)
+
+    return _backends
+
+
+def register_backend(name: str, backend: str | type) -> None:
+    """
+    Registers a backend class, or its `module:Class` import path to import it lazily.
+
+    Args:
+        name (str): name the backend is selected by
+        backend (str | type): BaseBreachBackend subclass or its import path
+    """
+    _registry()[name] = backend
+
+
+def available_backends() -> list[str]:
+    """Returns the names of every registered backend without importing them"""
+    return list(_registry())
+
+
+def load_backend(name: str) -> type:
+    """
+    Returns the class of a registered backend, importing its module if needed.
+
+    Args:
+        name (str): name of the backend
+
+    Returns:
+        type[BaseBreachBackend]: backend class
+
+    Raises:
+        ValueError: if no backend is registered under the name
+    """
+    backends = _registry()
+    backend = backends.get(name)
+    if backend is None:
+        raise ValueError(f'Invalid backend {name!r}, available backends: {", ".join(backends)}')
+
+    if name in _shadowed:
+        # the registry is built while the command line is parsed, before logging is configured
+        logger.warning(
+            'Ignoring the %r entry point %s, %r is a bundled backend, register the plugin under another name',
+            name, _shadowed.pop(name), name
+        )
+
+    if isinstance(backend, str):
+        module_name, _, class_name = backend.partition(':')
+        backend = getattr(import_module(module_name), class_name)
+        backends[name] = backend
+
+    return backend
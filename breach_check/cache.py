@@ -0,0 +1,219 @@
+"""
+module for caching breach lookups on disk between runs
+"""
+from json import dumps as json_dumps
+from os import makedirs
+from os.path import dirname, expanduser, join
+from sqlite3 import Error as SQLiteError, connect
+from time import time
+
+from breach_check.logger import logger
+from breach_check.utils import json_loads
+
+
+DEFAULT_CACHE_FILE = join(expanduser('~'), '.cache', 'breach-check', 'lookups.sqlite3')
+
+
+class LookupCache:
+    """
+    SQLite backed cache of breach lookup results keyed by backend name and
+    normalized email.
+
+    Only conclusive results are cached: breached emails are kept for `ttl`
+    seconds and emails without breaches (negative results) for
+    `negative_ttl` seconds. Rate limited and failed lookups are never cached.
+
+    Several processes may share the database file. Writes are buffered in
+    memory and flushed every `commit_every` results in one short
+    transaction, so the write lock is only held while flushing. A flush
+    waits at most `busy_timeout` seconds for the lock of another process.
+    Database errors are logged and treated as cache misses or skipped
+    writes, a failing cache never loses a lookup.
+    """
+
+    def __init__(
+        self,
+        file_path: str = DEFAULT_CACHE_FILE,
+        ttl: float = 86400,
+        negative_ttl: float | None = None,
+        refresh: bool = False,
+        commit_every: int = 500,
+        busy_timeout: float = 1.0,
+    ) -> None:
+        """LookupCache class constructor
+
+        Args:
+            file_path (str): path of the sqlite database file
+            ttl (float): seconds a breached result stays valid
+            negative_ttl (float | None): seconds a result without breaches stays valid. Defaults to ttl
+            refresh (bool): ignore cached results while still storing fresh ones
+            commit_every (int): number of writes batched into a single transaction
+            busy_timeout (float): seconds a flush waits for the write lock held by another process
+
+        Returns:
+            None
+        """
+        self.file_path = file_path
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.refresh = refresh
+        self.commit_every = commit_every
+        self.busy_timeout = busy_timeout
+
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        # rows waiting for the next flush keyed by backend and normalized email
+        self._pending: dict[tuple[str, str], tuple] = {}
+        self._db = None
+
+    def __enter__(self) -> "LookupCache":
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @staticmethod
+    def normalize_email(email: str) -> str:
+        return email.strip().lower()
+
+    def open(self) -> None:
+        if self._db is not None:
+            return
+
+        cache_dir = dirname(self.file_path)
+        if cache_dir:
+            makedirs(cache_dir, exist_ok=True)
+
+        self._db = connect(self.file_path, timeout=self.busy_timeout)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            '''CREATE TABLE IF NOT EXISTS lookups (
+                backend TEXT NOT NULL,
+                email TEXT NOT NULL,
+                breached INTEGER NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (backend, email)
+            ) WITHOUT ROWID'''
+        )
+        self.purge_expired()
+
+    def close(self) -> None:
+        if self._db is None:
+            return
+
+        self.flush()
+        self._db.close()
+        self._db = None
+
+    def get(self, backend: str, email: str) -> dict | None:
+        """
+        Returns the cached result of a lookup if it has not expired.
+
+        Args:
+            backend (str): name of the breach backend
+            email (str): email address
+
+        Returns:
+            dict | None: cached result, None on cache miss
+        """
+        if self.refresh:
+            self.misses += 1
+            return None
+
+        key = (backend, self.normalize_email(email))
+        if row := self._pending.get(key):
+            self.hits += 1
+            return json_loads(row[3])
+
+        now = time()
+        try:
+            row = self._db.execute(
+                'SELECT result FROM lookups WHERE backend = ? AND email = ? AND created_at >= (CASE breached WHEN 1 THEN ? ELSE ? END)',
+                (*key, now - self.ttl, now - self.negative_ttl)
+            ).fetchone()
+        except SQLiteError as e:
+            self.errors += 1
+            logger.warning('Cache lookup failed, querying the backend: %s', e)
+            row = None
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return json_loads(row[0])
+
+    def set(self, backend: str, email: str, result: dict) -> None:
+        """
+        Stores the result of a lookup, inconclusive results are skipped.
+
+        Args:
+            backend (str): name of the breach backend
+            email (str): email address
+            result (dict): result returned by the backend
+        """
+        if not result or result.get('total') is None:
+            return
+
+        key = (backend, self.normalize_email(email))
+        self._pending[key] = (*key, int(bool(result['total'])), json_dumps(result), time())
+        if len(self._pending) >= self.commit_every:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes buffered results in a single transaction, dropping them if the database stays locked"""
+        if not self._pending:
+            return
+
+        rows = list(self._pending.values())
+        self._pending.clear()
+        try:
+            # take the write lock upfront, it is only held for this batch
+            self._db.execute('BEGIN IMMEDIATE')
+            self._db.executemany(
+                'INSERT OR REPLACE INTO lookups (backend, email, breached, result, created_at) VALUES (?, ?, ?, ?, ?)',
+                rows
+            )
+            self._db.commit()
+        except SQLiteError as e:
+            if self._db.in_transaction:
+                self._db.rollback()
+            self.errors += 1
+            logger.warning('Could not store %d results in the cache: %s', len(rows), e)
+
+    def purge_expired(self) -> int:
+        """
+        Deletes expired entries from the cache.
+
+        Returns:
+            int: number of deleted entries
+        """
+        now = time()
+        try:
+            cursor = self._db.execute(
+                'DELETE FROM lookups WHERE created_at < (CASE breached WHEN 1 THEN ? ELSE ? END)',
+                (now - self.ttl, now - self.negative_ttl)
+            )
+            self._db.commit()
+        except SQLiteError as e:
+            # another process holds the write lock, expired entries are purged by a later run
+            if self._db.in_transaction:
+                self._db.rollback()
+            logger.warning('Could not purge expired cache entries: %s', e)
+            return 0
+
+        if cursor.rowcount:
+            logger.info('Purged %d expired cache entries', cursor.rowcount)
+
+        return cursor.rowcount
+
+    def log_stats(self) -> None:
+        total = self.hits + self.misses
+        hit_ratio = (self.hits / total * 100) if total else 0
+        logger.info('Cache hits: %d, misses: %d (%.1f%% hit ratio)', self.hits, self.misses, hit_ratio)
+        if self.errors:
+            logger.warning('Cache errors: %d', self.errors)
@@ -0,0 +1,200 @@
+"""
+module running the breach-check command line once its arguments are parsed
+"""
+from argparse import Namespace
+from asyncio import run
+
+from breach_check.baseline import BaselineDiff
+from breach_check.breach import BreachChecker
+from breach_check.corpus import CorpusIndex
+from breach_check.distributed import Coordinator, run_node
+from breach_check.http import Proxies
+from breach_check.journal import Journal
+from breach_check.metrics import metrics
+from breach_check.results import OutputFormat, Results, StreamingResultWriter
+from breach_check.utils import generate_unique_filename, iter_emails
+from breach_check.workers import CheckerConfig, ShardedBreachChecker
+
+
+async def check_and_write(breach_checker: BreachChecker | ShardedBreachChecker, emails, writer: StreamingResultWriter, journal: Journal | None = None, metrics_port: int | None = None):
+    if metrics_port is not None:
+        await metrics.start_server(port=metrics_port)
+
+    try:
+        async for result in breach_checker.iter_check(emails=emails):
+            # journaled first, writing may sync and checkpoint the output including this record
+            if journal:
+                journal.record(result)
+            writer.write(result)
+    finally:
+        await metrics.stop_server()
+
+
+async def coordinate(coordinator: Coordinator, address: str, metrics_port: int | None = None):
+    host, _, port = address.rpartition(':')
+    if metrics_port is not None:
+        await metrics.start_server(port=metrics_port)
+
+    await coordinator.start(host=host or '127.0.0.1', port=int(port))
+    try:
+        await coordinator.finished.wait()
+    finally:
+        await coordinator.stop()
+        await metrics.stop_server()
+
+
+def run_index(args: Namespace) -> None:
+    """
+    Adds the breach dumps given on the command line to the local corpus.
+
+    Args:
+        args (Namespace): arguments parsed by the breach-check index parser
+    """
+    with CorpusIndex(args.corpus_file, read_only=False) as corpus:
+        for dump in args.dumps:
+            corpus.add_dump(dump, source=args.source, reindex=args.reindex)
+        corpus.log_stats()
+
+
+def run_cli(args: Namespace) -> None:
+    """
+    Checks the input emails as configured by the parsed command line arguments.
+
+    Args:
+        args (Namespace): arguments parsed by the breach-check parser
+    """
+    proxies = args.proxies
+    if args.proxy_file:
+        proxies = proxies + Proxies.load(args.proxy_file)
+
+    config = CheckerConfig(
+        checker_options={
+            'rate_limit': args.rate_limit,
+            'proxy': proxies,
+            'proxy_rate_limit': args.proxy_rate_limit,
+            'backend': args.backend,
+            'api_urls': {'corpus': args.corpus_file},
+            'connection_limit_per_host': args.connections_per_host,
+            'concurrency': args.concurrency,
+            'summary_rows': args.table_rows,
+        },
+        retry_options={
+            'max_attempts': args.max_attempts,
+            'retry_budget_ratio': args.retry_budget,
+        },
+        dedupe_options={
+            'fold_plus_tags': [domain for domain in args.fold_plus_tags.split(',') if domain],
+            'fold_dots': [domain for domain in args.fold_dots.split(',') if domain],
+            'bloom_capacity': args.bloom_capacity,
+        },
+        cache_options={
+            'file_path': args.cache_file,
+            'ttl': args.cache_ttl,
+            'negative_ttl': args.cache_negative_ttl,
+            'refresh': args.refresh,
+        } if args.cache else None,
+        verbosity=args.verbosity - args.quietness,
+        log_format=args.log_format,
+    )
+
+    if args.join:
+        node = None
+        try:
+            node = run(run_node(args.join, config, token=args.token))
+        finally:
+            if node:
+                node.log_stats()
+            metrics.print_summary()
+            if args.metrics_file:
+                metrics.write_prometheus(args.metrics_file)
+        return
+
+    emails = iter_emails(args.input_file)
+    result_handler = Results()
+
+    if emails is None:
+        exit(-1)
+
+    output_file = args.output_file
+    output_format = args.output_format
+    journal = None
+    is_resumed = False
+    if args.resume_file or args.journal_file:
+        journal = Journal(args.resume_file or args.journal_file)
+        if args.resume_file:
+            is_resumed = journal.load()
+            output_file = output_file or journal.metadata.get('output_file')
+            if output_format is None and journal.metadata.get('output_format'):
+                output_format = OutputFormat(journal.metadata['output_format'])
+            emails = journal.filter_pending(emails)
+
+    output_file = output_file or generate_unique_filename()
+    output_format = output_format or OutputFormat.JSON
+
+    baseline = None
+    if args.baseline_file:
+        # indexed before the output is opened, the baseline may be overwritten by it
+        baseline = BaselineDiff(args.baseline_file, backend=args.backend)
+        baseline.load()
+
+    cache = None
+    if args.coordinator:
+        # created once the output is opened, worker nodes run the checks
+        breach_checker = None
+    elif args.workers > 1:
+        # every worker opens its own cache connection
+        breach_checker = ShardedBreachChecker(
+            workers=args.workers,
+            config=config,
+            show_progress=args.progress,
+            summary_rows=args.table_rows,
+        )
+    else:
+        cache = config.create_cache()
+        breach_checker = config.create(cache=cache, show_progress=args.progress)
+
+    try:
+        with result_handler.open_writer(output_file, output_format, append=is_resumed, resume_offset=journal.output_offset if is_resumed else None) as writer:
+            if journal:
+                journal.open(metadata={
+                    'output_file': output_file,
+                    'output_format': output_format.value,
+                }, output_offset=writer.offset)
+                # journal records only become durable after the matching output records
+                writer.sync_callbacks.append(lambda: journal.sync(output_offset=writer.offset))
+            if baseline:
+                # only changes since the baseline are written, the journal still records every result
+                writer.transform = baseline.diff
+
+            if args.coordinator:
+                breach_checker = Coordinator(
+                    emails,
+                    writer,
+                    journal=journal,
+                    deduplicator=config.create_deduplicator(),
+                    checker_options=config.checker_options,
+                    batch_size=args.batch_size,
+                    lease_timeout=args.lease_timeout,
+                    token=args.token,
+                    show_progress=args.progress,
+                    summary_rows=args.table_rows,
+                )
+                run(coordinate(breach_checker, args.coordinator, args.metrics_port))
+            else:
+                run(check_and_write(breach_checker, emails, writer, journal, args.metrics_port))
+    finally:
+        if breach_checker:
+            breach_checker.log_stats()
+        if baseline:
+            baseline.log_stats()
+        metrics.print_summary()
+        if args.metrics_file:
+            metrics.write_prometheus(args.metrics_file)
+        if journal:
+            journal.close()
+        if cache:
+            cache.log_stats()
+            cache.close()
+
+    result_handler.generate_table(summary=breach_checker.summary)
+
@@ -0,0 +1,110 @@
+"""
+module for coalescing concurrent lookups of the same email
+"""
+from asyncio import CancelledError, Task, create_task, shield, wait
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from time import monotonic
+
+from breach_check.metrics import metrics
+
+
+class LookupCoalescer:
+    """
+    Single-flight layer in front of backend lookups.
+
+    Concurrent lookups of the same backend and email share one in-flight
+    request instead of spending the backend request budget on identical
+    requests. Optionally the last `recent_size` conclusive results are kept
+    in memory for `recent_ttl` seconds and answer lookups completing shortly
+    after them, e.g. from concurrent callers of a long running service.
+
+    A shared request is cancelled once every lookup waiting for it was
+    cancelled, so no request outlives the checks that needed it.
+    """
+
+    def __init__(self, recent_size: int = 0, recent_ttl: float = 30) -> None:
+        """LookupCoalescer class constructor
+
+        Args:
+            recent_size (int): completed results kept in memory, 0 disables it
+            recent_ttl (float): seconds a completed result answers new lookups
+
+        Returns:
+            None
+        """
+        self.recent_size = recent_size
+        self.recent_ttl = recent_ttl
+
+        self._in_flight: dict[tuple[str, str], Task] = {}
+        self._waiters: dict[tuple[str, str], int] = {}
+        self._recent: OrderedDict[tuple[str, str], tuple[float, dict]] = OrderedDict()
+
+    async def lookup(self, backend: str, email: str, query: Callable[[], Awaitable[dict]]) -> dict:
+        """
+        Returns the result of a lookup, sharing it with concurrent lookups of the same email.
+
+        Args:
+            backend (str): name of the queried backend
+            email (str): email address looked up
+            query (Callable[[], Awaitable[dict]]): sends the lookup if no other lookup is in flight
+
+        Returns:
+            dict: result of the breach check
+        """
+        key = (backend, email.strip().lower())
+        if (recent := self._recent.get(key)) is not None:
+            expires_at, res_data = recent
+            if expires_at > monotonic():
+                self._recent.move_to_end(key)
+                metrics.inc('coalesced_lookups_total', backend=backend, result='recent')
+                return res_data
+            del self._recent[key]
+
+        request = self._in_flight.get(key)
+        if request is None or request.done():
+            # a finished request is only dropped once its done callback ran
+            request = create_task(self._query(key, query))
+            self._in_flight[key] = request
+            request.add_done_callback(lambda task: self._done(key, task))
+        else:
+            metrics.inc('coalesced_lookups_total', backend=backend, result='shared')
+
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            # a cancelled lookup must not cancel the request shared with other lookups
+            return await shield(request)
+        except CancelledError:
+            if self._waiters[key] == 1 and not request.done():
+                request.cancel()
+                # later lookups send a new request instead of joining the cancelled one
+                if self._in_flight.get(key) is request:
+                    del self._in_flight[key]
+                # let the request unwind before the caller releases the session it uses
+                await wait((request,))
+            raise
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+
+    async def _query(self, key: tuple[str, str], query: Callable[[], Awaitable[dict]]) -> dict:
+        res_data = await query()
+        # inconclusive results are retried by the next lookup
+        if self.recent_size > 0 and res_data and res_data.get('total') is not None:
+            self._recent[key] = (monotonic() + self.recent_ttl, res_data)
+            if len(self._recent) > self.recent_size:
+                self._recent.popitem(last=False)
+        return res_data
+
+    def _done(self, key: tuple[str, str], task: Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # mark failures retrieved, they are raised to every waiting lookup
+            task.exception()
+
+    def cancel(self) -> None:
+        """Cancels the lookups still in flight"""
+        for task in list(self._in_flight.values()):
+            task.cancel()
@@ -0,0 +1,247 @@
+"""
+module for indexing local breach dumps into a compact on-disk store
+"""
+from hashlib import blake2b
+from os import makedirs, stat
+from os.path import abspath, basename, dirname, expanduser, isfile, join
+from re import compile
+from sqlite3 import connect
+from time import time
+
+from breach_check.logger import logger
+from breach_check.utils import open_input_file
+
+
+DEFAULT_CORPUS_FILE = join(expanduser('~'), '.cache', 'breach-check', 'corpus.sqlite3')
+
+# first email address of a CSV, JSON lines, combo list or plain list record
+EMAIL_IN_RECORD = compile(r'''[^\s,;:|"'<>()\[\]{}]+@[^\s,;:|"'<>()\[\]{}]+\.[^\s,;:|"'<>()\[\]{}]+''')
+
+
+def email_digest(email: str) -> int:
+    """Returns the 64 bit digest a normalized email is stored under"""
+    return int.from_bytes(blake2b(email.strip().lower().encode(), digest_size=8).digest(), 'little', signed=True)
+
+
+class CorpusIndex:
+    """
+    SQLite store of the emails found in local breach dumps.
+
+    Only 64 bit digests of the lowercased emails are stored, one row per
+    email and breach source in a clustered primary key, so lookups are a
+    B-tree search whose memory use does not depend on the corpus size and
+    the index never contains plaintext addresses. Dumps are added
+    incrementally, files already indexed with the same size and
+    modification time are skipped. A changed or reindexed dump rebuilds the
+    rows of its breach source from every dump of that source and swaps them
+    in, so emails removed from a dump no longer match.
+    """
+
+    def __init__(self, file_path: str = DEFAULT_CORPUS_FILE, read_only: bool = True, batch_size: int = 100000) -> None:
+        """CorpusIndex class constructor
+
+        Args:
+            file_path (str): path of the sqlite database file
+            read_only (bool): open the index for lookups only
+            batch_size (int): emails inserted per transaction while indexing
+
+        Returns:
+            None
+        """
+        self.file_path = file_path
+        self.read_only = read_only
+        self.batch_size = batch_size
+
+        self._db = None
+        self._sources: dict[int, str] = {}
+
+    def __enter__(self) -> "CorpusIndex":
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def open(self) -> None:
+        if self._db is not None:
+            return
+
+        if self.read_only:
+            if not isfile(self.file_path):
+                raise FileNotFoundError(f'Breach corpus {self.file_path} not found, create it with: breach-check index <dump files>')
+            self._db = connect(f'file:{self.file_path}?mode=ro', uri=True, check_same_thread=False)
+        else:
+            corpus_dir = dirname(self.file_path)
+            if corpus_dir:
+                makedirs(corpus_dir, exist_ok=True)
+            self._db = connect(self.file_path)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._db.executescript(
+                '''CREATE TABLE IF NOT EXISTS sources (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL UNIQUE
+                );
+                CREATE TABLE IF NOT EXISTS breaches (
+                    email_hash INTEGER NOT NULL,
+                    source_id INTEGER NOT NULL,
+                    PRIMARY KEY (email_hash, source_id)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS dumps (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    source_id INTEGER NOT NULL,
+                    records INTEGER NOT NULL,
+                    indexed_at REAL NOT NULL
+                );'''
+            )
+
+        # let the OS page cache serve the B-tree instead of sqlite's own cache
+        self._db.execute('PRAGMA mmap_size=1073741824')
+        self._sources = dict(self._db.execute('SELECT id, name FROM sources'))
+
+    def close(self) -> None:
+        if self._db is None:
+            return
+
+        if not self.read_only:
+            self._db.commit()
+        self._db.close()
+        self._db = None
+
+    def _source_id(self, name: str) -> int:
+        self._db.execute('INSERT OR IGNORE INTO sources (name) VALUES (?)', (name,))
+        source_id = self._db.execute('SELECT id FROM sources WHERE name = ?', (name,)).fetchone()[0]
+        self._sources[source_id] = name
+        return source_id
+
+    def _insert(self, digests: set[int], source_id: int, table: str = 'breaches') -> None:
+        # sorted keys fill B-tree pages sequentially instead of at random
+        self._db.executemany(
+            f'INSERT OR IGNORE INTO {table} (email_hash, source_id) VALUES (?, ?)',
+            ((digest, source_id) for digest in sorted(digests))
+        )
+        self._db.commit()
+
+    def _read_dump(self, path: str, source_id: int, table: str = 'breaches') -> int:
+        records = 0
+        digests: set[int] = set()
+        with open_input_file(path) as f:
+            for line in f:
+                if (match := EMAIL_IN_RECORD.search(line)) is None:
+                    continue
+
+                records += 1
+                digests.add(email_digest(match.group()))
+                if len(digests) >= self.batch_size:
+                    self._insert(digests, source_id, table)
+                    digests.clear()
+
+        self._insert(digests, source_id, table)
+        return records
+
+    def _rebuild_sources(self, path: str, source_id: int, previous_source_id: int) -> int:
+        """
+        Reads a changed dump and the other dumps of its current and previous
+        source into a fresh table, then replaces the rows of these sources
+        with it in a single transaction.
+
+        Returns:
+            int: number of records read from the changed dump
+        """
+        self._db.execute(
+            '''CREATE TEMP TABLE IF NOT EXISTS rebuilt (
+                email_hash INTEGER NOT NULL,
+                source_id INTEGER NOT NULL,
+                PRIMARY KEY (email_hash, source_id)
+            ) WITHOUT ROWID'''
+        )
+        self._db.execute('DELETE FROM rebuilt')
+
+        records = self._read_dump(path, source_id, 'rebuilt')
+        sources = (source_id, previous_source_id)
+        other_dumps = self._db.execute(
+            'SELECT path, source_id FROM dumps WHERE source_id IN (?, ?) AND path != ?', (*sources, path)
+        ).fetchall()
+        for other_path, other_source_id in other_dumps:
+            if isfile(other_path):
+                self._read_dump(other_path, other_source_id, 'rebuilt')
+            else:
+                logger.warning('%s is no longer available, removing its emails from the corpus', other_path)
+                self._db.execute('DELETE FROM dumps WHERE path = ?', (other_path,))
+
+        self._db.execute('DELETE FROM breaches WHERE source_id IN (?, ?)', sources)
+        self._db.execute('INSERT INTO breaches (email_hash, source_id) SELECT email_hash, source_id FROM rebuilt ORDER BY email_hash, source_id')
+        self._db.commit()
+        self._db.execute('DELETE FROM rebuilt')
+        self._db.commit()
+        return records
+
+    def add_dump(self, file_path: str, source: str | None = None, reindex: bool = False) -> int:
+        """
+        Indexes the emails of a breach dump, one record per line. The first
+        email of every line is indexed, so CSV, combo lists (email:password)
+        and plain email lists are supported, optionally gzip/bz2/xz compressed.
+
+        Args:
+            file_path (str): path of the dump file
+            source (str | None): breach source reported for its emails, defaults to the file name
+            reindex (bool): index the dump even if it was indexed before
+
+        Returns:
+            int: number of records read from the dump, 0 if it was skipped
+        """
+        path = abspath(file_path)
+        file_stat = stat(path)
+        row = self._db.execute('SELECT size, mtime, source_id FROM dumps WHERE path = ?', (path,)).fetchone()
+        if not reindex and row and row[:2] == (file_stat.st_size, file_stat.st_mtime):
+            logger.info('Skipping %s, already indexed', file_path)
+            return 0
+
+        source = source or basename(path).split('.', 1)[0]
+        source_id = self._source_id(source)
+
+        if row is None:
+            records = self._read_dump(path, source_id)
+        else:
+            # emails may have left the dump, adding its current emails would keep matching them
+            records = self._rebuild_sources(path, source_id, previous_source_id=row[2])
+
+        self._db.execute(
+            'INSERT OR REPLACE INTO dumps (path, size, mtime, source_id, records, indexed_at) VALUES (?, ?, ?, ?, ?, ?)',
+            (path, file_stat.st_size, file_stat.st_mtime, source_id, records, time())
+        )
+        self._db.commit()
+        logger.info('Indexed %d records of %s as %s', records, file_path, source)
+        return records
+
+    def lookup(self, emails: list[str]) -> dict[str, list[str]]:
+        """
+        Returns the breach sources of the emails found in the corpus.
+
+        Args:
+            emails (list[str]): email addresses, at most a few thousand per call
+
+        Returns:
+            dict[str, list[str]]: breach sources keyed by email, emails not found are omitted
+        """
+        digests: dict[int, list[str]] = {}
+        for email in emails:
+            digests.setdefault(email_digest(email), []).append(email)
+
+        found: dict[str, list[str]] = {}
+        rows = self._db.execute(
+            f'SELECT email_hash, source_id FROM breaches WHERE email_hash IN ({",".join("?" * len(digests))})',
+            tuple(digests)
+        )
+        for digest, source_id in rows:
+            for email in digests[digest]:
+                found.setdefault(email, []).append(self._sources.get(source_id, str(source_id)))
+
+        return found
+
+    def log_stats(self) -> None:
+        emails, = self._db.execute('SELECT COUNT(DISTINCT email_hash) FROM breaches').fetchone()
+        dumps, = self._db.execute('SELECT COUNT(*) FROM dumps').fetchone()
+        logger.info('Corpus %s: %d emails from %d dumps and %d sources', self.file_path, emails, dumps, len(self._sources))
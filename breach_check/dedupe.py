@@ -0,0 +1,265 @@
+"""
+module for canonicalizing and deduplicating input emails before they are checked
+"""
+from collections import OrderedDict
+from collections.abc import Iterable
+from hashlib import blake2b
+from math import ceil, log
+
+from breach_check.logger import logger
+
+
+# providers delivering plus tagged and dotted variants of an address to the same mailbox
+DEFAULT_PLUS_TAG_DOMAINS = ('gmail.com', 'googlemail.com', 'outlook.com', 'hotmail.com', 'live.com', 'protonmail.com', 'proton.me', 'fastmail.com', 'icloud.com')
+DEFAULT_DOT_DOMAINS = ('gmail.com', 'googlemail.com')
+
+
+class BloomFilter:
+    """
+    Fixed size probabilistic set. Membership tests may return false
+    positives at roughly `error_rate` once `capacity` items are added, but
+    never false negatives.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 1e-6) -> None:
+        self.size = max(8, ceil(-capacity * log(error_rate) / log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * log(2)))
+        self._bits = bytearray(ceil(self.size / 8))
+
+    def _positions(self, item: str):
+        digest = blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size
+
+    def add(self, item: str) -> bool:
+        """
+        Adds an item to the filter.
+
+        Args:
+            item (str): item to add
+
+        Returns:
+            bool: True if the item was (probably) already present
+        """
+        present = True
+        for position in self._positions(item):
+            byte, bit = divmod(position, 8)
+            if not self._bits[byte] & (1 << bit):
+                present = False
+                self._bits[byte] |= 1 << bit
+
+        return present
+
+
+class HashSet:
+    """
+    Exact set storing 64 bit digests of items instead of the items themselves.
+    """
+
+    def __init__(self) -> None:
+        self._digests: set[int] = set()
+
+    def add(self, item: str) -> bool:
+        digest = int.from_bytes(blake2b(item.encode(), digest_size=8).digest(), 'little')
+        if digest in self._digests:
+            return True
+
+        self._digests.add(digest)
+        return False
+
+
+class EmailDeduplicator:
+    """
+    Canonicalizes emails so that variants of the same address are checked
+    only once, and keeps track of the input lines waiting for a result.
+
+    Emails are lowercased; plus tags (`user+tag@`) and dots in the local
+    part are dropped for the configured domains (`*` matches every domain).
+    Seen addresses are tracked in a set of 64 bit digests, or in a fixed
+    size Bloom filter when `bloom_capacity` is given. The Bloom filter keeps
+    memory constant for very large inputs, but a hit may be a false
+    positive, so addresses it reports as seen are only skipped while their
+    result is still known. Others are checked again and counted as
+    `rechecked`.
+
+    Results are fanned out to duplicates of addresses still being checked.
+    Duplicates of completed addresses reuse the last `recent_results`
+    results, older ones are emitted with a `duplicate_of` reference.
+    """
+
+    def __init__(
+        self,
+        fold_plus_tags: Iterable[str] = (),
+        fold_dots: Iterable[str] = (),
+        bloom_capacity: int | None = None,
+        bloom_error_rate: float = 1e-6,
+        recent_results: int = 10000,
+    ) -> None:
+        """EmailDeduplicator class constructor
+
+        Args:
+            fold_plus_tags (Iterable[str]): domains whose plus tags are removed
+            fold_dots (Iterable[str]): domains whose local part dots are removed
+            bloom_capacity (int | None): expected number of unique emails, enables the Bloom filter
+            bloom_error_rate (float): false positive rate of the Bloom filter
+            recent_results (int): number of completed results kept for late duplicates
+
+        Returns:
+            None
+        """
+        self.fold_plus_tags = frozenset(domain.lower() for domain in fold_plus_tags)
+        self.fold_dots = frozenset(domain.lower() for domain in fold_dots)
+        self.bloom_capacity = bloom_capacity
+        self.bloom_error_rate = bloom_error_rate
+        self.recent_results = recent_results
+        self.reset()
+
+    def spawn(self) -> 'EmailDeduplicator':
+        """
+        Returns a deduplicator with the same settings and no seen emails,
+        so concurrent runs never share their state.
+
+        Returns:
+            EmailDeduplicator: new deduplicator
+        """
+        return type(self)(
+            fold_plus_tags=self.fold_plus_tags,
+            fold_dots=self.fold_dots,
+            bloom_capacity=self.bloom_capacity,
+            bloom_error_rate=self.bloom_error_rate,
+            recent_results=self.recent_results,
+        )
+
+    def add_stats(self, other: 'EmailDeduplicator') -> None:
+        """Adds the statistics of a finished run to this deduplicator"""
+        self.unique += other.unique
+        self.duplicates += other.duplicates
+        self.invalid += other.invalid
+        self.rechecked += other.rechecked
+
+    def reset(self) -> None:
+        """Forgets seen emails and statistics"""
+        if self.bloom_capacity:
+            self._seen = BloomFilter(self.bloom_capacity, self.bloom_error_rate)
+        else:
+            self._seen = HashSet()
+
+        self._aliases: dict[str, list[str]] = {}
+        self._recent: OrderedDict[str, dict] = OrderedDict()
+
+        self.unique = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.rechecked = 0
+
+    @staticmethod
+    def _matches(domain: str, domains: frozenset[str]) -> bool:
+        return '*' in domains or domain in domains
+
+    def canonicalize(self, email: str) -> str:
+        """
+        Returns the canonical form of a valid email address.
+
+        Args:
+            email (str): email address
+
+        Returns:
+            str: canonical email address
+        """
+        local_part, _, domain = email.strip().lower().rpartition('@')
+
+        if self._matches(domain, self.fold_plus_tags):
+            local_part = local_part.split('+', 1)[0]
+        if self._matches(domain, self.fold_dots):
+            local_part = local_part.replace('.', '')
+
+        return f'{local_part}@{domain}'
+
+    def track(self, canonical_email: str, email: str) -> bool:
+        """
+        Registers an input email under its canonical address.
+
+        Args:
+            canonical_email (str): canonical address returned by canonicalize
+            email (str): email as read from the input
+
+        Returns:
+            bool: True if the canonical address must be dispatched, False for duplicates
+        """
+        if aliases := self._aliases.get(canonical_email):
+            aliases.append(email)
+            self.duplicates += 1
+            return False
+
+        if self._seen.add(canonical_email):
+            if self.bloom_capacity and canonical_email not in self._recent:
+                # possibly a false positive of the Bloom filter, never skip an address without a known result
+                self.rechecked += 1
+            else:
+                self.duplicates += 1
+                return False
+
+        self._aliases[canonical_email] = [email]
+        self.unique += 1
+        return True
+
+    def is_pending(self, canonical_email: str) -> bool:
+        """Returns True if the canonical address is still being checked"""
+        return canonical_email in self._aliases
+
+    @staticmethod
+    def for_email(result: dict | None, email: str) -> dict | None:
+        """Returns a copy of the result addressed to an input email"""
+        if not result or result.get('email') == email:
+            return result
+
+        return {**result, 'email': email}
+
+    def fan_out(self, canonical_email: str, result: dict | None) -> list[tuple[str, dict | None]]:
+        """
+        Completes a canonical address, returning its result for every input
+        email tracked under it.
+
+        Args:
+            canonical_email (str): canonical address that was checked
+            result (dict | None): result of the check
+
+        Returns:
+            list[tuple[str, dict | None]]: input email and its result for every tracked input email
+        """
+        if self.recent_results and result:
+            self._recent[canonical_email] = result
+            if len(self._recent) > self.recent_results:
+                self._recent.popitem(last=False)
+
+        return [
+            (email, self.for_email(result, email))
+            for email in self._aliases.pop(canonical_email, ())
+        ]
+
+    def resolve_duplicate(self, canonical_email: str, email: str) -> dict:
+        """
+        Returns the result for a duplicate of an already completed address.
+
+        Args:
+            canonical_email (str): canonical address of the duplicate
+            email (str): email as read from the input
+
+        Returns:
+            dict: the recent result if still known, otherwise a reference to the canonical address
+        """
+        if result := self._recent.get(canonical_email):
+            self._recent.move_to_end(canonical_email)
+            return self.for_email(result, email)
+
+        return {'email': email, 'duplicate_of': canonical_email}
+
+    def log_stats(self) -> None:
+        logger.info(
+            'Unique emails: %d, duplicate lines: %d, invalid lines: %d',
+            self.unique, self.duplicates, self.invalid
+        )
+        if self.rechecked:
+            logger.info('Emails checked again after a Bloom filter hit without a known result: %d', self.rechecked)
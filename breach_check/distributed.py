@@ -0,0 +1,422 @@
+"""
+module for spreading a scan over several machines: a coordinator serves
+batches of emails over HTTP, worker nodes lease them, check them with their
+own BreachChecker and acknowledge the results.
+"""
+from asyncio import Event, Semaphore, create_task, gather, sleep
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass
+from hmac import compare_digest
+from ipaddress import ip_address
+from itertools import count
+from os import getpid
+from socket import gethostname
+from time import monotonic
+from uuid import uuid4
+
+from aiohttp import ClientError, ClientResponseError, ClientSession, ClientTimeout, web
+
+from breach_check.breach import BreachChecker, is_valid_email
+from breach_check.dedupe import EmailDeduplicator
+from breach_check.journal import Journal
+from breach_check.logger import logger
+from breach_check.metrics import metrics
+from breach_check.progress import RunProgress
+from breach_check.results import StreamingResultWriter
+from breach_check.summary import BreachSummary
+from breach_check.workers import CheckerConfig
+
+
+TOKEN_HEADER = 'X-Breach-Check-Token'
+# seconds idle worker nodes wait before asking for a lease again
+WAIT_INTERVAL = 1.0
+
+
+def is_loopback(host: str) -> bool:
+    """
+    Tells whether a host to bind is only reachable from this machine.
+
+    Args:
+        host (str): host name or IP address
+
+    Returns:
+        bool: True for localhost and loopback addresses
+    """
+    if host == 'localhost':
+        return True
+    try:
+        return ip_address(host.strip('[]')).is_loopback
+    except ValueError:
+        return False
+
+
+@dataclass
+class Lease:
+    batch_id: int
+    worker: str
+    deadline: float
+
+
+class Coordinator:
+    """
+    Serves the input in batches of canonical emails to worker nodes and
+    writes their results.
+
+    Workers lease a batch, check it and acknowledge it with its results.
+    Leases not acknowledged or renewed within `lease_timeout` seconds are
+    handed to the next worker asking for work, so batches of dead workers
+    are checked again. The first acknowledgement of a batch wins.
+
+    Every lease tells the worker its share of the backend request budgets,
+    one over the number of workers seen within the lease timeout, so the
+    nodes together stay within the backend rate limits.
+
+    Endpoints (JSON bodies):
+        GET /config: backends and rate limit the workers must use
+        POST /lease {"worker"}: a batch, {"wait": seconds} or {"done": true}
+        POST /renew {"lease_id"}: extends a lease
+        POST /ack {"lease_id", "batch_id", "results"}: completes a batch
+    """
+
+    def __init__(
+        self,
+        emails: Iterable[str],
+        writer: StreamingResultWriter,
+        journal: Journal | None = None,
+        deduplicator: EmailDeduplicator | None = None,
+        checker_options: dict | None = None,
+        batch_size: int = 500,
+        lease_timeout: float = 120,
+        token: str | None = None,
+        show_progress: bool = True,
+        summary_rows: int = 50,
+    ) -> None:
+        """Coordinator class constructor
+
+        Args:
+            emails (Iterable[str]): email addresses to check
+            writer (StreamingResultWriter): opened writer receiving the results
+            journal (Journal | None): opened journal recording completed checks
+            deduplicator (EmailDeduplicator | None): canonicalization and deduplication of input emails
+            checker_options (dict | None): backend and rate_limit sent to the workers
+            batch_size (int): number of emails per lease
+            lease_timeout (float): seconds after which a lease which was not renewed is reassigned
+            token (str | None): shared secret workers must send, None to accept every worker on loopback hosts only
+            show_progress (bool): render a progress bar of the completed emails
+            summary_rows (int): breached emails kept in the summary for display
+
+        Returns:
+            None
+        """
+        self.writer = writer
+        self.journal = journal
+        self.deduplicator = deduplicator or EmailDeduplicator()
+        self.batch_size = batch_size
+        self.lease_timeout = lease_timeout
+        self.token = token
+        self.progress = RunProgress(enabled=show_progress)
+        self.summary_rows = summary_rows
+
+        checker_options = checker_options or {}
+        self.remote_config = {
+            'backend': [getattr(backend, 'value', backend) for backend in checker_options.get('backend', ['leakcheck'])],
+            'rate_limit': checker_options.get('rate_limit'),
+        }
+        # backends are only used to summarize results, they never send requests
+        self._backends = BreachChecker(
+            backend=self.remote_config['backend'],
+            show_progress=False,
+            summary_rows=summary_rows,
+        ).backends
+        self.summary = BreachSummary(max_rows=summary_rows)
+
+        self._emails = iter(emails)
+        self._input_exhausted = False
+        self._batch_ids = count()
+        self._batches: dict[int, list[str]] = {}
+        self._requeued: deque[int] = deque()
+        self._leases: dict[str, Lease] = {}
+        self._workers: dict[str, float] = {}
+        self._runner: web.AppRunner | None = None
+        self.finished = Event()
+
+    def create_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._authenticate], client_max_size=64 * 1024 ** 2)
+        app.router.add_get('/config', self.handle_config)
+        app.router.add_post('/lease', self.handle_lease)
+        app.router.add_post('/renew', self.handle_renew)
+        app.router.add_post('/ack', self.handle_ack)
+        return app
+
+    @web.middleware
+    async def _authenticate(self, request: web.Request, handler):
+        if self.token and not compare_digest(request.headers.get(TOKEN_HEADER, '').encode(), self.token.encode()):
+            return web.json_response({'error': 'invalid token'}, status=403)
+        return await handler(request)
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8765) -> None:
+        """
+        Starts serving workers from the running event loop
+
+        Raises:
+            ValueError: when binding a non-loopback host without a token
+        """
+        if not self.token:
+            if not is_loopback(host):
+                raise ValueError(f'Refusing to serve {host} without a token, anyone reaching it could lease emails')
+            logger.warning('Coordinator runs without a token, every local process can lease emails and upload results')
+        self.progress.start()
+        self._runner = web.AppRunner(self.create_app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        logger.info('Coordinator listening on http://%s:%d', host, port)
+
+    async def stop(self) -> None:
+        self.progress.stop()
+        if self._runner:
+            # let idle worker nodes learn that the scan is done before going away
+            if self.finished.is_set():
+                await sleep(WAIT_INTERVAL * 2)
+            await self._runner.cleanup()
+            self._runner = None
+
+        self.summary = BreachSummary.merged(
+            (backend.summary for backend in self._backends),
+            max_rows=self.summary_rows
+        )
+
+    @property
+    def is_complete(self) -> bool:
+        return self._input_exhausted and not self._batches
+
+    def _active_workers(self, now: float) -> int:
+        for worker, last_seen in list(self._workers.items()):
+            if now - last_seen > self.lease_timeout:
+                del self._workers[worker]
+        return max(1, len(self._workers))
+
+    def _expire_leases(self, now: float) -> None:
+        for lease_id, lease in list(self._leases.items()):
+            if lease.deadline < now:
+                del self._leases[lease_id]
+                if lease.batch_id in self._batches:
+                    logger.warning('Lease of batch %d by %s expired, reassigning it', lease.batch_id, lease.worker)
+                    metrics.inc('expired_leases_total')
+                    self._requeued.append(lease.batch_id)
+
+    def _write(self, result: dict | None) -> None:
+        # journaled first, writing may sync and checkpoint the output including this record
+        if self.journal:
+            self.journal.record(result)
+        self.writer.write(result)
+        self.progress.advance()
+
+    def _summarize(self, result: dict | None) -> None:
+        if not result:
+            return
+
+        if len(self._backends) == 1:
+            self._backends[0].add_result_schema(result)
+            return
+
+        for backend in self._backends:
+            backend.add_result_schema(result.get('backends', {}).get(backend.name))
+
+    def _next_batch(self) -> int | None:
+        while self._requeued:
+            batch_id = self._requeued.popleft()
+            # skip batches acknowledged by a late worker after being requeued
+            if batch_id in self._batches:
+                return batch_id
+
+        if self._input_exhausted:
+            return None
+
+        batch = []
+        for email in self._emails:
+            if not is_valid_email(email):
+                logger.warning('%s is not a valid email', email)
+                self.deduplicator.invalid += 1
+                continue
+
+            canonical_email = self.deduplicator.canonicalize(email)
+            if not self.deduplicator.track(canonical_email, email):
+                # duplicates of pending emails receive their result once it completes
+                if not self.deduplicator.is_pending(canonical_email):
+                    self._write(self.deduplicator.resolve_duplicate(canonical_email, email))
+                continue
+
+            batch.append(canonical_email)
+            if len(batch) >= self.batch_size:
+                break
+        else:
+            self._input_exhausted = True
+
+        if not batch:
+            return None
+
+        batch_id = next(self._batch_ids)
+        self._batches[batch_id] = batch
+        return batch_id
+
+    async def handle_config(self, request: web.Request) -> web.Response:
+        return web.json_response(self.remote_config)
+
+    async def handle_lease(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        worker = str(body.get('worker', request.remote))
+        now = monotonic()
+        self._workers[worker] = now
+        self._expire_leases(now)
+
+        batch_id = self._next_batch()
+        if batch_id is None:
+            if self.is_complete:
+                self.finished.set()
+                return web.json_response({'done': True})
+            # remaining batches are leased, wait in case their workers die
+            return web.json_response({'wait': min(WAIT_INTERVAL, self.lease_timeout / 4)})
+
+        lease_id = uuid4().hex
+        self._leases[lease_id] = Lease(batch_id=batch_id, worker=worker, deadline=now + self.lease_timeout)
+        metrics.inc('leases_total')
+        return web.json_response({
+            'lease_id': lease_id,
+            'batch_id': batch_id,
+            'emails': self._batches[batch_id],
+            'lease_timeout': self.lease_timeout,
+            'rate_share': 1 / self._active_workers(now),
+        })
+
+    async def handle_renew(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        lease = self._leases.get(body.get('lease_id'))
+        if lease is None:
+            return web.json_response({'ok': False})
+
+        now = monotonic()
+        lease.deadline = now + self.lease_timeout
+        self._workers[lease.worker] = now
+        return web.json_response({'ok': True, 'rate_share': 1 / self._active_workers(now)})
+
+    async def handle_ack(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        self._leases.pop(body.get('lease_id'), None)
+
+        # acknowledgements of expired leases are accepted until another worker completes the batch
+        emails = self._batches.get(body.get('batch_id'))
+        results = body.get('results')
+        if emails is None:
+            return web.json_response({'ok': False})
+        if not isinstance(results, list) or len(results) != len(emails):
+            return web.json_response({'error': 'expected one result per leased email'}, status=400)
+
+        del self._batches[body['batch_id']]
+        for canonical_email, result in zip(emails, results):
+            self._summarize(result)
+            for _, email_result in self.deduplicator.fan_out(canonical_email, result):
+                self._write(email_result)
+
+        if self.is_complete:
+            self.finished.set()
+
+        return web.json_response({'ok': True})
+
+    def log_stats(self) -> None:
+        self.deduplicator.log_stats()
+        logger.info(
+            'Leases: %d, expired leases: %d',
+            metrics.total('leases_total'), metrics.total('expired_leases_total')
+        )
+
+
+async def run_node(coordinator_url: str, config: CheckerConfig, parallel_leases: int = 2, token: str | None = None, connect_attempts: int = 30) -> BreachChecker:
+    """
+    Checks batches leased from a coordinator until the scan is done.
+
+    Args:
+        coordinator_url (str): base URL of the coordinator
+        config (CheckerConfig): local BreachChecker configuration, backends and rate limit are taken from the coordinator
+        parallel_leases (int): batches checked at the same time, so a slow batch tail does not idle the node
+        token (str | None): shared secret expected by the coordinator
+        connect_attempts (int): consecutive failed calls to the coordinator before giving up
+
+    Returns:
+        BreachChecker: checker used by the node, e.g. to log its statistics
+    """
+    coordinator_url = coordinator_url.rstrip('/')
+    worker = f'{gethostname()}-{getpid()}'
+    headers = {TOKEN_HEADER: token} if token else None
+
+    async with ClientSession(headers=headers, timeout=ClientTimeout(total=60)) as session:
+        async def call(method: str, path: str, payload: dict | None = None) -> dict:
+            for attempt in range(1, connect_attempts + 1):
+                try:
+                    async with session.request(method, f'{coordinator_url}{path}', json=payload) as response:
+                        response.raise_for_status()
+                        return await response.json()
+                except (ClientError, TimeoutError) as e:
+                    # e.g. an invalid token, retrying does not help
+                    if isinstance(e, ClientResponseError) and e.status < 500:
+                        raise
+                    if attempt == connect_attempts:
+                        raise
+                    logger.warning('Coordinator call %s failed (%s), retrying', path, e)
+                    await sleep(min(10, attempt))
+
+        remote_config = await call('GET', '/config')
+        cache = config.create_cache()
+        breach_checker = config.create(cache=cache, show_progress=False, **remote_config)
+        semaphore = Semaphore(breach_checker.concurrency)
+
+        async def check(email: str) -> dict | None:
+            async with semaphore:
+                try:
+                    return await breach_checker.check(email)
+                except Exception as e:
+                    logger.error('Check failed for %s: %s', email, str(e))
+                    return None
+
+        async def renew(lease_id: str, interval: float) -> None:
+            while True:
+                await sleep(interval)
+                renewal = await call('POST', '/renew', {'lease_id': lease_id})
+                if renewal.get('ok'):
+                    breach_checker.set_rate_share(renewal['rate_share'])
+
+        done = Event()
+
+        async def lease_loop() -> None:
+            while not done.is_set():
+                lease = await call('POST', '/lease', {'worker': worker})
+                if lease.get('done'):
+                    done.set()
+                    return
+                if 'wait' in lease:
+                    await sleep(lease['wait'])
+                    continue
+
+                breach_checker.set_rate_share(lease['rate_share'])
+                renewal = create_task(renew(lease['lease_id'], lease['lease_timeout'] / 3))
+                try:
+                    results = await gather(*(check(email) for email in lease['emails']))
+                finally:
+                    renewal.cancel()
+
+                await call('POST', '/ack', {
+                    'lease_id': lease['lease_id'],
+                    'batch_id': lease['batch_id'],
+                    'results': results,
+                })
+
+        try:
+            # closes the connection pool, backends and shared lookups of the node
+            async with breach_checker:
+                logger.info('Joined coordinator %s as %s', coordinator_url, worker)
+                await gather(*(lease_loop() for _ in range(parallel_leases)))
+        finally:
+            if cache:
+                cache.close()
+
+    return breach_checker
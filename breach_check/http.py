@@ -2,13 +2,19 @@
 module for interacting with HTTP layer
 """
 import asyncio
-from random import choice
+import logging
+from random import choices
 from os import name as os_name
+from time import monotonic, perf_counter
 from urllib.parse import urlparse
 
-from aiohttp import ClientSession, ClientTimeout
+from aiohttp import ClientConnectionError, ClientSession, ClientTimeout, TCPConnector
 from aiolimiter import AsyncLimiter
-from tenacity import retry, stop_after_attempt, retry_if_not_exception_type
+
+from breach_check.logger import logger
+from breach_check.metrics import metrics
+from breach_check.ratelimit import AdaptiveRateLimiter, parse_retry_after
+from breach_check.retry import RetryableStatusError, RetryPolicy
 
 import aiohttp.resolver
 aiohttp.resolver.DefaultResolver = aiohttp.resolver.AsyncResolver
@@ -16,23 +22,102 @@ if os_name == "nt":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
 
+class ProxyState:
+    """
+    Health of a single proxy: latency, error counts and cool down.
+    """
+
+    def __init__(self, url: str, rate_limit: float | None = None) -> None:
+        self.url = url
+        parsed_url = urlparse(url)
+        # never expose proxy credentials in logs or metrics
+        self.label = f'{parsed_url.hostname}:{parsed_url.port}' if parsed_url.port else str(parsed_url.hostname)
+        self.limiter = AsyncLimiter(max_rate=rate_limit, time_period=1) if rate_limit else None
+
+        self.latency = 1.0
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.cooldowns = 0
+        self.cooldown_until = 0.0
+
+    @property
+    def success_ratio(self) -> float:
+        # smoothed so new proxies start at 0.5 instead of being ignored or trusted blindly
+        return (self.successes + 1) / (self.successes + self.failures + 2)
+
+    @property
+    def weight(self) -> float:
+        return self.success_ratio / max(self.latency, 0.001)
+
+    def is_available(self, now: float) -> bool:
+        return now >= self.cooldown_until
+
+
 class Proxies:
     """
     class for handling proxies
+
+    Requests are spread over the proxies with a weighted random choice
+    favouring proxies with low latency and few errors. A proxy failing
+    `max_failures` times in a row is cooled down for `cooldown` seconds,
+    doubled on every consecutive cool down up to `max_cooldown`. Each proxy
+    can have its own rate limit.
     """
 
-    def __init__(self, proxies: list[str] | None) -> None:
-        self.p_list = proxies
+    def __init__(self, proxies: list[str] | str | None, rate_limit: float | None = None, max_failures: int = 3, cooldown: float = 10, max_cooldown: float = 600) -> None:
+        """Proxies class constructor
+
+        Args:
+            proxies (list[str] | str | None): proxy URLs, invalid URLs are skipped
+            rate_limit (float | None): requests per second sent through each proxy, None for unlimited
+            max_failures (int): consecutive failures before a proxy is cooled down
+            cooldown (float): seconds of the first cool down of a failing proxy
+            max_cooldown (float): upper bound of a single cool down in seconds
+
+        Returns:
+            None
+        """
+        if isinstance(proxies, str):
+            proxies = [proxies]
+
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+
+        self.p_list = []
+        for proxy_url in proxies or []:
+            if self.validate_proxy(proxy_url):
+                self.p_list.append(proxy_url)
+            else:
+                logger.warning('Skipping invalid proxy URL: %s', proxy_url)
+
+        self.pool = [ProxyState(proxy_url, rate_limit=rate_limit) for proxy_url in self.p_list]
+        self.is_checked = False
+
+    @staticmethod
+    def load(file_path: str) -> list[str]:
+        """
+        Reads proxy URLs from a file, one per line, skipping blank and # comment lines.
+
+        Args:
+            file_path (str): path of the proxy list
+
+        Returns:
+            list[str]: proxy URLs
+        """
+        with open(file_path) as f:
+            return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
 
     def validate_proxy(self, proxy_url: str | None):
         """
-        Validates a proxy URL based on format and attempts a basic connection.
+        Validates a proxy URL based on format.
 
         Args:
             proxy_url: The URL of the proxy server.
 
         Returns:
-            True if the proxy URL seems valid and a basic connection can be established, False otherwise.
+            True if the proxy URL seems valid, False otherwise.
         """
         # Check for valid URL format
         # TODO: implement url parse security: https://docs.python.org/3/library/urllib.parse.html#url-parsing-security
@@ -42,13 +127,94 @@ class Proxies:
 
         return False
 
-    def get_random_proxy(self) -> str | None:
+    async def check_connectivity(self, timeout: float = 5) -> None:
+        """
+        Drops proxies which do not accept TCP connections. Must be called
+        from within a running event loop.
+
+        Args:
+            timeout (float): seconds to wait for each connection
+
+        Raises:
+            ConnectionError: If none of the proxies is reachable.
+        """
+        async def is_reachable(proxy: ProxyState) -> bool:
+            parsed_url = urlparse(proxy.url)
+            port = parsed_url.port or (443 if parsed_url.scheme == 'https' else 80)
+            try:
+                _, writer = await asyncio.wait_for(asyncio.open_connection(parsed_url.hostname, port), timeout)
+            except (OSError, asyncio.TimeoutError):
+                logger.warning('Proxy %s is unreachable, skipping it', proxy.label)
+                return False
+
+            writer.close()
+            return True
+
+        self.is_checked = True
+        if not self.pool:
+            return
+
+        reachable = await asyncio.gather(*(is_reachable(proxy) for proxy in self.pool))
+        self.pool = [proxy for proxy, is_up in zip(self.pool, reachable) if is_up]
+        self.p_list = [proxy.url for proxy in self.pool]
+        if not self.pool:
+            raise ConnectionError('None of the proxies is reachable')
+
+        logger.info('Using %d proxies', len(self.pool))
+
+    def select(self) -> ProxyState | None:
         """
-        Returns random proxy from the list
+        Returns a proxy chosen with a probability proportional to its
+        weight, preferring proxies which are not cooling down.
         """
-        if not self.p_list:
+        if not self.pool:
             return None
-        return choice(self.p_list)
+
+        now = monotonic()
+        available = [proxy for proxy in self.pool if proxy.is_available(now)]
+        if not available:
+            # every proxy is cooling down, use the one recovering first
+            return min(self.pool, key=lambda proxy: proxy.cooldown_until)
+
+        return choices(available, weights=[proxy.weight for proxy in available])[0]
+
+    def get_random_proxy(self) -> str | None:
+        """
+        Returns a proxy URL from the pool
+        """
+        proxy = self.select()
+        return proxy.url if proxy else None
+
+    def on_success(self, proxy: ProxyState, latency: float) -> None:
+        proxy.successes += 1
+        proxy.consecutive_failures = 0
+        proxy.cooldowns = 0
+        # exponentially weighted moving average of the latency
+        proxy.latency = 0.8 * proxy.latency + 0.2 * latency
+
+    def on_failure(self, proxy: ProxyState) -> None:
+        proxy.failures += 1
+        proxy.consecutive_failures += 1
+        metrics.inc('proxy_failures_total', proxy=proxy.label)
+
+        now = monotonic()
+        if not proxy.is_available(now):
+            # requests sent before the cool down are still failing
+            proxy.consecutive_failures = 0
+        elif proxy.consecutive_failures >= self.max_failures:
+            delay = min(self.max_cooldown, self.cooldown * 2 ** proxy.cooldowns)
+            proxy.cooldowns += 1
+            proxy.consecutive_failures = 0
+            proxy.cooldown_until = now + delay
+            metrics.inc('proxy_cooldowns_total', proxy=proxy.label)
+            logger.warning('Proxy %s failed %d times in a row, cooling down for %.0fs', proxy.label, self.max_failures, delay)
+
+    def log_stats(self) -> None:
+        for proxy in self.pool:
+            logger.info(
+                'Proxy %s: requests: %d, errors: %d, latency: %.3fs',
+                proxy.label, proxy.successes + proxy.failures, proxy.failures, proxy.latency
+            )
 
 
 class AsyncRequests:
@@ -58,90 +224,215 @@ class AsyncRequests:
 
     def __init__(
         self,
-        rate_limit: float = 50,
+        rate_limit: float | None = 50,
         headers: dict | None = None,
-        proxies: list[str] | None = [],
+        proxies: list[str] | str | None = None,
         allow_redirects: bool = True,
         timeout: float = 60,
         ssl: bool = False,
+        connection_limit: int = 100,
+        connection_limit_per_host: int = 0,
+        keepalive_timeout: float = 30,
+        dns_cache_ttl: int | None = 300,
+        retry_policy: RetryPolicy | None = None,
+        proxy_rate_limit: float | None = None,
     ) -> None:
         """AsyncRequests class constructor
 
         Args:
-            rate_limit (int): number of requests per seconds
+            rate_limit (int | None): global cap on requests per second, None to rely only on per request limiters
             delay (float): delay between consecutive requests
             headers (dict): overrides default headers while sending HTTP requests
-            proxy (str): proxy URL to be used while sending requests
+            proxies (list[str] | str | None): proxy URLs requests are spread over
             timeout (float): total timeout parameter of aiohttp.ClientTimeout
             ssl (bool): enforces tls/ssl verification if True
+            connection_limit (int): total number of simultaneous pooled connections (0 for unlimited)
+            connection_limit_per_host (int): simultaneous connections to the same host (0 for unlimited)
+            keepalive_timeout (float): seconds an idle connection is kept open for reuse
+            dns_cache_ttl (int | None): seconds resolved DNS entries are cached (None caches forever)
+            retry_policy (RetryPolicy | None): retry behaviour for failed requests, defaults to RetryPolicy()
+            proxy_rate_limit (float | None): requests per second sent through each proxy, None for unlimited
 
         Returns:
             None
         """
         self._headers = headers
-        self._proxy = Proxies(proxies=proxies)
+        self._proxy = Proxies(proxies=proxies, rate_limit=proxy_rate_limit)
         self._allow_redirects = allow_redirects
-        self._limiter = AsyncLimiter(max_rate=rate_limit, time_period=1)
+        self._limiter = AsyncLimiter(max_rate=rate_limit, time_period=1) if rate_limit else None
         self._timeout = ClientTimeout(total=timeout)
         self._ssl = ssl
 
-    @retry(
-        stop=stop_after_attempt(3),
-        retry=retry_if_not_exception_type(
-            KeyboardInterrupt or asyncio.exceptions.CancelledError
-        ),
-    )
-    async def request(self, url: str, *args, method: str = "GET", **kwargs) -> dict:
-        """Send HTTP requests asynchronously
+        self._connection_limit = connection_limit
+        self._connection_limit_per_host = connection_limit_per_host
+        self._keepalive_timeout = keepalive_timeout
+        self._dns_cache_ttl = dns_cache_ttl
+        self._session: ClientSession | None = None
+        self._closed = False
+        self.retry_policy = retry_policy or RetryPolicy()
+
+    async def __aenter__(self) -> "AsyncRequests":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    @property
+    def is_open(self) -> bool:
+        """Returns True if the shared session is open"""
+        return self._session is not None and not self._session.closed
+
+    async def open(self) -> ClientSession:
+        """Opens the shared session and its connection pool if not already open.
+        Must be called from within a running event loop.
+
+        Returns:
+            ClientSession: long lived session reused by every request
+        """
+        self._closed = False
+        if not self._proxy.is_checked:
+            await self._proxy.check_connectivity()
+
+        if not self.is_open:
+            connector = TCPConnector(
+                limit=self._connection_limit,
+                limit_per_host=self._connection_limit_per_host,
+                keepalive_timeout=self._keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self._dns_cache_ttl,
+            )
+            self._session = ClientSession(
+                headers=self._headers,
+                timeout=self._timeout,
+                connector=connector,
+            )
+
+        return self._session
+
+    async def close(self) -> None:
+        """Closes the shared session and releases pooled connections, requests fail until open is called again"""
+        self._closed = True
+        if self.is_open:
+            await self._session.close()
+        self._session = None
+
+    async def request(self, url: str, *args, method: str = "GET", rate_limiter: AdaptiveRateLimiter | None = None, **kwargs) -> dict:
+        """Send HTTP requests asynchronously, retrying failures according
+        to the retry policy
 
         Args:
             url (str): URL of the webpage/endpoint
             method (str): HTTP methods (default: GET) supports GET, POST,
             PUT, HEAD, OPTIONS, DELETE
+            rate_limiter (AdaptiveRateLimiter | None): limiter of the target
+            service, informed of throttled (429) and healthy responses
 
         Returns:
-            dict: returns request and response data as dict
+            dict: returns the status and raw body of the response, request
+            and response details are included when debug logging is
+            enabled. The last response is returned if a retryable status
+            persists
         """
-        async with self._limiter:
-            async with ClientSession(
-                headers=self._headers, timeout=self._timeout
-            ) as session:
-                method = str(method).upper()
-                match method:
-                    case "GET":
-                        req_method = session.get
-                    case "POST":
-                        req_method = session.post
-                    case "PUT":
-                        req_method = session.put
-                    case "PATCH":
-                        req_method = session.patch
-                    case "HEAD":
-                        req_method = session.head
-                    case "OPTIONS":
-                        req_method = session.options
-                    case "DELETE":
-                        req_method = session.delete
-                    case _:
-                        req_method = session.get
-
-                async with req_method(
-                    url,
-                    allow_redirects=self._allow_redirects,
-                    proxy=self._proxy.get_random_proxy(),
-                    ssl=self._ssl,
-                    *args,
-                    **kwargs,
-                ) as response:
-                    resp_data = {
-                        "status": response.status,
+        self.retry_policy.requests += 1
+        try:
+            async for attempt in self.retry_policy.retrying():
+                with attempt:
+                    return await self._send(url, *args, method=method, rate_limiter=rate_limiter, **kwargs)
+        except RetryableStatusError as e:
+            return e.resp_data
+
+    async def _send(self, url: str, *args, method: str = "GET", rate_limiter: AdaptiveRateLimiter | None = None, **kwargs) -> dict:
+        if self._closed:
+            # never reopen a session behind the back of whoever closed it
+            raise RuntimeError('HTTP client is closed')
+        session = await self.open()
+        label = rate_limiter.name if rate_limiter else urlparse(url).hostname
+
+        wait_start = perf_counter()
+        if rate_limiter:
+            await rate_limiter.acquire()
+        if self._limiter:
+            await self._limiter.acquire()
+
+        proxy = self._proxy.select()
+        if proxy and proxy.limiter:
+            await proxy.limiter.acquire()
+        metrics.inc('limiter_wait_seconds_total', perf_counter() - wait_start, backend=label)
+
+        method = str(method).upper()
+        match method:
+            case "GET":
+                req_method = session.get
+            case "POST":
+                req_method = session.post
+            case "PUT":
+                req_method = session.put
+            case "PATCH":
+                req_method = session.patch
+            case "HEAD":
+                req_method = session.head
+            case "OPTIONS":
+                req_method = session.options
+            case "DELETE":
+                req_method = session.delete
+            case _:
+                req_method = session.get
+
+        metrics.inc('http_requests_total', backend=label)
+        request_start = perf_counter()
+        try:
+            async with req_method(
+                url,
+                allow_redirects=self._allow_redirects,
+                proxy=proxy.url if proxy else None,
+                ssl=self._ssl,
+                *args,
+                **kwargs,
+            ) as response:
+                resp_data = {
+                    "status": response.status,
+                    "res_body": await response.read(),
+                }
+                # request and response details are only needed to debug failures
+                if logger.isEnabledFor(logging.DEBUG):
+                    resp_data.update({
                         "req_url": str(response.request_info.real_url),
                         "query_url": str(response.url),
                         "req_method": response.request_info.method,
                         "req_headers": dict(**response.request_info.headers),
                         "res_redirection": str(response.history),
                         "res_headers": dict(response.headers),
-                        "res_body": await response.text(),
-                    }
+                    })
+        except Exception as e:
+            metrics.inc('http_errors_total', backend=label, error=type(e).__name__)
+            if proxy and isinstance(e, (ClientConnectionError, TimeoutError)):
+                self._proxy.on_failure(proxy)
+            raise
+        finally:
+            request_duration = perf_counter() - request_start
+            metrics.observe('http_request_duration_seconds', request_duration, backend=label)
+
+        if proxy:
+            if response.status == 407:
+                # proxy rejected the request, retry it through another proxy
+                self._proxy.on_failure(proxy)
+                raise RetryableStatusError(resp_data)
+            self._proxy.on_success(proxy, request_duration)
+
+        metrics.inc('http_responses_total', backend=label, status=response.status)
+
+        retry_after = None
+        if response.status == 429:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+
+        if rate_limiter:
+            if response.status == 429:
+                rate_limiter.on_throttled(retry_after)
+            elif response.status < 500:
+                rate_limiter.on_success()
+
+        if self.retry_policy.is_retryable_status(response.status):
+            raise RetryableStatusError(resp_data, retry_after=retry_after)
 
-                return resp_data
\ No newline at end of file
+        return resp_data
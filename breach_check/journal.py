@@ -0,0 +1,174 @@
+"""
+module for checkpointing progress of long running checks
+"""
+from json import dumps as json_dumps, loads as json_loads, JSONDecodeError
+from os import SEEK_END, fsync
+from os.path import getsize, isfile
+
+from breach_check.logger import logger
+
+
+class Journal:
+    """
+    Append-only journal of completed email checks and their results, used
+    to resume interrupted runs.
+
+    The first line holds run metadata (output file and format), every other
+    line is the JSON result of a completed check. Records are buffered in
+    memory and only written to disk in a single batch on `sync`, which
+    callers invoke after the matching output records are persisted, so the
+    journal never gets ahead of the output file. Results must be recorded
+    before they are written to the output, as writing may sync and
+    checkpoint an output offset already including them.
+
+    Every sync also appends a checkpoint holding the size of the output file
+    at that point. On resume, only the records before the last checkpoint
+    count as completed, and the output is truncated to that checkpoint's
+    offset. This drops records that were flushed by the write buffer but
+    never journaled, so they are not written twice.
+    """
+
+    def __init__(self, file_path: str) -> None:
+        self.file_path = file_path
+        self.metadata: dict = {}
+        self.completed: set[str] = set()
+        self.output_offset: int | None = None
+
+        self._file = None
+        self._pending: list[str] = []
+        self._checkpoint_end: int | None = None
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @staticmethod
+    def is_complete(result: dict | None) -> bool:
+        """Returns True if the result is conclusive and should not be checked again"""
+        return bool(result) and result.get('total') is not None
+
+    def load(self) -> bool:
+        """
+        Loads metadata and completed emails from an existing journal.
+
+        Returns:
+            bool: True if an existing journal was loaded
+        """
+        if not isfile(self.file_path):
+            return False
+
+        # emails journaled after the last checkpoint may be missing from the output
+        uncheckpointed: list[str] = []
+        position = 0
+        with open(self.file_path, 'rb') as f:
+            for line_number, line in enumerate(f):
+                position += len(line)
+                try:
+                    record = json_loads(line)
+                except JSONDecodeError:
+                    # last record of an interrupted run may be partially written
+                    logger.warning('Skipping corrupt journal line %d', line_number + 1)
+                    continue
+
+                if line_number == 0:
+                    self.metadata = record
+                elif 'output_offset' in record:
+                    self.output_offset = record['output_offset']
+                    self._checkpoint_end = position
+                    self.completed.update(uncheckpointed)
+                    uncheckpointed.clear()
+                elif email := record.get('email'):
+                    uncheckpointed.append(email)
+
+        if self.output_offset is None:
+            # journal written without checkpoints
+            self.completed.update(uncheckpointed)
+        elif uncheckpointed:
+            logger.info('%d emails journaled after the last checkpoint will be checked again', len(uncheckpointed))
+
+        logger.info('Resuming from %s: %d emails already checked', self.file_path, len(self.completed))
+        return True
+
+    def open(self, metadata: dict | None = None, output_offset: int | None = None) -> None:
+        """
+        Opens the journal for appending, writing metadata if the journal is new.
+        A loaded journal is first truncated to its last checkpoint.
+
+        Args:
+            metadata (dict | None): run metadata stored in the first line of a new journal
+            output_offset (int | None): current size of the output file, stored as the first checkpoint
+        """
+        if self._checkpoint_end is not None:
+            with open(self.file_path, 'rb+') as f:
+                f.truncate(self._checkpoint_end)
+
+        is_new = not isfile(self.file_path) or getsize(self.file_path) == 0
+        is_truncated = False
+        if not is_new:
+            with open(self.file_path, 'rb') as f:
+                f.seek(-1, SEEK_END)
+                is_truncated = f.read(1) != b'\n'
+
+        self._file = open(self.file_path, 'a')
+
+        if is_truncated:
+            # terminate a partially written record so new records start on a fresh line
+            self._file.write('\n')
+
+        if is_new:
+            self.metadata = metadata or {}
+            self._pending.append(json_dumps(self.metadata))
+            self.sync(output_offset)
+
+    def filter_pending(self, emails):
+        """
+        Skips emails already completed in a previous run.
+
+        Args:
+            emails (Iterable[str]): emails to be checked
+
+        Yields:
+            str: emails which have not been checked yet
+        """
+        for email in emails:
+            if email not in self.completed:
+                yield email
+
+    def record(self, result: dict | None) -> None:
+        """
+        Buffers the result of a completed check, inconclusive results are
+        skipped so they are checked again on resume.
+
+        Args:
+            result (dict | None): result of the breach check
+        """
+        if self.is_complete(result):
+            self._pending.append(json_dumps(result))
+
+    def sync(self, output_offset: int | None = None) -> None:
+        """
+        Writes buffered records to disk.
+
+        Args:
+            output_offset (int | None): size of the output file holding the records, stored as a checkpoint
+        """
+        if output_offset is not None:
+            self._pending.append(json_dumps({'output_offset': output_offset}))
+
+        if self._pending:
+            self._file.write('\n'.join(self._pending))
+            self._file.write('\n')
+            self._pending.clear()
+
+        self._file.flush()
+        fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+
+        self.sync()
+        self._file.close()
+        self._file = None
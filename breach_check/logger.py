@@ -1,17 +1,148 @@
-from rich.console import Console
-from rich.logging import RichHandler
+from copy import copy
+from enum import Enum
+from json import dumps as json_dumps
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
 
+import atexit
 import logging
 
 
-console = Console()
-
-# create logger
-logging.basicConfig(
-    format="%(message)s",
-    datefmt="[%X]",
-    handlers=[RichHandler(
-        console=console, rich_tracebacks=True, tracebacks_show_locals=True)],
-)
+# handlers are only installed by configure_logging, so embedding applications keep control of logging
 logger = logging.getLogger("breach-check")
-logger.setLevel(logging.DEBUG)
+logger.addHandler(logging.NullHandler())
+logger.setLevel(logging.INFO)
+
+_listener: QueueListener | None = None
+_console = None
+
+
+def get_console():
+    """Returns the rich console shared by logs, progress and tables, importing rich on first use"""
+    global _console
+    if _console is None:
+        from rich.console import Console
+
+        _console = Console()
+
+    return _console
+
+
+def __getattr__(name: str):
+    # `console` is created on first access, so importing the logger does not import rich
+    if name == 'console':
+        return get_console()
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+class LogFormat(str, Enum):
+    AUTO = 'auto'
+    RICH = 'rich'
+    JSON = 'json'
+
+    def __str__(self) -> str:
+        return self.value
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Formats records as single line JSON objects for log collectors.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+
+        return json_dumps(entry)
+
+
+class RecordQueueHandler(QueueHandler):
+    """
+    Queues records for a listener thread of the same process. Unlike the
+    stock QueueHandler, exception info is kept on the record, so the
+    listener's handler formats tracebacks itself (rich tracebacks with
+    locals, or the `exception` field of JSON lines).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # merge arguments now, they may be mutated before the listener formats the record
+        record = copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        return record
+
+
+def verbosity_level(verbosity: int) -> int:
+    """
+    Maps a verbosity count (-q decrements, -v increments) to a log level.
+
+    Args:
+        verbosity (int): 0 for INFO, 1 or more for DEBUG, -1 for WARNING, -2 or less for ERROR
+
+    Returns:
+        int: logging level
+    """
+    if verbosity >= 1:
+        return logging.DEBUG
+    if verbosity == 0:
+        return logging.INFO
+    if verbosity == -1:
+        return logging.WARNING
+    return logging.ERROR
+
+
+def stop_logging() -> None:
+    """Flushes queued log records and stops the listener thread"""
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
+
+
+def configure_logging(verbosity: int = 0, log_format: LogFormat = LogFormat.AUTO) -> None:
+    """
+    Reconfigures the breach-check logger for a run.
+
+    Records are put on a queue by the calling thread and formatted and
+    written by a background listener thread, so logging never blocks the
+    event loop on terminal or file I/O.
+
+    Args:
+        verbosity (int): verbosity count, see verbosity_level
+        log_format (LogFormat): rich console output, JSON lines on stderr, or
+        auto to use rich only when attached to a terminal
+
+    Returns:
+        None
+    """
+    global _listener
+    stop_logging()
+
+    log_format = LogFormat(log_format)
+    if log_format == LogFormat.AUTO:
+        log_format = LogFormat.RICH if get_console().is_terminal else LogFormat.JSON
+
+    if log_format == LogFormat.RICH:
+        from rich.logging import RichHandler
+
+        handler = RichHandler(console=get_console(), rich_tracebacks=True, tracebacks_show_locals=verbosity >= 1)
+        handler.setFormatter(logging.Formatter("%(message)s", datefmt="[%X]"))
+    else:
+        handler = logging.StreamHandler()
+        handler.setFormatter(JsonLinesFormatter())
+
+    queue = SimpleQueue()
+    _listener = QueueListener(queue, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+    logger.handlers = [RecordQueueHandler(queue)]
+    logger.propagate = False
+    logger.setLevel(verbosity_level(verbosity))
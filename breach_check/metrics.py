@@ -0,0 +1,239 @@
+"""
+module for collecting run metrics and exporting them in Prometheus text format
+"""
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from math import inf
+from time import perf_counter
+
+from breach_check.logger import get_console, logger
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+METRIC_PREFIX = 'breach_check_'
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    """
+    Cumulative bucket histogram compatible with Prometheus histograms.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def update(self, other: "Histogram") -> None:
+        """Adds the observations of a histogram with the same buckets"""
+        self.counts = [count + other_count for count, other_count in zip(self.counts, other.counts)]
+        self.sum += other.sum
+        self.count += other.count
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimates a quantile as the upper bound of the bucket containing it.
+
+        Args:
+            q (float): quantile between 0 and 1
+
+        Returns:
+            float: estimated value, inf if it falls above the last bucket
+        """
+        target = q * self.count
+        cumulative = 0
+        for upper_bound, bucket_count in zip((*self.buckets, inf), self.counts):
+            cumulative += bucket_count
+            if cumulative >= target and cumulative:
+                return upper_bound
+
+        return 0.0
+
+
+class Metrics:
+    """
+    In-process registry of counters, gauges and histograms identified by a
+    name and a set of labels.
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+        # aiohttp and rich are imported when serving or printing metrics, not on import
+        self._runner = None
+
+    def reset(self) -> None:
+        self._counters: dict[str, dict[LabelKey, float]] = defaultdict(dict)
+        self._gauges: dict[str, dict[LabelKey, float]] = defaultdict(dict)
+        self._histograms: dict[str, dict[LabelKey, Histogram]] = defaultdict(dict)
+
+    @staticmethod
+    def _key(labels: dict[str, str]) -> LabelKey:
+        return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """Increments a counter"""
+        series = self._counters[name]
+        key = self._key(labels)
+        series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels) -> None:
+        """Sets a gauge"""
+        self._gauges[name][self._key(labels)] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Records a value in a histogram"""
+        series = self._histograms[name]
+        key = self._key(labels)
+        if (histogram := series.get(key)) is None:
+            histogram = series[key] = Histogram()
+        histogram.observe(value)
+
+    @contextmanager
+    def time(self, name: str, **labels) -> Iterator[None]:
+        """Records the duration of the block in a histogram"""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, perf_counter() - start, **labels)
+
+    def update(self, other: "Metrics") -> None:
+        """Adds the counters, gauges and histograms of another registry, e.g. of a worker process"""
+        for source, target in ((other._counters, self._counters), (other._gauges, self._gauges)):
+            for name, series in source.items():
+                target_series = target[name]
+                for key, value in series.items():
+                    target_series[key] = target_series.get(key, 0) + value
+
+        for name, series in other._histograms.items():
+            target_series = self._histograms[name]
+            for key, histogram in series.items():
+                if (target_histogram := target_series.get(key)) is None:
+                    target_histogram = target_series[key] = Histogram(histogram.buckets)
+                target_histogram.update(histogram)
+
+    def snapshot(self) -> "Metrics":
+        """Returns a copy of the registry which is safe to send to another process"""
+        snapshot = Metrics()
+        snapshot.update(self)
+        return snapshot
+
+    def get(self, name: str, **labels) -> float:
+        """Returns the value of a counter or gauge, 0 if never recorded"""
+        key = self._key(labels)
+        if name in self._gauges:
+            return self._gauges[name].get(key, 0)
+        return self._counters.get(name, {}).get(key, 0)
+
+    def total(self, name: str, **labels) -> float:
+        """Returns the sum of a counter across every series matching the given labels"""
+        wanted = set(self._key(labels))
+        return sum(
+            value
+            for key, value in list(self._counters.get(name, {}).items())
+            if wanted.issubset(key)
+        )
+
+    @staticmethod
+    def _format_labels(key: LabelKey, extra: tuple[tuple[str, str], ...] = ()) -> str:
+        labels = (*key, *extra)
+        if not labels:
+            return ''
+        formatted = ','.join(
+            '{}="{}"'.format(name, value.replace('\\', '\\\\').replace('"', '\\"'))
+            for name, value in labels
+        )
+        return f'{{{formatted}}}'
+
+    def render_prometheus(self) -> str:
+        """
+        Returns:
+            str: every metric in Prometheus text exposition format
+        """
+        lines = []
+        for name, series in sorted(self._counters.items()):
+            lines.append(f'# TYPE {METRIC_PREFIX}{name} counter')
+            for key, value in series.items():
+                lines.append(f'{METRIC_PREFIX}{name}{self._format_labels(key)} {value}')
+
+        for name, series in sorted(self._gauges.items()):
+            lines.append(f'# TYPE {METRIC_PREFIX}{name} gauge')
+            for key, value in series.items():
+                lines.append(f'{METRIC_PREFIX}{name}{self._format_labels(key)} {value}')
+
+        for name, series in sorted(self._histograms.items()):
+            lines.append(f'# TYPE {METRIC_PREFIX}{name} histogram')
+            for key, histogram in series.items():
+                cumulative = 0
+                for upper_bound, bucket_count in zip((*histogram.buckets, inf), histogram.counts):
+                    cumulative += bucket_count
+                    le = '+Inf' if upper_bound == inf else str(upper_bound)
+                    lines.append(f'{METRIC_PREFIX}{name}_bucket{self._format_labels(key, (("le", le),))} {cumulative}')
+                lines.append(f'{METRIC_PREFIX}{name}_sum{self._format_labels(key)} {histogram.sum}')
+                lines.append(f'{METRIC_PREFIX}{name}_count{self._format_labels(key)} {histogram.count}')
+
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, file_path: str) -> None:
+        with open(file_path, 'w') as f:
+            f.write(self.render_prometheus())
+        logger.info(f'metrics written to {file_path} successfully')
+
+    async def start_server(self, host: str = '127.0.0.1', port: int = 9100) -> None:
+        """Serves metrics at http://host:port/metrics from the running event loop"""
+        from aiohttp import web
+
+        async def handle_metrics(request: web.Request) -> web.Response:
+            return web.Response(text=self.render_prometheus(), content_type='text/plain')
+
+        app = web.Application()
+        app.router.add_get('/metrics', handle_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        logger.info('Serving metrics at http://%s:%d/metrics', host, port)
+
+    async def stop_server(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @staticmethod
+    def _summary_labels(key: LabelKey) -> str:
+        return ' '.join(f'{name}={value}' for name, value in key)
+
+    def print_summary(self) -> None:
+        """Prints counters, gauges and latency percentiles of the run"""
+        from rich.table import Table
+
+        table = Table('metric', 'labels', 'value', title='Run Metrics')
+        for name, series in sorted(self._counters.items()):
+            for key, value in sorted(series.items()):
+                table.add_row(name, self._summary_labels(key), f'{value:g}' if value == int(value) else f'{value:.3f}')
+
+        for name, series in sorted(self._gauges.items()):
+            for key, value in sorted(series.items()):
+                table.add_row(name, self._summary_labels(key), f'{value:.2f}')
+
+        for name, series in sorted(self._histograms.items()):
+            for key, histogram in sorted(series.items()):
+                mean = histogram.sum / histogram.count if histogram.count else 0
+                table.add_row(
+                    name,
+                    self._summary_labels(key),
+                    f'count={histogram.count} mean={mean * 1000:.1f}ms p50<={histogram.quantile(0.5) * 1000:g}ms p99<={histogram.quantile(0.99) * 1000:g}ms'
+                )
+
+        get_console().print(table)
+
+
+metrics = Metrics()
@@ -0,0 +1,208 @@
+"""
+Local stand-in for the LeakCheck and HudsonRock APIs, used for benchmarking
+and testing without touching the real services.
+
+Run it with `python -m breach_check.mock_server --port 8080` and point the
+backends to it through `BreachChecker(api_urls=MockBreachServer.api_urls(base_url))`.
+"""
+from argparse import ArgumentParser
+from asyncio import sleep
+from hashlib import blake2b
+from random import random, uniform
+from time import monotonic
+
+from aiohttp import web
+
+
+LEAKCHECK_PATH = '/api/public'
+HUDSONROCK_PATH = '/api/json/v2/osint-tools/search-by-email'
+
+
+class MockBreachServer:
+    """
+    aiohttp application mimicking the breach APIs.
+
+    Emails are deterministically reported as breached for a `breach_rate`
+    share of addresses. Responses can be delayed, throttled (HTTP 429 with
+    Retry-After) when exceeding `max_rate` requests per second or at random
+    with `throttle_rate`, and fail with HTTP 500 at `error_rate`.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        breach_rate: float = 0.1,
+        throttle_rate: float = 0.0,
+        error_rate: float = 0.0,
+        max_rate: float | None = None,
+        retry_after: int = 1,
+    ) -> None:
+        """MockBreachServer class constructor
+
+        Args:
+            latency (float): base response delay in seconds
+            latency_jitter (float): random extra delay of up to this many seconds
+            breach_rate (float): share of emails reported as breached
+            throttle_rate (float): probability of a random 429 response
+            error_rate (float): probability of a 500 response
+            max_rate (float | None): requests per second served before responding with 429
+            retry_after (int): Retry-After seconds sent with 429 responses
+
+        Returns:
+            None
+        """
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.breach_rate = breach_rate
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.max_rate = max_rate
+        self.retry_after = retry_after
+
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+
+        self._window_start = monotonic()
+        self._window_requests = 0
+        self._runner: web.AppRunner | None = None
+
+    @staticmethod
+    def api_urls(base_url: str) -> dict[str, str]:
+        """Returns backend endpoint overrides targeting a mock server"""
+        base_url = base_url.rstrip('/')
+        return {
+            'leakcheck': f'{base_url}{LEAKCHECK_PATH}',
+            'hudsonrock': f'{base_url}{HUDSONROCK_PATH}',
+        }
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get(LEAKCHECK_PATH, self.leakcheck)
+        app.router.add_get(HUDSONROCK_PATH, self.hudsonrock)
+        return app
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """
+        Starts serving in the running event loop.
+
+        Args:
+            host (str): interface to bind
+            port (int): port to bind, 0 picks a free port
+
+        Returns:
+            str: base URL of the server
+        """
+        self._runner = web.AppRunner(self.create_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+
+        bound_host, bound_port = self._runner.addresses[0][:2]
+        return f'http://{bound_host}:{bound_port}'
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def is_breached(self, email: str) -> bool:
+        digest = blake2b(email.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, 'little') / 2 ** 64 < self.breach_rate
+
+    def _is_over_rate(self) -> bool:
+        if self.max_rate is None:
+            return False
+
+        now = monotonic()
+        if now - self._window_start >= 1:
+            self._window_start = now
+            self._window_requests = 0
+
+        self._window_requests += 1
+        return self._window_requests > self.max_rate
+
+    async def _failure_response(self) -> web.Response | None:
+        self.requests += 1
+        if self.latency or self.latency_jitter:
+            await sleep(self.latency + uniform(0, self.latency_jitter))
+
+        if self._is_over_rate() or random() < self.throttle_rate:
+            self.throttled += 1
+            return web.json_response(
+                {'success': False, 'error': 'Too many requests'},
+                status=429,
+                headers={'Retry-After': str(self.retry_after)}
+            )
+
+        if random() < self.error_rate:
+            self.errors += 1
+            return web.json_response({'success': False, 'error': 'Internal error'}, status=500)
+
+        return None
+
+    async def leakcheck(self, request: web.Request) -> web.Response:
+        if failure := await self._failure_response():
+            return failure
+
+        email = request.query.get('check', '')
+        if not self.is_breached(email):
+            return web.json_response({'success': False, 'error': 'Not found'})
+
+        return web.json_response({
+            'success': True,
+            'found': 2,
+            'fields': ['username', 'password'],
+            'sources': [
+                {'name': 'Example.com', 'date': '2019-01'},
+                {'name': 'Sample.org', 'date': '2021-06'},
+            ],
+        })
+
+    async def hudsonrock(self, request: web.Request) -> web.Response:
+        if failure := await self._failure_response():
+            return failure
+
+        email = request.query.get('email', '')
+        if not self.is_breached(email):
+            return web.json_response({'message': 'This email is not associated with a computer infected by an info-stealer.', 'stealers': []}, status=400)
+
+        return web.json_response({
+            'message': 'This email address is associated with a computer that was infected by an info-stealer.',
+            'stealers': [
+                {
+                    'date_compromised': '2023-03-01T00:00:00.000Z',
+                    'computer_name': 'DESKTOP',
+                    'operating_system': 'Windows 10 Pro',
+                    'malware_path': 'C:\\Users\\user\\AppData\\Local\\Temp\\stealer.exe',
+                },
+            ],
+        })
+
+
+def main():
+    parser = ArgumentParser('breach-check-mock-server')
+    parser.add_argument('--host', dest='host', default='127.0.0.1', type=str)
+    parser.add_argument('--port', dest='port', default=8080, type=int)
+    parser.add_argument('--latency', dest='latency', help='base response delay in seconds', default=0.0, type=float)
+    parser.add_argument('--latency-jitter', dest='latency_jitter', help='random extra delay in seconds', default=0.0, type=float)
+    parser.add_argument('--breach-rate', dest='breach_rate', help='share of emails reported as breached', default=0.1, type=float)
+    parser.add_argument('--throttle-rate', dest='throttle_rate', help='probability of a random 429 response', default=0.0, type=float)
+    parser.add_argument('--error-rate', dest='error_rate', help='probability of a 500 response', default=0.0, type=float)
+    parser.add_argument('--max-rate', dest='max_rate', help='requests per second served before responding with 429', default=None, type=float)
+    args = parser.parse_args()
+
+    server = MockBreachServer(
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        breach_rate=args.breach_rate,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        max_rate=args.max_rate,
+    )
+    web.run_app(server.create_app(), host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == '__main__':
+    main()
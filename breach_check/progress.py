@@ -0,0 +1,102 @@
+"""
+module for rendering the progress of a run without redrawing on every result
+"""
+from time import monotonic
+
+from breach_check.logger import get_console
+from breach_check.metrics import metrics
+
+
+class RunProgress:
+    """
+    Progress bar fed with batched updates.
+
+    Completed emails are counted locally and pushed to the rich progress
+    bar at most every `update_interval` seconds, while rich redraws the
+    terminal from its own thread `refresh_per_second` times per second.
+    Throughput and error rate are derived from the run metrics on every
+    push.
+    """
+
+    def __init__(self, enabled: bool = True, refresh_per_second: float = 4, update_interval: float = 0.25) -> None:
+        """RunProgress class constructor
+
+        Args:
+            enabled (bool): render the progress bar, False for headless runs
+            refresh_per_second (float): terminal redraws per second
+            update_interval (float): minimum seconds between two progress bar updates
+
+        Returns:
+            None
+        """
+        self.enabled = enabled
+        self.update_interval = update_interval
+        self.refresh_per_second = refresh_per_second
+        # only created when rendered, headless runs never import rich or touch the console
+        self.progress = None
+        self.task_id = None
+
+        self._completed = 0
+        self._pending = 0
+        self._started = 0.0
+        self._last_update = 0.0
+
+    def start(self, total: int | None = None, description: str = '[orange] Checking for Breaches:') -> None:
+        self._completed = 0
+        self._pending = 0
+        self._started = self._last_update = monotonic()
+        if not self.enabled:
+            return
+
+        if self.progress is None:
+            from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn, TimeElapsedColumn, TimeRemainingColumn
+
+            self.progress = Progress(
+                TextColumn('[progress.description]{task.description}'),
+                BarColumn(),
+                MofNCompleteColumn(),
+                TextColumn('{task.fields[throughput]:.1f} emails/s'),
+                TextColumn('errors: {task.fields[error_rate]:.1%}'),
+                TimeElapsedColumn(),
+                TimeRemainingColumn(),
+                console=get_console(),
+                refresh_per_second=self.refresh_per_second,
+            )
+
+        self.progress.start()
+        self.task_id = self.progress.add_task(description, total=total, throughput=0.0, error_rate=0.0)
+
+    def advance(self, count: int = 1) -> None:
+        """Counts completed emails, updating the progress bar once the update interval elapsed"""
+        self._pending += count
+        if self.enabled and (now := monotonic()) - self._last_update >= self.update_interval:
+            self.flush(now)
+
+    @staticmethod
+    def error_rate() -> float:
+        """Returns the share of backend checks which ended without a conclusive result"""
+        checks = metrics.total('checks_total')
+        return metrics.total('checks_total', outcome='inconclusive') / checks if checks else 0.0
+
+    def flush(self, now: float | None = None) -> None:
+        """Pushes pending updates to the progress bar"""
+        now = now or monotonic()
+        self._completed += self._pending
+        self._pending = 0
+        self._last_update = now
+        if self.task_id is None:
+            return
+
+        elapsed = now - self._started
+        self.progress.update(
+            self.task_id,
+            completed=self._completed,
+            throughput=self._completed / elapsed if elapsed else 0.0,
+            error_rate=self.error_rate(),
+        )
+
+    def stop(self) -> None:
+        self.flush()
+        if self.task_id is not None:
+            self.progress.stop()
+            self.task_id = None
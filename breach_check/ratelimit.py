@@ -0,0 +1,175 @@
+"""
+module for adaptive per backend rate limiting
+"""
+from asyncio import Lock, sleep
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from time import monotonic, time
+
+from breach_check.metrics import metrics
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """
+    Request budget of a backend: `max_rate` requests every `time_period` seconds.
+    """
+    max_rate: float
+    time_period: float = 1
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parses a Retry-After header value.
+
+    Args:
+        value (str | None): delay in seconds or an HTTP date
+
+    Returns:
+        float | None: seconds to wait, None if the value is missing or invalid
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket rate limiter whose rate is tuned with AIMD (additive
+    increase, multiplicative decrease).
+
+    Every throttled response (HTTP 429) cuts the rate by `decrease_factor`
+    and pauses all acquisitions for the Retry-After delay when one is given.
+    Each window of healthy responses raises the rate by `increase_step`
+    requests per second until `max_rate` is reached again, so throughput
+    settles near the highest rate the service tolerates.
+    """
+
+    def __init__(
+        self,
+        max_rate: float,
+        time_period: float = 1,
+        min_rate: float | None = None,
+        decrease_factor: float = 0.5,
+        increase_step: float | None = None,
+        name: str = 'default',
+    ) -> None:
+        """AdaptiveRateLimiter class constructor
+
+        Args:
+            max_rate (float): maximum number of requests per time period
+            time_period (float): duration of the time period in seconds
+            min_rate (float | None): lowest number of requests per time period the limiter backs off to. Defaults to 1/10th of max_rate
+            decrease_factor (float): rate multiplier applied when throttled
+            increase_step (float | None): requests per second added after each healthy window. Defaults to 1/10th of the max rate
+            name (str): name of the limited service, used as metrics label
+
+        Returns:
+            None
+        """
+        self.max_rate = max_rate / time_period
+        self.min_rate = (min_rate / time_period) if min_rate else self.max_rate / 10
+        self.time_period = time_period
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step or self.max_rate / 10
+        self.name = name
+
+        self.rate = self.max_rate
+        self.throttled_count = 0
+
+        self._tokens = self._capacity
+        self._last_refill = monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = float('-inf')
+        self._healthy_responses = 0
+        self._lock = Lock()
+
+    def set_max_rate(self, max_rate: float) -> None:
+        """
+        Changes the request budget, scaling the current rate, back off floor
+        and ramp up step by the same factor.
+
+        Args:
+            max_rate (float): maximum number of requests per time period
+        """
+        ratio = max_rate / self.time_period / self.max_rate
+        self.max_rate *= ratio
+        self.min_rate *= ratio
+        self.increase_step *= ratio
+        self.rate = min(self.max_rate, self.rate * ratio)
+        self._tokens = min(self._tokens, self._capacity)
+
+    @classmethod
+    def from_rate_limit(cls, rate_limit: RateLimit, **kwargs) -> "AdaptiveRateLimiter":
+        return cls(max_rate=rate_limit.max_rate, time_period=rate_limit.time_period, **kwargs)
+
+    @property
+    def _capacity(self) -> float:
+        # allow bursting up to one time period worth of requests at the current rate
+        return max(1.0, self.rate * self.time_period)
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self._capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    async def acquire(self) -> None:
+        """Waits until a request can be sent without exceeding the current rate"""
+        async with self._lock:
+            while True:
+                now = monotonic()
+                if now < self._paused_until:
+                    await sleep(self._paused_until - now)
+                    continue
+
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await sleep((1 - self._tokens) / self.rate)
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+    def on_success(self) -> None:
+        """Records a healthy response and ramps the rate back up after a full window of them"""
+        self._healthy_responses += 1
+        if self.rate < self.max_rate and self._healthy_responses >= self._capacity:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+            self._healthy_responses = 0
+            metrics.set('rate_limit_per_second', self.rate, backend=self.name)
+
+    def on_throttled(self, retry_after: float | None = None) -> None:
+        """
+        Records a throttled response, backing off the rate and pausing
+        requests for the Retry-After delay.
+
+        Args:
+            retry_after (float | None): seconds the service asked to wait
+        """
+        now = monotonic()
+        self.throttled_count += 1
+        metrics.inc('throttled_total', backend=self.name)
+        self._healthy_responses = 0
+        self._tokens = 0
+
+        if retry_after:
+            self._paused_until = max(self._paused_until, now + retry_after)
+
+        # requests sent before the last back off are still returning 429s, only
+        # back off once per time period
+        if now - self._last_decrease >= self.time_period:
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self._last_decrease = now
+            metrics.set('rate_limit_per_second', self.rate, backend=self.name)
@@ -1,72 +1,304 @@
-from breach_check.breach_factory.base import ResultSchema
-from breach_check.logger import console
+from collections.abc import Callable
+from enum import Enum
+from json import dumps as json_dumps
+from os import SEEK_END, fsync
+from os.path import getsize, isfile
+from time import monotonic
+from typing import BinaryIO
+
+from breach_check.logger import get_console, logger
+from breach_check.summary import BreachSummary
 from breach_check.utils import write_json_file
-from rich.table import Table, Column
+
+
+class OutputFormat(Enum):
+    """
+    Enum for output file formats.
+    """
+    JSON = 'json'
+    NDJSON = 'ndjson'
+
+
+class StreamingResultWriter:
+    """
+    Writes results to a file one record at a time as they complete, so the
+    full result set never has to be held in memory. Writes are buffered and
+    the file is flushed and fsynced every `flush_every` records or
+    `fsync_interval` seconds, whichever comes first.
+
+    When appending, `resume_offset` is the output size recorded by the
+    journal checkpoint of the interrupted run. The file is truncated to it,
+    which drops records the journal never saw.
+
+    Callables in `sync_callbacks` are invoked after every sync, once the
+    written records are durable. An optional `transform` rewrites every
+    result before it is written, results it maps to None are skipped.
+    """
+
+    def __init__(self, file_path: str, flush_every: int = 1000, fsync_interval: float = 5.0, buffer_size: int = 1 << 16, append: bool = False, resume_offset: int | None = None) -> None:
+        self.file_path = file_path
+        self.flush_every = flush_every
+        self.fsync_interval = fsync_interval
+        self.buffer_size = buffer_size
+        self.append = append
+        self.resume_offset = resume_offset
+        self.records_written = 0
+        self.sync_callbacks: list[Callable[[], None]] = []
+        self.transform: Callable[[dict], dict | None] | None = None
+
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = monotonic()
+
+    def __enter__(self) -> "StreamingResultWriter":
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def open(self) -> None:
+        if self.append and isfile(self.file_path) and getsize(self.file_path):
+            with open(self.file_path, 'rb+') as f:
+                if self.resume_offset is not None:
+                    if f.seek(0, SEEK_END) < self.resume_offset:
+                        logger.warning(f'{self.file_path} is shorter than its journal checkpoint, results may be missing')
+                    f.truncate(min(f.tell(), self.resume_offset))
+                self._prepare_append(f)
+
+            self._file = open(self.file_path, 'a', buffering=self.buffer_size)
+            logger.info(f'appending results to {self.file_path}')
+            return
+
+        if isfile(self.file_path):
+            logger.warning(f'{self.file_path} data will be overwritten')
+
+        self._file = open(self.file_path, 'w', buffering=self.buffer_size)
+        self._write_header()
+
+    def write(self, result: dict) -> None:
+        """
+        Appends a single result record to the output file.
+
+        Args:
+            result (dict): result of a breach check, empty results are skipped
+        """
+        if self.transform and result:
+            result = self.transform(result)
+        if not result:
+            return
+
+        self._write_record(json_dumps(result))
+        self.records_written += 1
+        self._unsynced += 1
+
+        if self._unsynced >= self.flush_every or monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    @property
+    def offset(self) -> int:
+        """Size of the output file in bytes, including buffered records"""
+        return self._file.tell()
+
+    def sync(self) -> None:
+        """Flushes buffered records and fsyncs them to disk"""
+        self._file.flush()
+        fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = monotonic()
+
+        for callback in self.sync_callbacks:
+            callback()
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+
+        self._write_footer()
+        self.sync()
+        self._file.close()
+        self._file = None
+        logger.info(f'{self.records_written} results written to {self.file_path} successfully')
+
+    def _prepare_append(self, f: BinaryIO) -> None:
+        """
+        Repairs the tail of an existing output file so records can be appended.
+
+        Args:
+            f (BinaryIO): existing output file opened in binary read/write mode
+        """
+        pass
+
+    def _write_header(self) -> None:
+        pass
+
+    def _write_footer(self) -> None:
+        pass
+
+    def _write_record(self, record: str) -> None:
+        raise NotImplementedError
+
+
+class NdjsonResultWriter(StreamingResultWriter):
+    """
+    Writes one JSON record per line.
+    """
+
+    def _prepare_append(self, f: BinaryIO) -> None:
+        # drop a partially written last record of an interrupted run
+        end = f.seek(0, SEEK_END)
+        position = end
+        while position > 0:
+            chunk_start = max(0, position - (1 << 16))
+            f.seek(chunk_start)
+            newline = f.read(position - chunk_start).rfind(b'\n')
+            if newline != -1:
+                f.truncate(chunk_start + newline + 1)
+                return
+            position = chunk_start
+
+        f.truncate(0)
+
+    def _write_record(self, record: str) -> None:
+        self._file.write(record)
+        self._file.write('\n')
+
+
+class JsonArrayResultWriter(StreamingResultWriter):
+    """
+    Writes records as elements of a single JSON array.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._has_records = False
+
+    def _prepare_append(self, f: BinaryIO) -> None:
+        # reopen the array by removing the closing bracket of the previous run
+        end = f.seek(0, SEEK_END)
+        f.seek(max(0, end - 64))
+        tail = f.read()
+        stripped_tail = tail.rstrip(b' \t\r\n]')
+        f.truncate(end - len(tail) + len(stripped_tail))
+
+        if stripped_tail.endswith(b'}'):
+            self._has_records = True
+        elif not stripped_tail.endswith(b'['):
+            logger.warning(f'{self.file_path} does not end with a complete record and may be malformed')
+            self._has_records = True
+
+    def _write_header(self) -> None:
+        self._file.write('[')
+
+    def _write_footer(self) -> None:
+        self._file.write(']')
+
+    def _write_record(self, record: str) -> None:
+        if self._has_records:
+            self._file.write(', ')
+        self._file.write(record)
+        self._has_records = True
 
 
 class ResultTableHandler:
-    def __init__(self, table_width_percentage: float = 98, ) -> None:
-        self.console = console
+    """
+    Renders the end of run summary tables. rich is imported when tables are
+    built, so importing the writers of this module stays fast.
+    """
+
+    def __init__(self, table_width_percentage: float = 98, top: int = 10) -> None:
+        self.console = get_console()
         self.table_width_percentage = table_width_percentage
+        self.top = top
 
-    def print_table(self, table: Table):
-        terminal_width = console.width
+    def print_table(self, table: "Table"):
+        terminal_width = self.console.width
         table_width = int(terminal_width * (self.table_width_percentage / 100))
         table.width = table_width
 
         self.console.print(table)
         self.console.rule()
 
-    def extract_result_table_cols(self, results: list[dict]) -> list[str]:
-        return sorted({key for dictionary in results.__dict__ for key in dictionary.keys()})
+    def generate_result_cols(self) -> list["Column"]:
+        from rich.table import Column
+
+        from breach_check.breach_factory.base import ResultSchema
 
-    def generate_result_cols(self) -> list[Column]:
         return [Column(header=col_header, overflow='fold') for col_header in ResultSchema.get_fields()]
 
-    def _represent_results(self, results: list[ResultSchema]):
-        formatted_results = []
-        for result in results:
-            
-            breaches = result.breaches
-            if not breaches:
-                breaches = ['[green]-[/green]']
-
-            formatted_result = {
-                'email': result.email,
-                'breaches': ','.join(breaches),
-                'total': result.total
-            }
-            formatted_results.append(formatted_result)
-
-        return formatted_results
-
-    def generate_result_table(self, results: list[ResultSchema]):
-        results:list[dict] = self._represent_results(results=results)
+    @staticmethod
+    def _represent_result(result: "ResultSchema") -> dict:
+        breaches = result.breaches
+        if not breaches:
+            breaches = ['[green]-[/green]']
+
+        return {
+            'email': result.email,
+            'breaches': ','.join(breaches),
+            'total': result.total
+        }
+
+    def generate_result_table(self, summary: BreachSummary) -> "Table":
+        from rich.table import Table
+
         cols = self.generate_result_cols()
         table = Table(*cols)
+        if summary.breached_emails > len(summary.rows):
+            table.caption = f'showing {len(summary.rows)} of {summary.breached_emails} breached results'
+
+        for result in summary.rows:
+            formatted_result = self._represent_result(result)
+            table.add_row(*(
+                str(formatted_result.get(col.header, '[red]:bug: - [/red]'))
+                for col in cols
+            ))
 
-        for result in results:
-            table_row = []
-            for col in cols:
-                table_row.append(
-                    str(result.get(col.header, '[red]:bug: - [/red]')))
-            table.add_row(*table_row)
+        return table
+
+    def generate_count_table(self, title: str, header: str, counts: list[tuple[str, int]]) -> "Table":
+        from rich.table import Column, Table
+
+        table = Table(Column(header=header, overflow='fold'), Column(header='emails', justify='right'), title=title)
+        for key, count in counts:
+            table.add_row(key, str(count))
 
         return table
 
+    def generate_summary_tables(self, summary: BreachSummary) -> list["Table"]:
+        tables = [
+            self.generate_result_table(summary),
+            self.generate_count_table('Top Breach Sources', 'source', summary.sources.most_common(self.top)),
+            self.generate_count_table('Top Breached Domains', 'domain', summary.domains.most_common(self.top)),
+        ]
+        tables[0].title = f'{summary.breached_emails} breached results, {summary.total_breaches} breaches'
+        return tables
+
 
 class Results:
+    @staticmethod
+    def open_writer(output_file: str, output_format: OutputFormat = OutputFormat.JSON, append: bool = False, resume_offset: int | None = None) -> StreamingResultWriter:
+        match output_format:
+            case OutputFormat.NDJSON:
+                writer = NdjsonResultWriter
+            case OutputFormat.JSON:
+                writer = JsonArrayResultWriter
+            case _:
+                raise ValueError('Invalid Output Format!')
+
+        return writer(output_file, append=append, resume_offset=resume_offset)
+
     @staticmethod
     def write_json_results_to_file(output_file, results):
         if not write_json_file(output_file, results):
-            console.print('Results:')
-            console.print(results)
+            get_console().print('Results:')
+            get_console().print(results)
 
     @staticmethod
-    def generate_table(results: list[ResultSchema], table_width_percentage: float = 98.0):
+    def generate_table(summary: BreachSummary, table_width_percentage: float = 98.0, top: int = 10):
         table_handler = ResultTableHandler(
-            table_width_percentage=table_width_percentage
+            table_width_percentage=table_width_percentage,
+            top=top,
         )
 
-        table = table_handler.generate_result_table(results=results)
-        console.print(table)
+        for table in table_handler.generate_summary_tables(summary):
+            table_handler.console.print(table)
@@ -0,0 +1,132 @@
+"""
+module for retrying failed HTTP requests
+"""
+from random import uniform
+
+from aiohttp import ClientError
+from tenacity import AsyncRetrying, RetryCallState, retry_if_exception, stop_after_attempt
+
+from breach_check.logger import logger
+from breach_check.metrics import metrics
+
+
+class RetryableStatusError(Exception):
+    """
+    Raised for responses whose status code should be retried.
+
+    Args:
+        resp_data (dict): response data returned once retries are exhausted
+        retry_after (float | None): delay requested by the server
+    """
+
+    def __init__(self, resp_data: dict, retry_after: float | None = None) -> None:
+        super().__init__(f'Retryable status code: {resp_data.get("status")}')
+        self.resp_data = resp_data
+        self.retry_after = retry_after
+
+
+class RetryPolicy:
+    """
+    Retries network errors and retryable status codes with exponential
+    backoff and full jitter.
+
+    Retries share a budget for the whole run: at most `min_retry_budget`
+    plus `retry_budget_ratio` retries per request sent, so an unhealthy
+    backend cannot multiply the load sent to it. Cancellations are never
+    retried.
+
+    Throttled responses (HTTP 429) are not retried here by default. The
+    backend rate limiter backs off on them, and BreachChecker requeues the
+    email behind it, so retrying them here as well would send the same
+    request up to `max_attempts` times for every requeue.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30,
+        retry_statuses: tuple[int, ...] = (500, 502, 503, 504),
+        retry_budget_ratio: float = 0.2,
+        min_retry_budget: int = 10,
+    ) -> None:
+        """RetryPolicy class constructor
+
+        Args:
+            max_attempts (int): maximum attempts per request including the first one
+            backoff_base (float): seconds of the first backoff, doubled on every attempt
+            backoff_max (float): upper bound of a single backoff in seconds
+            retry_statuses (tuple[int, ...]): response status codes which are retried
+            retry_budget_ratio (float): retries allowed per request sent during the run
+            min_retry_budget (int): retries always allowed regardless of the ratio
+
+        Returns:
+            None
+        """
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_budget_ratio = retry_budget_ratio
+        self.min_retry_budget = min_retry_budget
+
+        self.requests = 0
+        self.retries = 0
+        self.exhausted_budget = 0
+
+    @property
+    def has_budget(self) -> bool:
+        return self.retries < self.min_retry_budget + self.retry_budget_ratio * self.requests
+
+    def is_retryable_status(self, status: int) -> bool:
+        return status in self.retry_statuses
+
+    def _should_retry(self, exception: BaseException) -> bool:
+        if not isinstance(exception, (ClientError, TimeoutError, OSError, RetryableStatusError)):
+            return False
+
+        if not self.has_budget:
+            self.exhausted_budget += 1
+            metrics.inc('retries_denied_total')
+            return False
+
+        return True
+
+    def _wait(self, retry_state: RetryCallState) -> float:
+        backoff = min(self.backoff_max, self.backoff_base * 2 ** (retry_state.attempt_number - 1))
+        delay = uniform(0, backoff)
+
+        exception = retry_state.outcome.exception()
+        if isinstance(exception, RetryableStatusError) and exception.retry_after:
+            delay = max(delay, min(self.backoff_max, exception.retry_after))
+
+        return delay
+
+    def _before_sleep(self, retry_state: RetryCallState) -> None:
+        self.retries += 1
+        metrics.inc('retries_total')
+        logger.debug(
+            'Retrying request (attempt %d) in %.2fs: %s',
+            retry_state.attempt_number + 1,
+            retry_state.next_action.sleep,
+            retry_state.outcome.exception()
+        )
+
+    def retrying(self) -> AsyncRetrying:
+        """
+        Returns:
+            AsyncRetrying: retry controller for a single request
+        """
+        return AsyncRetrying(
+            stop=stop_after_attempt(self.max_attempts),
+            wait=self._wait,
+            retry=retry_if_exception(self._should_retry),
+            before_sleep=self._before_sleep,
+            reraise=True,
+        )
+
+    def log_stats(self) -> None:
+        logger.info(
+            'Requests: %d, retries: %d, retries denied by budget: %d',
+            self.requests, self.retries, self.exhausted_budget
+        )
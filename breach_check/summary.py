@@ -0,0 +1,87 @@
+"""
+module for aggregating breach results into a constant memory summary
+"""
+from collections import Counter
+from collections.abc import Iterable
+
+
+class TopCounter:
+    """
+    Counter keeping only its most frequent keys.
+
+    Once more than twice `capacity` keys are tracked the least frequent
+    ones are dropped, so memory stays bounded for inputs with unbounded
+    distinct keys. Counts of the top keys are exact unless a key was
+    dropped and seen again later.
+    """
+
+    def __init__(self, capacity: int = 1000) -> None:
+        self.capacity = capacity
+        self.counts: Counter[str] = Counter()
+
+    def add(self, key: str, count: int = 1) -> None:
+        self.counts[key] += count
+        if len(self.counts) > self.capacity * 2:
+            self.counts = Counter(dict(self.counts.most_common(self.capacity)))
+
+    def update(self, other: "TopCounter") -> None:
+        for key, count in other.counts.items():
+            self.add(key, count)
+
+    def most_common(self, n: int | None = None) -> list[tuple[str, int]]:
+        return self.counts.most_common(n)
+
+
+class BreachSummary:
+    """
+    Streaming summary of breached emails: totals, the most common breach
+    sources and email domains, and the first `max_rows` results for display.
+    """
+
+    def __init__(self, max_rows: int = 50, capacity: int = 1000) -> None:
+        """BreachSummary class constructor
+
+        Args:
+            max_rows (int): number of results kept for the result table
+            capacity (int): number of breach sources and domains tracked
+
+        Returns:
+            None
+        """
+        self.max_rows = max_rows
+        self.breached_emails = 0
+        self.total_breaches = 0
+        self.sources = TopCounter(capacity)
+        self.domains = TopCounter(capacity)
+        self.rows: list = []
+
+    def add(self, result_schema) -> None:
+        """
+        Records the summarized result of a breached email.
+
+        Args:
+            result_schema (ResultSchema): summarized breach result
+        """
+        self.breached_emails += 1
+        self.total_breaches += result_schema.total or 0
+        self.domains.add(result_schema.email.rpartition('@')[2])
+        for source in set(result_schema.breaches):
+            self.sources.add(source)
+
+        if len(self.rows) < self.max_rows:
+            self.rows.append(result_schema)
+
+    def update(self, other: "BreachSummary") -> None:
+        """Merges another summary into this one"""
+        self.breached_emails += other.breached_emails
+        self.total_breaches += other.total_breaches
+        self.sources.update(other.sources)
+        self.domains.update(other.domains)
+        self.rows.extend(other.rows[:self.max_rows - len(self.rows)])
+
+    @classmethod
+    def merged(cls, summaries: Iterable["BreachSummary"], max_rows: int = 50) -> "BreachSummary":
+        summary = cls(max_rows=max_rows)
+        for other in summaries:
+            summary.update(other)
+        return summary
@@ -1,7 +1,26 @@
 from breach_check.logger import logger
+from bz2 import open as bz2_open
+from collections.abc import Iterator
 from datetime import datetime
+from gzip import open as gzip_open
+from io import BufferedReader, TextIOWrapper
 from json import dumps as json_dumps, JSONDecodeError
+from lzma import open as lzma_open
 from os.path import isfile
+from sys import stdin
+from typing import TextIO
+
+# parse JSON with the fastest available library, all of them accept bytes and str
+try:
+    from orjson import loads as json_loads
+    JSON_LIBRARY = 'orjson'
+except ImportError:
+    try:
+        from msgspec.json import decode as json_loads
+        JSON_LIBRARY = 'msgspec'
+    except ImportError:
+        from json import loads as json_loads
+        JSON_LIBRARY = 'json'
 
 
 def generate_unique_filename():
@@ -12,15 +31,92 @@ def generate_unique_filename():
     return unique_filename
 
 
-def extract_emails(file_path: str) -> list[str] | None:
-    if not isfile(file_path):
+_COMPRESSION_MAGIC = (
+    (b'\x1f\x8b', gzip_open),
+    (b'BZh', bz2_open),
+    (b'\xfd7zXZ\x00', lzma_open),
+)
+
+
+def open_input_file(file_path: str) -> TextIO:
+    """
+    Opens an input file for streaming text reads. `-` reads from stdin and
+    gzip/bz2/xz compressed inputs are decompressed transparently based on
+    their magic bytes.
+
+    Args:
+        file_path (str): path of the input file or `-` for stdin
+
+    Returns:
+        TextIO: text stream yielding the decoded lines
+    """
+    raw = stdin.buffer if file_path == '-' else open(file_path, 'rb')
+    if not isinstance(raw, BufferedReader):
+        raw = BufferedReader(raw)
+
+    header = raw.peek(6)
+    for magic, decompressor in _COMPRESSION_MAGIC:
+        if header.startswith(magic):
+            raw = decompressor(raw)
+            break
+
+    return TextIOWrapper(raw, encoding='utf-8', errors='replace')
+
+
+def normalize_email(line: str) -> str | None:
+    """
+    Normalizes a raw input line into an email address by stripping
+    whitespace and lowercasing the domain part.
+
+    Args:
+        line (str): raw line read from the input
+
+    Returns:
+        str | None: normalized email, None for blank and comment (`#`) lines
+    """
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+
+    local_part, at, domain = line.rpartition('@')
+    if not at:
+        return line
+
+    return f'{local_part}@{domain.lower()}'
+
+
+def _stream_emails(file_path: str) -> Iterator[str]:
+    with open_input_file(file_path) as f:
+        for line in f:
+            email = normalize_email(line)
+            if email:
+                yield email
+
+
+def iter_emails(file_path: str) -> Iterator[str] | None:
+    """
+    Lazily streams normalized emails from an input file without loading it
+    into memory.
+
+    Args:
+        file_path (str): path of the input file, `-` for stdin. gzip, bz2 and xz files are supported.
+
+    Returns:
+        Iterator[str] | None: email iterator, None if the input file does not exist
+    """
+    if file_path != '-' and not isfile(file_path):
         logger.error(f'Input File with Emails Not Found: {file_path}')
         return
 
-    with open(file_path, 'r') as f:
-        emails = [email.strip() for email in f.read().splitlines()]
+    return _stream_emails(file_path)
+
+
+def extract_emails(file_path: str) -> list[str] | None:
+    emails = iter_emails(file_path)
+    if emails is None:
+        return
 
-    return emails
+    return list(emails)
 
 
 def write_json_file(file_path: str, json_data) -> bool:
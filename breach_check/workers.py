@@ -0,0 +1,275 @@
+"""
+module for checking emails in several worker processes, each running its own BreachChecker
+"""
+from asyncio import get_running_loop, run
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass, field
+from hashlib import blake2b
+from multiprocessing import get_context
+from queue import Empty, Full
+from threading import Event, Thread
+from time import monotonic
+
+from breach_check.breach import BreachChecker
+from breach_check.cache import LookupCache
+from breach_check.dedupe import EmailDeduplicator
+from breach_check.logger import LogFormat, configure_logging, logger, stop_logging
+from breach_check.metrics import metrics
+from breach_check.progress import RunProgress
+from breach_check.retry import RetryPolicy
+from breach_check.summary import BreachSummary
+
+
+@dataclass
+class CheckerConfig:
+    """
+    Picklable description of a BreachChecker, used to build identical
+    checkers in worker processes.
+
+    Attributes:
+        checker_options (dict): keyword arguments of BreachChecker
+        retry_options (dict): keyword arguments of RetryPolicy
+        dedupe_options (dict): keyword arguments of EmailDeduplicator
+        cache_options (dict | None): keyword arguments of LookupCache, None disables the cache
+        verbosity (int): log verbosity of worker processes
+        log_format (LogFormat): log format of worker processes
+    """
+    checker_options: dict = field(default_factory=dict)
+    retry_options: dict = field(default_factory=dict)
+    dedupe_options: dict = field(default_factory=dict)
+    cache_options: dict | None = None
+    verbosity: int = 0
+    log_format: LogFormat = LogFormat.AUTO
+
+    def create_cache(self) -> LookupCache | None:
+        if self.cache_options is None:
+            return None
+
+        cache = LookupCache(**self.cache_options)
+        cache.open()
+        return cache
+
+    def create_deduplicator(self) -> EmailDeduplicator:
+        return EmailDeduplicator(**self.dedupe_options)
+
+    def create(self, cache: LookupCache | None = None, **overrides) -> BreachChecker:
+        return BreachChecker(
+            cache=cache,
+            retry_policy=RetryPolicy(**self.retry_options),
+            deduplicator=self.create_deduplicator(),
+            **{**self.checker_options, **overrides},
+        )
+
+
+def shard_index(canonical_email: str, workers: int) -> int:
+    """Returns the worker responsible for a canonical email, stable across processes"""
+    return int.from_bytes(blake2b(canonical_email.encode(), digest_size=8).digest(), 'little') % workers
+
+
+def _run_worker(worker_id: int, workers: int, config: CheckerConfig, input_queue, output_queue, batch_size: int, flush_interval: float) -> None:
+    configure_logging(verbosity=config.verbosity, log_format=config.log_format)
+    cache = config.create_cache()
+    breach_checker = config.create(cache=cache, show_progress=False, rate_share=1 / workers)
+
+    async def read_input() -> AsyncIterator[str]:
+        loop = get_running_loop()
+        while (batch := await loop.run_in_executor(None, input_queue.get)) is not None:
+            for email in batch:
+                yield email
+
+    async def check() -> None:
+        loop = get_running_loop()
+        batch = []
+        last_flush = monotonic()
+        async for result in breach_checker.iter_check(read_input()):
+            batch.append(result)
+            if len(batch) >= batch_size or monotonic() - last_flush >= flush_interval:
+                await loop.run_in_executor(None, output_queue.put, ('results', worker_id, batch, metrics.snapshot()))
+                batch = []
+                last_flush = monotonic()
+
+        if batch:
+            await loop.run_in_executor(None, output_queue.put, ('results', worker_id, batch, metrics.snapshot()))
+
+    try:
+        run(check())
+        deduplicator = breach_checker.deduplicator
+        retry_policy = breach_checker._http_client.retry_policy
+        stats = {
+            'unique': deduplicator.unique,
+            'duplicates': deduplicator.duplicates,
+            'invalid': deduplicator.invalid,
+            'requests': retry_policy.requests,
+            'retries': retry_policy.retries,
+            'exhausted_budget': retry_policy.exhausted_budget,
+        }
+        output_queue.put(('done', worker_id, breach_checker.summary, metrics.snapshot(), stats))
+    except Exception as e:
+        logger.exception('Worker %d failed', worker_id)
+        output_queue.put(('error', worker_id, f'{type(e).__name__}: {e}'))
+    finally:
+        if cache:
+            cache.close()
+        stop_logging()
+
+
+class ShardedBreachChecker:
+    """
+    Checks emails in `workers` processes, each running its own
+    BreachChecker, and merges their results into a single stream.
+
+    Emails are sharded by the hash of their canonical address, so
+    duplicates always reach the same worker and are still checked once.
+    Every worker gets an equal share of each backend request budget, so
+    together they stay within the backend limits. Metrics of the workers
+    are merged into the metrics of this process as results arrive.
+    """
+
+    def __init__(self, workers: int, config: CheckerConfig, show_progress: bool = True, summary_rows: int = 50, batch_size: int = 500, flush_interval: float = 0.5) -> None:
+        """ShardedBreachChecker class constructor
+
+        Args:
+            workers (int): number of worker processes
+            config (CheckerConfig): configuration of the BreachChecker of each worker
+            show_progress (bool): render a progress bar of the merged results
+            summary_rows (int): breached emails kept in the merged summary for display
+            batch_size (int): number of emails or results sent between processes at once
+            flush_interval (float): maximum seconds a worker holds back completed results
+
+        Returns:
+            None
+        """
+        self.workers = workers
+        self.config = config
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.progress = RunProgress(enabled=show_progress)
+        self.summary_rows = summary_rows
+        self.summary = BreachSummary(max_rows=summary_rows)
+        self.stats: dict[str, int] = {}
+
+        self._deduplicator = config.create_deduplicator()
+
+    def _feed(self, emails: Iterable[str], input_queues: list, stop: Event, errors: list) -> None:
+        def put(worker_id: int, batch: list[str] | None) -> None:
+            while not stop.is_set():
+                try:
+                    input_queues[worker_id].put(batch, timeout=0.5)
+                    return
+                except Full:
+                    continue
+
+        batches: list[list[str]] = [[] for _ in input_queues]
+        try:
+            for email in emails:
+                if stop.is_set():
+                    return
+
+                worker_id = shard_index(self._deduplicator.canonicalize(email), self.workers)
+                batch = batches[worker_id]
+                batch.append(email)
+                if len(batch) >= self.batch_size:
+                    put(worker_id, batch)
+                    batches[worker_id] = []
+        except Exception as e:
+            errors.append(e)
+
+        for worker_id, batch in enumerate(batches):
+            if batch:
+                put(worker_id, batch)
+            put(worker_id, None)
+
+    def _merge_metrics(self, worker_metrics: dict) -> None:
+        metrics.reset()
+        for snapshot in worker_metrics.values():
+            metrics.update(snapshot)
+
+    async def iter_check(self, emails: Iterable[str]) -> AsyncIterator[dict]:
+        """
+        Check emails for breaches in worker processes, yielding results as
+        workers complete them.
+
+        Args:
+            emails (Iterable[str]): Email addresses to check for breaches.
+
+        Yields:
+            dict: result of each breach check in completion order.
+        """
+        context = get_context('spawn')
+        input_queues = [context.Queue(maxsize=8) for _ in range(self.workers)]
+        output_queue = context.Queue(maxsize=self.workers * 8)
+        processes = [
+            context.Process(
+                target=_run_worker,
+                args=(worker_id, self.workers, self.config, input_queues[worker_id], output_queue, self.batch_size, self.flush_interval),
+                daemon=True,
+            )
+            for worker_id in range(self.workers)
+        ]
+        for process in processes:
+            process.start()
+
+        stop = Event()
+        input_errors: list[Exception] = []
+        feeder = Thread(target=self._feed, args=(emails, input_queues, stop, input_errors), daemon=True)
+        feeder.start()
+
+        def get_message():
+            while True:
+                try:
+                    return output_queue.get(timeout=1)
+                except Empty:
+                    if dead := [process for process in processes if process.exitcode not in (None, 0)]:
+                        raise RuntimeError(f'{len(dead)} worker processes exited unexpectedly')
+
+        loop = get_running_loop()
+        worker_metrics = {}
+        summaries = []
+        self.stats = {}
+        self.progress.start()
+        try:
+            running_workers = self.workers
+            while running_workers:
+                message = await loop.run_in_executor(None, get_message)
+                match message:
+                    case ('results', worker_id, results, snapshot):
+                        worker_metrics[worker_id] = snapshot
+                        self._merge_metrics(worker_metrics)
+                        for result in results:
+                            self.progress.advance()
+                            yield result
+
+                    case ('done', worker_id, summary, snapshot, stats):
+                        running_workers -= 1
+                        worker_metrics[worker_id] = snapshot
+                        self._merge_metrics(worker_metrics)
+                        summaries.append(summary)
+                        for name, value in stats.items():
+                            self.stats[name] = self.stats.get(name, 0) + value
+
+                    case ('error', worker_id, error):
+                        raise RuntimeError(f'Worker {worker_id} failed: {error}')
+
+            if input_errors:
+                raise input_errors[0]
+        finally:
+            stop.set()
+            for process in processes:
+                process.join(timeout=1)
+                if process.is_alive():
+                    process.terminate()
+            self.progress.stop()
+            self.summary = BreachSummary.merged(summaries, max_rows=self.summary_rows)
+
+    def log_stats(self) -> None:
+        """
+        Logs the merged deduplication and retry statistics of the workers.
+        """
+        logger.info(
+            'Workers: %d, unique emails: %d, duplicate lines: %d, invalid lines: %d',
+            self.workers, self.stats.get('unique', 0), self.stats.get('duplicates', 0), self.stats.get('invalid', 0)
+        )
+        logger.info(
+            'Requests: %d, retries: %d, retries denied by budget: %d',
+            self.stats.get('requests', 0), self.stats.get('retries', 0), self.stats.get('exhausted_budget', 0)
+        )
@@ -0,0 +1,65 @@
+import asyncio
+import socket
+
+import pytest
+
+from breach_check.breach_factory.base import BaseBreachBackend, ResultSchema
+from breach_check.mock_server import MockBreachServer
+from breach_check.ratelimit import RateLimit
+
+
+@pytest.fixture
+def run_with_mock_server():
+    """
+    Runs an async test body against a MockBreachServer started in the same event loop.
+    The test body receives the server and the backend endpoint overrides targeting it.
+    """
+    def run(test, **server_options):
+        async def main():
+            server = MockBreachServer(**server_options)
+            base_url = await server.start()
+            try:
+                return await test(server, MockBreachServer.api_urls(base_url))
+            finally:
+                await server.stop()
+
+        return asyncio.run(main())
+
+    return run
+
+
+@pytest.fixture
+def make_backend():
+    """
+    Creates backend classes answering every email with a clean result after `delay` seconds,
+    counting their lookups in `calls` and their close() calls in `closed`.
+    """
+    def make(name, delay=0):
+        class SleepingBackend(BaseBreachBackend):
+            rate_limit = RateLimit(max_rate=1_000_000, time_period=1)
+            calls = 0
+            closed = 0
+
+            async def check_email_breaches(self, email):
+                type(self).calls += 1
+                await asyncio.sleep(delay)
+                return {'email': email, 'breaches': [], 'fields': [], 'total': 0}
+
+            def get_result_schema(self, res_data):
+                return ResultSchema(email=res_data.get('email'), breaches=(), total=res_data.get('total'))
+
+            def close(self):
+                type(self).closed += 1
+
+        SleepingBackend.name = name
+        return SleepingBackend
+
+    return make
+
+
+@pytest.fixture
+def unused_port():
+    """A local TCP port nothing listens on"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
@@ -0,0 +1,70 @@
+import gzip
+import json
+
+import pytest
+
+from breach_check.baseline import BaselineDiff, iter_result_records
+
+
+RECORDS = [
+    {'email': f'user{i}@x.com', 'breaches': [{'name': f'Site{i % 3}.com'}] if i % 2 else [], 'fields': [], 'total': i % 2}
+    for i in range(20)
+]
+
+
+@pytest.fixture
+def json_array_file(tmp_path):
+    path = tmp_path / 'baseline.json'
+    path.write_text('[' + ', '.join(json.dumps(record) for record in RECORDS) + ']')
+    return path
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, 1 << 20])
+def test_json_array_records_split_across_chunks(json_array_file, chunk_size):
+    assert list(iter_result_records(str(json_array_file), chunk_size=chunk_size)) == RECORDS
+
+
+def test_truncated_json_array_skips_partial_record(json_array_file):
+    content = json_array_file.read_text()
+    json_array_file.write_text(content[:content.index('"user5@x.com"') + 20])
+
+    assert list(iter_result_records(str(json_array_file), chunk_size=16)) == RECORDS[:5]
+
+
+def test_ndjson_records_and_truncated_last_line(tmp_path):
+    path = tmp_path / 'baseline.ndjson'
+    path.write_text('\n'.join(json.dumps(record) for record in RECORDS) + '\n{"email": "late@x')
+
+    assert list(iter_result_records(str(path))) == RECORDS
+
+
+def test_compressed_and_empty_files(tmp_path):
+    compressed = tmp_path / 'baseline.json.gz'
+    with gzip.open(compressed, 'wt') as f:
+        json.dump(RECORDS, f, indent=2)
+    empty = tmp_path / 'empty.json'
+    empty.write_text('  \n')
+
+    assert list(iter_result_records(str(compressed), chunk_size=32)) == RECORDS
+    assert list(iter_result_records(str(empty))) == []
+
+
+def test_diff_reports_added_and_removed_breaches(json_array_file):
+    baseline = BaselineDiff(str(json_array_file), backend='leakcheck')
+    baseline.load()
+
+    # unchanged
+    assert baseline.diff(RECORDS[1]) is None
+    # clean in the baseline, breached now
+    assert baseline.diff({'email': 'USER0@x.com', 'breaches': [{'name': 'New.com'}], 'total': 1}) == {
+        'email': 'USER0@x.com', 'added': ['New.com'], 'removed': [], 'total': 1,
+    }
+    # breached in the baseline, clean now
+    assert baseline.diff({'email': 'user1@x.com', 'breaches': [], 'total': 0}) == {
+        'email': 'user1@x.com', 'added': [], 'removed': ['Site1.com'], 'total': 0,
+    }
+    # failed and duplicate checks are never reported as removals
+    assert baseline.diff({'email': 'user3@x.com', 'breaches': [], 'total': None}) is None
+    assert baseline.diff({'email': 'user3@x.com', 'duplicate_of': 'user3@x.com'}) is None
+
+    assert (baseline.added, baseline.removed, baseline.unchanged, baseline.inconclusive) == (1, 1, 1, 1)
@@ -0,0 +1,99 @@
+import asyncio
+from hashlib import sha1
+
+from breach_check.breach_factory.base import BaseBreachBackend, HashRangeBackend, RateLimitedError, ResultSchema
+from breach_check.breach_factory.batching import BatchingAdapter
+
+
+BREACHED = 'breached@x.com'
+
+
+class RangeBackend(HashRangeBackend):
+    name = 'range'
+
+    def __init__(self):
+        super().__init__(http_client=None)
+        self.queries = []
+
+    async def query_group(self, key):
+        self.queries.append(key)
+        await asyncio.sleep(0.01)
+        digest = sha1(BREACHED.encode()).hexdigest()
+        if digest.startswith(key):
+            return {digest[self.prefix_length:]: {'email': BREACHED, 'breaches': [{'name': 'Site.com'}], 'fields': [], 'total': 1}}
+        return {}
+
+    def get_result_schema(self, res_data):
+        return ResultSchema(email=res_data['email'], breaches=('Site.com',), total=res_data['total'])
+
+
+class BulkBackend(BaseBreachBackend):
+    name = 'bulk'
+    max_batch_size = 4
+
+    def __init__(self, throttle=False):
+        super().__init__(http_client=None)
+        self.batches = []
+        self.throttle = throttle
+
+    async def check_emails_breaches(self, emails):
+        self.batches.append(emails)
+        if self.throttle:
+            raise RateLimitedError({'email': emails[0], 'total': None})
+        return {email: {'email': email, 'breaches': [], 'fields': [], 'total': 0} for email in emails}
+
+
+def test_hash_range_lookups_share_a_request_and_match_locally():
+    backend = RangeBackend()
+
+    async def main():
+        adapter = BatchingAdapter(backend)
+        return await asyncio.gather(*(adapter.check_email_breaches(email) for email in [BREACHED, BREACHED.upper(), BREACHED]))
+
+    results = asyncio.run(main())
+    assert backend.queries == [sha1(BREACHED.encode()).hexdigest()[:5]]
+    # only the prefix leaves the machine
+    assert all(BREACHED not in query for query in backend.queries)
+    assert [result['total'] for result in results] == [1, 1, 1]
+    assert results[1]['email'] == BREACHED.upper()
+
+
+def test_group_results_expire():
+    backend = RangeBackend()
+
+    async def main():
+        adapter = BatchingAdapter(backend, group_ttl=0.05)
+        await adapter.check_email_breaches('clean@x.com')
+        await adapter.check_email_breaches('clean@x.com')
+        queries_before_expiry = len(backend.queries)
+        await asyncio.sleep(0.06)
+        result = await adapter.check_email_breaches('clean@x.com')
+        return queries_before_expiry, len(backend.queries), result
+
+    queries_before_expiry, queries, result = asyncio.run(main())
+    assert (queries_before_expiry, queries) == (1, 2)
+    assert result['total'] == 0
+
+
+def test_bulk_lookups_are_sent_in_full_and_delayed_batches():
+    backend = BulkBackend()
+
+    async def main():
+        adapter = BatchingAdapter(backend, max_delay=0.01)
+        return await asyncio.gather(*(adapter.check_email_breaches(f'user{i}@x.com') for i in range(6)))
+
+    results = asyncio.run(main())
+    assert [len(batch) for batch in backend.batches] == [4, 2]
+    assert [result['email'] for result in results] == [f'user{i}@x.com' for i in range(6)]
+
+
+def test_throttled_batches_fail_every_lookup_on_its_own():
+    backend = BulkBackend(throttle=True)
+
+    async def main():
+        adapter = BatchingAdapter(backend)
+        return await asyncio.gather(*(adapter.check_email_breaches(f'user{i}@x.com') for i in range(2)), return_exceptions=True)
+
+    errors = asyncio.run(main())
+    assert all(isinstance(error, RateLimitedError) for error in errors)
+    assert [error.res_data['email'] for error in errors] == ['user0@x.com', 'user1@x.com']
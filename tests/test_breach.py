@@ -0,0 +1,183 @@
+import asyncio
+from contextlib import aclosing
+
+import pytest
+
+from breach_check.breach import BreachChecker, BreachResult
+
+
+EMAILS = [f'user{i}@x.com' for i in range(2000)]
+
+
+def test_check_one_and_check_many(run_with_mock_server):
+    async def test(server, api_urls):
+        async with BreachChecker(backend=['leakcheck', 'hudsonrock'], api_urls=api_urls, rate_limit=1000) as breach_checker:
+            invalid = await breach_checker.check_one('not an email')
+            results = [result async for result in breach_checker.check_many(EMAILS[:50])]
+        return server, invalid, results
+
+    server, invalid, results = run_with_mock_server(test, breach_rate=0.3)
+
+    assert not invalid.is_conclusive
+    assert sorted(result.email for result in results) == sorted(EMAILS[:50])
+    assert all(result.is_conclusive for result in results)
+    for result in results:
+        assert result.is_breached == server.is_breached(result.email)
+        assert set(result.backends) == {'leakcheck', 'hudsonrock'}
+
+
+def test_stopping_check_many_early_cancels_checks(run_with_mock_server):
+    async def test(server, api_urls):
+        breach_checker = BreachChecker(backend=['leakcheck', 'hudsonrock'], api_urls=api_urls, rate_limit=1000, concurrency=20)
+        received = 0
+        async with aclosing(breach_checker.check_many(EMAILS)) as results:
+            async for _ in results:
+                received += 1
+                if received == 5:
+                    break
+
+        requests = server.requests
+        await asyncio.sleep(0.2)
+        return breach_checker, requests, server.requests, len(asyncio.all_tasks())
+
+    breach_checker, requests, later_requests, tasks = run_with_mock_server(test, latency=0.02)
+
+    assert not breach_checker._http_client.is_open
+    assert later_requests == requests < 200
+    # only the test itself is left running
+    assert tasks == 1
+
+
+def test_close_stops_abandoned_iterators(run_with_mock_server):
+    async def test(server, api_urls):
+        async with BreachChecker(backend='leakcheck', api_urls=api_urls, rate_limit=1000, concurrency=20) as breach_checker:
+            results = breach_checker.check_many(EMAILS)
+            async for _ in results:
+                break
+
+        requests = server.requests
+        await asyncio.sleep(0.2)
+        pending = len(asyncio.all_tasks())
+        await results.aclose()
+        return breach_checker, requests, server.requests, pending
+
+    breach_checker, requests, later_requests, pending = run_with_mock_server(test, latency=0.02)
+
+    assert not breach_checker._http_client.is_open
+    assert later_requests == requests
+    assert pending == 1
+
+
+def test_close_wakes_up_running_iterator(run_with_mock_server):
+    async def test(server, api_urls):
+        breach_checker = BreachChecker(backend='leakcheck', api_urls=api_urls, rate_limit=1000)
+        await breach_checker.open()
+
+        async def consume():
+            async for _ in breach_checker.check_many(EMAILS):
+                pass
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.sleep(0.1)
+        await breach_checker.close()
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(consumer, 5)
+
+        # a closed client is never reopened behind the caller's back
+        with pytest.raises(RuntimeError):
+            await breach_checker._http_client.request(api_urls['leakcheck'])
+        return breach_checker
+
+    breach_checker = run_with_mock_server(test, latency=0.02)
+    assert not breach_checker._http_client.is_open
+
+
+def test_slow_backend_does_not_stall_others(make_backend):
+    fast, slow = make_backend('fast', 0.005), make_backend('slow', 0.1)
+
+    async def main():
+        async with BreachChecker(backend=[fast, slow], concurrency=5) as breach_checker:
+            async def consume():
+                async with aclosing(breach_checker.iter_check(EMAILS)) as results:
+                    async for _ in results:
+                        pass
+
+            consumer = asyncio.create_task(consume())
+            await asyncio.sleep(1)
+            consumer.cancel()
+            await asyncio.gather(consumer, return_exceptions=True)
+
+    asyncio.run(main())
+
+    # the fast backend runs ahead of the slow one up to its bounded lead
+    assert fast.calls > slow.calls + 50
+    assert fast.calls <= slow.calls + 16 * 5 + 2 * 5 * 2
+
+
+def test_throttled_backend_backs_off_and_recovers(run_with_mock_server):
+    async def test(server, api_urls):
+        async with BreachChecker(backend='leakcheck', api_urls=api_urls, rate_limit=500, concurrency=20) as breach_checker:
+            results = [result async for result in breach_checker.iter_check(EMAILS[:100])]
+            limiter = breach_checker.backends[0].rate_limiter
+        return server, results, limiter
+
+    server, results, limiter = run_with_mock_server(test, throttle_rate=0.1, retry_after=0)
+
+    assert server.throttled > 0
+    assert limiter.throttled_count == server.throttled
+    assert all(result.get('total') is not None for result in results)
+
+
+def test_rate_limit_overrides(make_backend):
+    local = make_backend('local', 0)
+    local.local = True
+    remote = make_backend('remote', 0)
+
+    every_remote = BreachChecker(backend=[local, remote], rate_limit=5)
+    by_name = BreachChecker(backend=[local, remote], rate_limit={'local': 7})
+
+    assert [backend.rate_limiter.max_rate for backend in every_remote.backends] == [1_000_000, 5]
+    assert [backend.rate_limiter.max_rate for backend in by_name.backends] == [7, 1_000_000]
+
+
+def test_results_do_not_share_a_mutable_backends_default():
+    result = BreachResult(email='a@x.com', total=None)
+    with pytest.raises(TypeError):
+        result.backends['leakcheck'] = None
+    assert BreachResult(email='b@x.com', total=None).backends == {}
+
+
+def test_concurrent_runs_on_one_checker_do_not_share_duplicates(make_backend):
+    backend = make_backend('slow', 0.01)
+
+    async def main():
+        async with BreachChecker(backend=backend, concurrency=10) as breach_checker:
+            async def run(emails, start_delay):
+                await asyncio.sleep(start_delay)
+                return [result async for result in breach_checker.check_many(emails)]
+
+            first, second = await asyncio.gather(run(EMAILS[:200], 0), run(EMAILS[100:300], 0.05))
+            return first, second, breach_checker.deduplicator
+
+    first, second, deduplicator = asyncio.run(main())
+
+    assert sorted(result.email for result in first) == sorted(EMAILS[:200])
+    assert sorted(result.email for result in second) == sorted(EMAILS[100:300])
+    assert all(result.duplicate_of is None and result.is_conclusive for result in first + second)
+    assert (deduplicator.unique, deduplicator.duplicates) == (400, 0)
+
+
+def test_checks_outside_the_context_manager_close_their_session(run_with_mock_server):
+    async def test(server, api_urls):
+        breach_checker = BreachChecker(backend='leakcheck', api_urls=api_urls, rate_limit=1000)
+        single = await breach_checker.check_one('a@x.com')
+        after_single = breach_checker._http_client.is_open
+        concurrent = await asyncio.gather(*(breach_checker.check_one(email) for email in EMAILS[:20]))
+        return single, after_single, concurrent, breach_checker
+
+    single, after_single, concurrent, breach_checker = run_with_mock_server(test, latency=0.01)
+
+    assert single.is_conclusive
+    assert all(result.is_conclusive for result in concurrent)
+    assert not after_single
+    assert not breach_checker._http_client.is_open
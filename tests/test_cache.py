@@ -0,0 +1,107 @@
+import sqlite3
+from time import monotonic
+
+from breach_check.breach import BreachChecker
+from breach_check.cache import LookupCache
+
+
+BREACHED = {'email': 'a@x.com', 'breaches': [{'name': 'Site.com'}], 'total': 1}
+
+
+def test_processes_sharing_the_cache_file_do_not_lock_each_other(tmp_path):
+    file_path = str(tmp_path / 'lookups.sqlite3')
+    with LookupCache(file_path) as first, LookupCache(file_path, commit_every=1) as second:
+        for i in range(10):
+            first.set('leakcheck', f'user{i}@x.com', {'email': f'user{i}@x.com', 'total': 0})
+
+        started = monotonic()
+        second.set('leakcheck', 'a@x.com', BREACHED)
+        assert monotonic() - started < 0.5
+        assert second.errors == 0
+        # buffered writes are already answered by their own cache
+        assert first.get('leakcheck', 'user0@x.com') == {'email': 'user0@x.com', 'total': 0}
+
+    with LookupCache(file_path) as cache:
+        assert cache.get('leakcheck', 'a@x.com') == BREACHED
+        assert cache.get('leakcheck', 'user9@x.com') == {'email': 'user9@x.com', 'total': 0}
+
+
+def test_locked_database_skips_writes_without_raising(tmp_path):
+    file_path = str(tmp_path / 'lookups.sqlite3')
+    with LookupCache(file_path, commit_every=1, busy_timeout=0.05) as cache:
+        other = sqlite3.connect(file_path)
+        other.execute('BEGIN IMMEDIATE')
+        try:
+            started = monotonic()
+            cache.set('leakcheck', 'a@x.com', BREACHED)
+            assert monotonic() - started < 1
+            assert cache.errors == 1
+            # readers are not blocked by the writer
+            assert cache.get('leakcheck', 'a@x.com') is None
+        finally:
+            other.rollback()
+            other.close()
+
+        cache.set('leakcheck', 'a@x.com', BREACHED)
+        assert cache.get('leakcheck', 'a@x.com') == BREACHED
+
+
+def test_failing_lookups_are_cache_misses(tmp_path):
+    file_path = str(tmp_path / 'lookups.sqlite3')
+    with LookupCache(file_path) as cache:
+        other = sqlite3.connect(file_path)
+        other.execute('DROP TABLE lookups')
+        other.close()
+
+        assert cache.get('leakcheck', 'a@x.com') is None
+        assert (cache.misses, cache.errors) == (1, 1)
+
+
+def test_results_expire_after_their_ttl(tmp_path, monkeypatch):
+    clock = [1_000_000.0]
+    monkeypatch.setattr('breach_check.cache.time', lambda: clock[0])
+    clean = {'email': 'b@x.com', 'breaches': [], 'total': 0}
+
+    with LookupCache(str(tmp_path / 'lookups.sqlite3'), ttl=100, negative_ttl=10, commit_every=1) as cache:
+        cache.set('leakcheck', 'A@X.com', BREACHED)
+        cache.set('leakcheck', 'b@x.com', clean)
+        assert cache.get('leakcheck', 'a@x.com') == BREACHED
+        assert cache.get('hudsonrock', 'a@x.com') is None
+
+        clock[0] += 50
+        # negative results expire first
+        assert cache.get('leakcheck', 'b@x.com') is None
+        assert cache.get('leakcheck', 'a@x.com') == BREACHED
+
+        clock[0] += 100
+        assert cache.get('leakcheck', 'a@x.com') is None
+        assert cache.purge_expired() == 2
+        assert (cache.hits, cache.misses) == (2, 3)
+
+
+def test_inconclusive_results_are_not_cached_and_refresh_skips_reads(tmp_path):
+    file_path = str(tmp_path / 'lookups.sqlite3')
+    with LookupCache(file_path) as cache:
+        cache.set('leakcheck', 'a@x.com', {'email': 'a@x.com', 'total': None})
+        cache.set('leakcheck', 'b@x.com', {})
+        assert cache.get('leakcheck', 'a@x.com') is None
+        cache.set('leakcheck', 'a@x.com', BREACHED)
+
+    with LookupCache(file_path, refresh=True) as cache:
+        assert cache.get('leakcheck', 'a@x.com') is None
+
+    with LookupCache(file_path) as cache:
+        assert cache.get('leakcheck', 'a@x.com') == BREACHED
+
+
+def test_checker_answers_cached_lookups_without_requests(run_with_mock_server, tmp_path):
+    async def test(server, api_urls):
+        with LookupCache(str(tmp_path / 'lookups.sqlite3')) as cache:
+            for _ in range(2):
+                async with BreachChecker(backend='leakcheck', api_urls=api_urls, rate_limit=1000, cache=cache) as breach_checker:
+                    results = [result async for result in breach_checker.check_many(['a@x.com', 'b@x.com'])]
+        return server.requests, results
+
+    requests, results = run_with_mock_server(test)
+    assert requests == 2
+    assert all(result.is_conclusive for result in results)
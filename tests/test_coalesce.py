@@ -0,0 +1,109 @@
+import asyncio
+
+from breach_check.breach import BreachChecker
+from breach_check.coalesce import LookupCoalescer
+
+
+class CountingQuery:
+    def __init__(self, delay=0.05, total=1):
+        self.delay = delay
+        self.total = total
+        self.calls = 0
+        self.cancelled = 0
+
+    async def __call__(self):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return {'email': 'user@x.com', 'total': self.total}
+
+
+def test_concurrent_lookups_share_one_query():
+    async def main():
+        coalescer = LookupCoalescer()
+        query = CountingQuery()
+        results = await asyncio.gather(*(
+            coalescer.lookup('leakcheck', email, query)
+            for email in ['user@x.com', 'USER@x.com', 'user@x.com']
+        ))
+        # other backends are looked up separately
+        await coalescer.lookup('hudsonrock', 'user@x.com', query)
+        return query.calls, results
+
+    calls, results = asyncio.run(main())
+    assert calls == 2
+    assert all(result is results[0] for result in results)
+
+
+def test_recent_results_answer_later_lookups_until_they_expire():
+    async def main():
+        coalescer = LookupCoalescer(recent_size=10, recent_ttl=0.1)
+        query = CountingQuery(delay=0)
+        await coalescer.lookup('leakcheck', 'user@x.com', query)
+        await coalescer.lookup('leakcheck', 'user@x.com', query)
+        calls_before_expiry = query.calls
+        await asyncio.sleep(0.15)
+        await coalescer.lookup('leakcheck', 'user@x.com', query)
+        return calls_before_expiry, query.calls
+
+    assert asyncio.run(main()) == (1, 2)
+
+
+def test_inconclusive_results_are_not_kept():
+    async def main():
+        coalescer = LookupCoalescer(recent_size=10)
+        query = CountingQuery(delay=0, total=None)
+        await coalescer.lookup('leakcheck', 'user@x.com', query)
+        await coalescer.lookup('leakcheck', 'user@x.com', query)
+        return query.calls
+
+    assert asyncio.run(main()) == 2
+
+
+def test_query_survives_while_other_lookups_wait():
+    async def main():
+        coalescer = LookupCoalescer()
+        query = CountingQuery()
+        first = asyncio.create_task(coalescer.lookup('leakcheck', 'user@x.com', query))
+        second = asyncio.create_task(coalescer.lookup('leakcheck', 'user@x.com', query))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second, query.cancelled
+
+    result, cancelled = asyncio.run(main())
+    assert result['total'] == 1
+    assert cancelled == 0
+
+
+def test_query_is_cancelled_with_its_last_lookup():
+    async def main():
+        coalescer = LookupCoalescer()
+        query = CountingQuery()
+        lookup = asyncio.create_task(coalescer.lookup('leakcheck', 'user@x.com', query))
+        await asyncio.sleep(0.01)
+        lookup.cancel()
+        await asyncio.gather(lookup, return_exceptions=True)
+        cancelled = query.cancelled
+
+        # a new lookup sends a new query instead of joining the cancelled one
+        result = await coalescer.lookup('leakcheck', 'user@x.com', query)
+        return cancelled, query.calls, result
+
+    cancelled, calls, result = asyncio.run(main())
+    assert cancelled == 1
+    assert calls == 2
+    assert result['total'] == 1
+
+
+def test_concurrent_checks_send_one_request(run_with_mock_server):
+    async def test(server, api_urls):
+        async with BreachChecker(backend=['leakcheck', 'hudsonrock'], api_urls=api_urls, rate_limit=1000) as breach_checker:
+            results = await asyncio.gather(*(breach_checker.check('user@x.com') for _ in range(20)))
+        return server.requests, results
+
+    requests, results = run_with_mock_server(test, latency=0.05)
+    assert requests == 2
+    assert all(result == results[0] for result in results)
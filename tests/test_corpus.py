@@ -0,0 +1,72 @@
+import asyncio
+import gzip
+import os
+
+from breach_check.breach import BreachChecker
+from breach_check.corpus import CorpusIndex
+
+
+def write_dump(path, lines, mtime=None):
+    path.write_text('\n'.join(lines) + '\n')
+    if mtime:
+        os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+def lookup(corpus_file, emails):
+    with CorpusIndex(corpus_file) as corpus:
+        return corpus.lookup(emails)
+
+
+def test_index_formats_and_skip_unchanged_dumps(tmp_path):
+    corpus_file = str(tmp_path / 'corpus.sqlite3')
+    csv_dump = write_dump(tmp_path / 'acme.csv', ['id,email,name', '1,Alice@X.com,Alice', '2,bob@x.com,Bob'])
+    combo_dump = tmp_path / 'combo.txt.gz'
+    with gzip.open(combo_dump, 'wt') as f:
+        f.write('alice@x.com:hunter2\ncarol@x.com:secret\nnot a record\n')
+
+    with CorpusIndex(corpus_file, read_only=False) as corpus:
+        assert corpus.add_dump(csv_dump) == 2
+        assert corpus.add_dump(str(combo_dump)) == 2
+        assert corpus.add_dump(csv_dump) == 0
+
+    found = lookup(corpus_file, ['alice@x.com', 'BOB@x.com', 'dave@x.com'])
+    assert sorted(found['alice@x.com']) == ['acme', 'combo']
+    assert found['BOB@x.com'] == ['acme']
+    assert 'dave@x.com' not in found
+
+    # only digests are stored
+    with open(corpus_file, 'rb') as f:
+        assert b'alice' not in f.read()
+
+
+def test_reindexing_a_dump_removes_emails_that_left_it(tmp_path):
+    corpus_file = str(tmp_path / 'corpus.sqlite3')
+    first = write_dump(tmp_path / 'first.txt', ['alice@x.com', 'bob@x.com'], mtime=1_000_000)
+    second = write_dump(tmp_path / 'second.txt', ['bob@x.com', 'carol@x.com'])
+
+    with CorpusIndex(corpus_file, read_only=False) as corpus:
+        corpus.add_dump(first, source='acme')
+        corpus.add_dump(second, source='acme')
+        # bob left the first dump, alice moved to another source
+        write_dump(tmp_path / 'first.txt', ['dave@x.com'], mtime=2_000_000)
+        corpus.add_dump(first, source='acme')
+        write_dump(tmp_path / 'second.txt', ['bob@x.com', 'carol@x.com', 'alice@x.com'])
+        corpus.add_dump(second, source='other', reindex=True)
+
+    found = lookup(corpus_file, ['alice@x.com', 'bob@x.com', 'carol@x.com', 'dave@x.com'])
+    assert found == {'alice@x.com': ['other'], 'bob@x.com': ['other'], 'carol@x.com': ['other'], 'dave@x.com': ['acme']}
+
+
+def test_corpus_backend_checks_emails_offline(tmp_path):
+    corpus_file = str(tmp_path / 'corpus.sqlite3')
+    with CorpusIndex(corpus_file, read_only=False) as corpus:
+        corpus.add_dump(write_dump(tmp_path / 'acme.txt', ['alice@x.com']))
+
+    async def main():
+        async with BreachChecker(backend='corpus', api_urls={'corpus': corpus_file}) as breach_checker:
+            return [result async for result in breach_checker.check_many(['alice@x.com', 'bob@x.com'])]
+
+    results = {result.email: result for result in asyncio.run(main())}
+    assert results['alice@x.com'].breaches == ('acme',)
+    assert results['bob@x.com'].total == 0
@@ -0,0 +1,85 @@
+from breach_check.breach import BreachChecker
+from breach_check.dedupe import EmailDeduplicator
+
+
+def test_canonicalize_folds_configured_domains_only():
+    deduplicator = EmailDeduplicator(fold_plus_tags=['gmail.com'], fold_dots=['gmail.com'])
+
+    assert deduplicator.canonicalize(' John.Doe+news@GMail.com ') == 'johndoe@gmail.com'
+    assert deduplicator.canonicalize('john.doe+news@example.com') == 'john.doe+news@example.com'
+
+
+def test_fan_out_returns_result_for_every_pending_alias():
+    deduplicator = EmailDeduplicator()
+    assert deduplicator.track('user@x.com', 'user@x.com')
+    assert not deduplicator.track('user@x.com', 'USER@x.com')
+    assert deduplicator.is_pending('user@x.com')
+
+    result = {'email': 'user@x.com', 'total': 1}
+    fanned_out = deduplicator.fan_out('user@x.com', result)
+
+    assert fanned_out == [
+        ('user@x.com', result),
+        ('USER@x.com', {'email': 'USER@x.com', 'total': 1}),
+    ]
+    assert not deduplicator.is_pending('user@x.com')
+    assert deduplicator.unique == 1
+    assert deduplicator.duplicates == 1
+
+
+def test_late_duplicates_reuse_recent_results():
+    deduplicator = EmailDeduplicator()
+    deduplicator.track('user@x.com', 'user@x.com')
+    deduplicator.fan_out('user@x.com', {'email': 'user@x.com', 'total': 0})
+
+    assert not deduplicator.track('user@x.com', 'User@x.com')
+    assert deduplicator.resolve_duplicate('user@x.com', 'User@x.com') == {'email': 'User@x.com', 'total': 0}
+
+
+def test_late_duplicates_reference_forgotten_results():
+    deduplicator = EmailDeduplicator(recent_results=0)
+    deduplicator.track('user@x.com', 'user@x.com')
+    deduplicator.fan_out('user@x.com', {'email': 'user@x.com', 'total': 0})
+
+    assert not deduplicator.track('user@x.com', 'User@x.com')
+    assert deduplicator.resolve_duplicate('user@x.com', 'User@x.com') == {'email': 'User@x.com', 'duplicate_of': 'user@x.com'}
+
+
+def test_bloom_filter_detects_duplicates():
+    deduplicator = EmailDeduplicator(bloom_capacity=1000)
+    for i in range(500):
+        assert deduplicator.track(f'user{i}@x.com', f'user{i}@x.com')
+        deduplicator.fan_out(f'user{i}@x.com', {'email': f'user{i}@x.com', 'total': 0})
+
+    assert not deduplicator.track('user7@x.com', 'user7@x.com')
+    assert deduplicator.resolve_duplicate('user7@x.com', 'user7@x.com') == {'email': 'user7@x.com', 'total': 0}
+
+
+def test_bloom_filter_hits_without_known_result_are_checked():
+    # a filter this small reports nearly every address as seen
+    deduplicator = EmailDeduplicator(bloom_capacity=1, bloom_error_rate=0.5, recent_results=0)
+    for i in range(50):
+        assert deduplicator.track(f'user{i}@x.com', f'user{i}@x.com')
+        deduplicator.fan_out(f'user{i}@x.com', {'email': f'user{i}@x.com', 'total': 0})
+
+    assert deduplicator.unique == 50
+    assert deduplicator.duplicates == 0
+    assert deduplicator.rechecked > 0
+
+
+def test_duplicates_are_checked_once(run_with_mock_server):
+    emails = ['a@x.com', 'A@x.com', 'b@x.com', 'a+tag@x.com', 'a@x.com']
+
+    async def test(server, api_urls):
+        deduplicator = EmailDeduplicator(fold_plus_tags=['x.com'], recent_results=0)
+        async with BreachChecker(backend='leakcheck', api_urls=api_urls, rate_limit=1000, deduplicator=deduplicator) as breach_checker:
+            results = [result async for result in breach_checker.iter_check(emails)]
+        return server.requests, results
+
+    requests, results = run_with_mock_server(test)
+
+    assert requests == 2
+    assert sorted(result['email'] for result in results) == sorted(emails)
+    # every duplicate either shares the result of its pending address or references it
+    for result in results:
+        assert 'total' in result or result['duplicate_of'] == 'a@x.com'
@@ -0,0 +1,117 @@
+import asyncio
+import json
+
+import pytest
+from aiohttp import ClientSession
+
+from breach_check.breach_factory import registry
+from breach_check.distributed import TOKEN_HEADER, Coordinator, is_loopback, run_node
+from breach_check.results import NdjsonResultWriter
+from breach_check.workers import CheckerConfig
+
+
+@pytest.mark.parametrize('host, expected', [
+    ('localhost', True), ('127.0.0.1', True), ('::1', True), ('[::1]', True),
+    ('0.0.0.0', False), ('10.0.0.2', False), ('coordinator.example.com', False),
+])
+def test_is_loopback(host, expected):
+    assert is_loopback(host) is expected
+
+
+def test_coordinator_checks_the_token(tmp_path, unused_port):
+    async def main():
+        with NdjsonResultWriter(str(tmp_path / 'out.ndjson')) as writer:
+            coordinator = Coordinator(['a@x.com'], writer, token='secret', show_progress=False)
+            await coordinator.start(port=unused_port)
+            try:
+                async with ClientSession() as session:
+                    statuses = []
+                    for headers in ({}, {TOKEN_HEADER: 'guess'}, {TOKEN_HEADER: 'secret'}):
+                        async with session.get(f'http://127.0.0.1:{unused_port}/config', headers=headers) as response:
+                            statuses.append(response.status)
+                    return statuses
+            finally:
+                await coordinator.stop()
+
+    assert asyncio.run(main()) == [403, 403, 200]
+
+
+def test_coordinator_without_token_only_binds_loopback(tmp_path, unused_port):
+    async def main():
+        with NdjsonResultWriter(str(tmp_path / 'out.ndjson')) as writer:
+            coordinator = Coordinator([], writer, show_progress=False)
+            with pytest.raises(ValueError):
+                await coordinator.start(host='0.0.0.0', port=unused_port)
+
+    asyncio.run(main())
+
+
+def test_node_checks_every_lease_and_closes_its_checker(tmp_path, monkeypatch, make_backend, unused_port):
+    closing_backend = make_backend('closing', 0.001)
+    monkeypatch.setitem(registry._registry(), 'closing', closing_backend)
+    emails = [f'user{i}@x.com' for i in range(50)]
+    output = tmp_path / 'out.ndjson'
+
+    async def main():
+        with NdjsonResultWriter(str(output)) as writer:
+            coordinator = Coordinator(emails, writer, checker_options={'backend': ['closing']}, batch_size=7, token='secret', show_progress=False)
+            await coordinator.start(port=unused_port)
+            try:
+                node = await run_node(f'http://127.0.0.1:{unused_port}', CheckerConfig(), token='secret')
+            finally:
+                await coordinator.stop()
+            return node
+
+    node = asyncio.run(main())
+
+    assert sorted(json.loads(line)['email'] for line in output.read_text().splitlines()) == sorted(emails)
+    assert not node._http_client.is_open
+    assert closing_backend.closed == 1
+
+
+def test_expired_leases_are_reassigned_and_the_first_ack_wins(tmp_path, unused_port):
+    output = tmp_path / 'out.ndjson'
+    url = f'http://127.0.0.1:{unused_port}'
+
+    def result(email, worker):
+        return {'email': email, 'breaches': [{'name': worker}], 'fields': [], 'total': 1}
+
+    async def main():
+        with NdjsonResultWriter(str(output)) as writer:
+            coordinator = Coordinator(['a@x.com', 'b@x.com', 'c@x.com', 'A@x.com'], writer, batch_size=2, lease_timeout=0.5, token='secret', show_progress=False)
+            await coordinator.start(port=unused_port)
+            try:
+                async with ClientSession(headers={TOKEN_HEADER: 'secret'}) as session:
+                    async def post(path, **body):
+                        async with session.post(url + path, json=body) as response:
+                            return response.status, await response.json()
+
+                    _, stalled = await post('/lease', worker='stalled')
+                    _, renewing = await post('/lease', worker='renewing')
+                    assert (stalled['emails'], renewing['emails']) == (['a@x.com', 'b@x.com'], ['c@x.com'])
+                    assert renewing['rate_share'] == 0.5
+
+                    await asyncio.sleep(0.3)
+                    assert (await post('/renew', lease_id=renewing['lease_id']))[1]['ok']
+                    await asyncio.sleep(0.3)
+
+                    # only the lease which was not renewed expired
+                    _, reassigned = await post('/lease', worker='late')
+                    assert reassigned['batch_id'] == stalled['batch_id'] and reassigned['emails'] == stalled['emails']
+                    assert not (await post('/renew', lease_id=stalled['lease_id']))[1]['ok']
+
+                    assert (await post('/ack', lease_id=reassigned['lease_id'], batch_id=reassigned['batch_id'], results=[]))[0] == 400
+                    acks = [
+                        await post('/ack', lease_id=lease['lease_id'], batch_id=lease['batch_id'], results=[result(email, worker) for email in lease['emails']])
+                        for lease, worker in ((reassigned, 'late'), (stalled, 'stalled'), (renewing, 'renewing'))
+                    ]
+                    assert [body['ok'] for _, body in acks] == [True, False, True]
+                    assert (await post('/lease', worker='late'))[1] == {'done': True}
+                    assert coordinator.finished.is_set()
+            finally:
+                await coordinator.stop()
+
+    asyncio.run(main())
+
+    results = {row['email']: row['breaches'][0]['name'] for row in map(json.loads, output.read_text().splitlines())}
+    assert results == {'a@x.com': 'late', 'A@x.com': 'late', 'b@x.com': 'late', 'c@x.com': 'renewing'}
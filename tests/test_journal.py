@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+import pytest
+
+from breach_check.cli import check_and_write
+from breach_check.journal import Journal
+from breach_check.results import OutputFormat, Results
+
+
+def test_only_checkpointed_records_are_completed(tmp_path):
+    journal_file = str(tmp_path / 'run.journal')
+    journal = Journal(journal_file)
+    journal.open(metadata={'output_file': 'out.json'}, output_offset=1)
+    journal.record({'email': 'a@x.com', 'total': 0})
+    journal.record({'email': 'b@x.com', 'total': None})
+    journal.sync(output_offset=42)
+    journal.record({'email': 'c@x.com', 'total': 1})
+    # written without a checkpoint, as if the run crashed before the output was synced
+    journal._file.write('{"email": "c@x.com", "total": 1}\n')
+    journal._file.flush()
+
+    resumed = Journal(journal_file)
+    assert resumed.load()
+    assert resumed.metadata == {'output_file': 'out.json'}
+    assert resumed.completed == {'a@x.com'}
+    assert resumed.output_offset == 42
+    assert list(resumed.filter_pending(['a@x.com', 'b@x.com', 'c@x.com'])) == ['b@x.com', 'c@x.com']
+
+    # records after the last checkpoint are dropped so they are not counted on the next resume
+    resumed.open()
+    resumed.close()
+    reloaded = Journal(journal_file)
+    assert reloaded.load()
+    assert reloaded.completed == {'a@x.com'}
+    with open(journal_file) as f:
+        assert 'c@x.com' not in f.read()
+
+
+def test_journal_without_checkpoints_loads_every_record(tmp_path):
+    journal_file = tmp_path / 'run.journal'
+    journal_file.write_text('{"output_file": "out.json"}\n{"email": "a@x.com", "total": 0}\n{"email": "b@x.c')
+
+    journal = Journal(str(journal_file))
+    assert journal.load()
+    assert journal.completed == {'a@x.com'}
+    assert journal.output_offset is None
+
+
+class CrashingChecker:
+    """Yields results, then crashes the run like a killed process"""
+
+    def __init__(self, emails, crash_after):
+        self.emails = emails
+        self.crash_after = crash_after
+
+    async def iter_check(self, emails):
+        for email in self.emails[:self.crash_after]:
+            yield {'email': email, 'total': 0}
+        raise KeyboardInterrupt
+
+
+@pytest.mark.parametrize('output_format', list(OutputFormat))
+def test_resume_after_crash_right_after_a_sync(tmp_path, output_format):
+    emails = [f'u{i}@x.com' for i in range(5)]
+    output_file = str(tmp_path / f'out.{output_format.value}')
+    journal_file = str(tmp_path / 'run.journal')
+
+    journal = Journal(journal_file)
+    writer = Results.open_writer(output_file, output_format)
+    writer.flush_every = 2
+    writer.open()
+    journal.open(metadata={}, output_offset=writer.offset)
+    writer.sync_callbacks.append(lambda: journal.sync(output_offset=writer.offset))
+    with pytest.raises(KeyboardInterrupt):
+        # the second result makes the writer sync, then the run dies
+        asyncio.run(check_and_write(CrashingChecker(emails, crash_after=2), emails, writer, journal))
+    # nothing else reaches the disk
+    writer._file.close()
+    journal._file.close()
+
+    resumed = Journal(journal_file)
+    assert resumed.load()
+    with Results.open_writer(output_file, output_format, append=True, resume_offset=resumed.output_offset) as writer:
+        for email in resumed.filter_pending(emails):
+            writer.write({'email': email, 'total': 0})
+
+    with open(output_file) as f:
+        records = json.load(f) if output_format == OutputFormat.JSON else [json.loads(line) for line in f]
+    assert resumed.completed == {'u0@x.com', 'u1@x.com'}
+    assert [record['email'] for record in records] == emails
@@ -0,0 +1,66 @@
+import asyncio
+import importlib
+import json
+import sys
+
+import pytest
+
+from breach_check import utils
+from breach_check.breach_factory.leakcheck import LeakCheck
+from breach_check.http import AsyncRequests
+
+
+@pytest.fixture
+def reload_utils(monkeypatch):
+    def reload(*blocked):
+        for module in blocked:
+            # a None entry makes the import fail as if the package was not installed
+            monkeypatch.setitem(sys.modules, module, None)
+        return importlib.reload(utils)
+
+    yield reload
+    monkeypatch.undo()
+    importlib.reload(utils)
+
+
+def test_falls_back_to_the_stdlib_parser(reload_utils):
+    fallback = reload_utils('orjson', 'msgspec', 'msgspec.json')
+
+    assert fallback.JSON_LIBRARY == 'json'
+    assert fallback.json_loads(b'{"found": 1, "sources": [{"name": "Site.com"}]}') == {'found': 1, 'sources': [{'name': 'Site.com'}]}
+
+
+def test_every_available_parser_accepts_bytes_and_str():
+    document = {'email': 'a@x.com', 'total': 2, 'breaches': [{'name': 'Site.com', 'date': '2020-01'}]}
+    raw = json.dumps(document)
+
+    assert utils.json_loads(raw.encode()) == document
+    assert utils.json_loads(raw) == document
+
+
+class StubClient:
+    def __init__(self, status, body):
+        self.response = {'status': status, 'res_body': body}
+
+    async def request(self, **kwargs):
+        return self.response
+
+
+@pytest.mark.parametrize('status, body, total', [
+    (200, b'{"success": true, "found": 2, "sources": [{"name": "A.com"}, {"name": "B.com"}], "fields": ["password"]}', 2),
+    (200, b'{"success": false, "error": "Not found"}', 0),
+    (500, b'', None),
+])
+def test_backends_parse_raw_response_bodies(status, body, total):
+    result = asyncio.run(LeakCheck(StubClient(status, body)).check_email_breaches('a@x.com'))
+    assert result['total'] == total
+
+
+def test_responses_only_carry_details_when_debugging(run_with_mock_server):
+    async def test(server, api_urls):
+        async with AsyncRequests(rate_limit=None) as http_client:
+            return await http_client.request(api_urls['leakcheck'], params={'check': 'a@x.com'})
+
+    response = run_with_mock_server(test)
+    assert set(response) == {'status', 'res_body'}
+    assert isinstance(response['res_body'], bytes)
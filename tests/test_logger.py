@@ -0,0 +1,43 @@
+import json
+import logging
+
+import pytest
+
+from breach_check.logger import LogFormat, configure_logging, logger, stop_logging
+
+
+@pytest.fixture
+def restore_logger():
+    handlers, propagate, level = logger.handlers, logger.propagate, logger.level
+    yield
+    stop_logging()
+    logger.handlers, logger.propagate = handlers, propagate
+    logger.setLevel(level)
+
+
+def test_json_lines_keep_the_exception(capsys, restore_logger):
+    configure_logging(verbosity=0, log_format=LogFormat.JSON)
+    args = {'email': 'a@x.com'}
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        logger.exception('Check failed for %(email)s', args)
+    # arguments are merged when the record is queued
+    args['email'] = 'b@x.com'
+    logger.debug('not shown at the default verbosity')
+    stop_logging()
+
+    lines = [json.loads(line) for line in capsys.readouterr().err.splitlines()]
+    assert len(lines) == 1
+    assert lines[0]['level'] == 'error'
+    assert lines[0]['message'] == 'Check failed for a@x.com'
+    assert 'ZeroDivisionError' in lines[0]['exception']
+    # the traceback is only in its own field
+    assert 'Traceback' not in lines[0]['message']
+
+
+def test_verbosity_levels(restore_logger):
+    configure_logging(verbosity=1, log_format=LogFormat.JSON)
+    assert logger.level == logging.DEBUG
+    configure_logging(verbosity=-2, log_format=LogFormat.JSON)
+    assert logger.level == logging.ERROR
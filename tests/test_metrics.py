@@ -0,0 +1,71 @@
+import asyncio
+import pickle
+
+from aiohttp import ClientSession
+
+from breach_check.metrics import Histogram, Metrics
+
+
+def test_counters_gauges_and_label_sets():
+    registry = Metrics()
+    registry.inc('checks_total', backend='leakcheck', outcome='clean')
+    registry.inc('checks_total', 2, outcome='breached', backend='leakcheck')
+    registry.inc('checks_total', backend='hudsonrock', outcome='clean')
+    registry.set('rate_limit', 5, backend='leakcheck')
+
+    # labels are matched regardless of their order
+    assert registry.get('checks_total', outcome='breached', backend='leakcheck') == 2
+    assert registry.total('checks_total') == 4
+    assert registry.total('checks_total', backend='leakcheck') == 3
+    assert registry.get('rate_limit', backend='leakcheck') == 5
+    assert registry.get('missing') == 0
+
+
+def test_histogram_quantiles_are_bucket_upper_bounds():
+    histogram = Histogram(buckets=(0.1, 1))
+    for value in (0.05, 0.05, 0.5, 5):
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.75) == 1
+    assert histogram.quantile(1) == float('inf')
+    assert Histogram().quantile(0.5) == 0.0
+
+
+def test_worker_snapshots_are_merged():
+    parent, worker = Metrics(), Metrics()
+    parent.inc('requests_total', backend='leakcheck')
+    worker.inc('requests_total', 3, backend='leakcheck')
+    worker.observe('request_seconds', 0.02, backend='leakcheck')
+
+    # snapshots cross process boundaries
+    parent.update(pickle.loads(pickle.dumps(worker.snapshot())))
+    worker.inc('requests_total', backend='leakcheck')
+
+    assert parent.get('requests_total', backend='leakcheck') == 4
+    assert parent._histograms['request_seconds'][(('backend', 'leakcheck'),)].count == 1
+
+
+def test_prometheus_exposition_and_server(unused_port):
+    registry = Metrics()
+    registry.inc('checks_total', backend='say "hi"')
+    with registry.time('request_seconds', backend='leakcheck'):
+        pass
+
+    text = registry.render_prometheus()
+    assert '# TYPE breach_check_checks_total counter' in text
+    assert 'breach_check_checks_total{backend="say \\"hi\\""} 1' in text
+    assert 'breach_check_request_seconds_bucket{backend="leakcheck",le="+Inf"} 1' in text
+    assert 'breach_check_request_seconds_count{backend="leakcheck"} 1' in text
+
+    async def main():
+        await registry.start_server(port=unused_port)
+        try:
+            async with ClientSession() as session:
+                async with session.get(f'http://127.0.0.1:{unused_port}/metrics') as response:
+                    return await response.text()
+        finally:
+            await registry.stop_server()
+
+    assert asyncio.run(main()) == registry.render_prometheus()
@@ -0,0 +1,59 @@
+import sys
+
+import pytest
+
+from breach_check.metrics import metrics
+from breach_check.progress import RunProgress
+
+
+@pytest.fixture
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+class StubProgress:
+    def __init__(self):
+        self.updates = []
+
+    def update(self, task_id, **fields):
+        self.updates.append(fields)
+
+    def stop(self):
+        pass
+
+
+def test_updates_are_batched_by_interval(monkeypatch, clean_metrics):
+    clock = [100.0]
+    monkeypatch.setattr('breach_check.progress.monotonic', lambda: clock[0])
+    progress = RunProgress(update_interval=1)
+    progress.start(total=1000)
+    progress.progress.stop()
+    progress.progress = StubProgress()
+
+    for _ in range(500):
+        progress.advance()
+    clock[0] += 1
+    progress.advance()
+    # the completed count reaches the bar once per interval
+    assert [update['completed'] for update in progress.progress.updates] == [501]
+    assert progress.progress.updates[0]['throughput'] == 501
+
+    metrics.inc('checks_total', 3, outcome='clean')
+    metrics.inc('checks_total', outcome='inconclusive')
+    progress.advance()
+    progress.stop()
+    assert progress.progress.updates[-1]['completed'] == 502
+    assert progress.progress.updates[-1]['error_rate'] == 0.25
+
+
+def test_headless_progress_never_imports_rich(monkeypatch):
+    monkeypatch.delitem(sys.modules, 'rich.progress', raising=False)
+    progress = RunProgress(enabled=False)
+    progress.start(total=10)
+    progress.advance(10)
+    progress.stop()
+
+    assert progress.progress is None
+    assert 'rich.progress' not in sys.modules
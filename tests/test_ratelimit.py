@@ -0,0 +1,80 @@
+import asyncio
+from time import monotonic
+
+from breach_check.ratelimit import AdaptiveRateLimiter, RateLimit
+
+
+def test_throttled_response_halves_rate_once_per_period():
+    limiter = AdaptiveRateLimiter(max_rate=100, time_period=1)
+
+    limiter.on_throttled()
+    assert limiter.rate == 50
+    # 429s of requests sent before the back off do not cut the rate again
+    limiter.on_throttled()
+    assert limiter.rate == 50
+    assert limiter.throttled_count == 2
+
+
+def test_back_off_stops_at_min_rate():
+    limiter = AdaptiveRateLimiter(max_rate=100, time_period=1, min_rate=30)
+
+    for _ in range(5):
+        limiter._last_decrease = float('-inf')
+        limiter.on_throttled()
+
+    assert limiter.rate == 30
+
+
+def test_healthy_windows_ramp_rate_back_up_to_max():
+    limiter = AdaptiveRateLimiter(max_rate=100, time_period=1, increase_step=20)
+    limiter.on_throttled()
+    assert limiter.rate == 50
+
+    # one step per full window of healthy responses
+    for _ in range(49):
+        limiter.on_success()
+    assert limiter.rate == 50
+    limiter.on_success()
+    assert limiter.rate == 70
+
+    for _ in range(1000):
+        limiter.on_success()
+    assert limiter.rate == 100
+
+
+def test_retry_after_pauses_acquisitions():
+    async def main():
+        limiter = AdaptiveRateLimiter(max_rate=1000, time_period=1)
+        limiter.on_throttled(retry_after=0.2)
+
+        start = monotonic()
+        await limiter.acquire()
+        return monotonic() - start
+
+    assert asyncio.run(main()) >= 0.19
+
+
+def test_acquire_spaces_requests_at_current_rate():
+    async def main():
+        limiter = AdaptiveRateLimiter(max_rate=20, time_period=1)
+        # spend the initial burst
+        for _ in range(20):
+            await limiter.acquire()
+
+        start = monotonic()
+        for _ in range(5):
+            await limiter.acquire()
+        return monotonic() - start
+
+    assert asyncio.run(main()) >= 0.2
+
+
+def test_set_max_rate_scales_current_rate():
+    limiter = AdaptiveRateLimiter.from_rate_limit(RateLimit(max_rate=100, time_period=1))
+    limiter.on_throttled()
+
+    limiter.set_max_rate(50)
+
+    assert limiter.max_rate == 50
+    assert limiter.rate == 25
+    assert limiter.min_rate == 5
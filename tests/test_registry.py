@@ -0,0 +1,20 @@
+import logging
+from importlib.metadata import EntryPoint
+
+from breach_check.breach_factory import registry
+from breach_check.breach_factory.corpus import LocalCorpus
+
+
+def test_entry_points_cannot_shadow_bundled_backends(monkeypatch, caplog):
+    plugins = [
+        EntryPoint('corpus', 'my_package.corpus:CorpusBackend', registry.ENTRY_POINT_GROUP),
+        EntryPoint('mybackend', 'my_package.backend:MyBackend', registry.ENTRY_POINT_GROUP),
+    ]
+    monkeypatch.setattr(registry, 'entry_points', lambda group: plugins)
+    monkeypatch.setattr(registry, '_backends', None)
+    monkeypatch.setattr(registry, '_shadowed', {})
+
+    assert registry.available_backends() == ['leakcheck', 'hudsonrock', 'corpus', 'mybackend']
+    with caplog.at_level(logging.WARNING, logger='breach-check'):
+        assert registry.load_backend('corpus') is LocalCorpus
+    assert 'my_package.corpus:CorpusBackend' in caplog.text
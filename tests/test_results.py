@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from breach_check.results import JsonArrayResultWriter, NdjsonResultWriter, OutputFormat, Results
+
+
+def read_ndjson(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def write_records(writer_class, path, emails, **kwargs):
+    with writer_class(str(path), **kwargs) as writer:
+        for email in emails:
+            writer.write({'email': email, 'total': 0})
+
+
+def test_json_array_append_reopens_closed_array(tmp_path):
+    output = tmp_path / 'out.json'
+    write_records(JsonArrayResultWriter, output, ['a@x.com', 'b@x.com'])
+    write_records(JsonArrayResultWriter, output, ['c@x.com'], append=True)
+
+    assert [record['email'] for record in json.loads(output.read_text())] == ['a@x.com', 'b@x.com', 'c@x.com']
+
+
+def test_json_array_append_to_unterminated_array(tmp_path):
+    output = tmp_path / 'out.json'
+    # interrupted run, the closing bracket was never written
+    output.write_text('[{"email": "a@x.com", "total": 0}, {"email": "b@x.com", "total": 0}\n')
+    write_records(JsonArrayResultWriter, output, ['c@x.com'], append=True)
+
+    assert [record['email'] for record in json.loads(output.read_text())] == ['a@x.com', 'b@x.com', 'c@x.com']
+
+
+def test_json_array_append_to_empty_array(tmp_path):
+    output = tmp_path / 'out.json'
+    write_records(JsonArrayResultWriter, output, [])
+    write_records(JsonArrayResultWriter, output, ['a@x.com'], append=True)
+
+    assert [record['email'] for record in json.loads(output.read_text())] == ['a@x.com']
+
+
+def test_ndjson_append_drops_partial_last_record(tmp_path):
+    output = tmp_path / 'out.ndjson'
+    output.write_text('{"email": "a@x.com", "total": 0}\n{"email": "b@x.c')
+    write_records(NdjsonResultWriter, output, ['b@x.com'], append=True)
+
+    assert [record['email'] for record in read_ndjson(output)] == ['a@x.com', 'b@x.com']
+
+
+@pytest.mark.parametrize('output_format', list(OutputFormat))
+def test_resume_offset_truncates_records_written_after_checkpoint(tmp_path, output_format):
+    output = tmp_path / f'out.{output_format.value}'
+    with Results.open_writer(str(output), output_format) as writer:
+        writer.write({'email': 'a@x.com', 'total': 0})
+        writer.sync()
+        checkpoint = writer.offset
+        # flushed by the write buffer but never journaled, then cut off by a crash
+        writer.write({'email': 'b@x.com', 'total': 0})
+        writer.sync()
+        writer._file.write('{"email": "c@x.com", "tot')
+        writer._file.flush()
+        writer._file.close()
+        writer._file = None
+
+    with Results.open_writer(str(output), output_format, append=True, resume_offset=checkpoint) as writer:
+        writer.write({'email': 'b@x.com', 'total': 0})
+
+    records = json.loads(output.read_text()) if output_format == OutputFormat.JSON else read_ndjson(output)
+    assert [record['email'] for record in records] == ['a@x.com', 'b@x.com']
+
+
+def test_transform_rewrites_and_skips_records(tmp_path):
+    output = tmp_path / 'out.ndjson'
+    with NdjsonResultWriter(str(output)) as writer:
+        writer.transform = lambda result: result if result['total'] else None
+        writer.write({'email': 'a@x.com', 'total': 0})
+        writer.write({'email': 'b@x.com', 'total': 2})
+
+    assert read_ndjson(output) == [{'email': 'b@x.com', 'total': 2}]
+    assert writer.records_written == 1
@@ -0,0 +1,88 @@
+import asyncio
+from concurrent.futures import Future
+
+from aiohttp import ClientConnectionError
+
+from breach_check.breach import BreachChecker
+from breach_check.retry import RetryableStatusError, RetryPolicy
+
+
+def run_with_retries(policy, failures, exception):
+    calls = 0
+
+    async def request():
+        nonlocal calls
+        calls += 1
+        if calls <= failures:
+            raise exception
+        return 'ok'
+
+    async def main():
+        policy.requests += 1
+        async for attempt in policy.retrying():
+            with attempt:
+                return await request()
+
+    try:
+        return asyncio.run(main()), calls
+    except Exception as e:
+        return e, calls
+
+
+def test_network_errors_and_retryable_statuses_are_retried():
+    policy = RetryPolicy(max_attempts=3, backoff_base=0)
+
+    assert run_with_retries(policy, 2, ClientConnectionError()) == ('ok', 3)
+    assert run_with_retries(policy, 1, RetryableStatusError({'status': 503})) == ('ok', 2)
+    assert policy.retries == 3
+
+
+def test_attempts_are_bounded_and_other_errors_are_raised_at_once():
+    policy = RetryPolicy(max_attempts=3, backoff_base=0)
+
+    error, calls = run_with_retries(policy, 5, ClientConnectionError())
+    assert isinstance(error, ClientConnectionError) and calls == 3
+
+    error, calls = run_with_retries(policy, 5, ValueError())
+    assert isinstance(error, ValueError) and calls == 1
+
+
+def test_retry_budget_caps_retries_of_the_run():
+    policy = RetryPolicy(max_attempts=10, backoff_base=0, retry_budget_ratio=0, min_retry_budget=4)
+
+    for _ in range(3):
+        run_with_retries(policy, 5, ClientConnectionError())
+
+    assert policy.retries == 4
+    assert policy.exhausted_budget == 3
+
+
+def test_backoff_is_jittered_and_respects_retry_after():
+    policy = RetryPolicy(backoff_base=1, backoff_max=4)
+
+    class State:
+        def __init__(self, attempt_number, exception):
+            self.attempt_number = attempt_number
+            self.outcome = Future()
+            self.outcome.set_exception(exception)
+
+    delays = [policy._wait(State(attempt, ClientConnectionError())) for attempt in range(1, 6) for _ in range(50)]
+    assert 0 <= min(delays) and max(delays) <= 4
+    assert policy._wait(State(1, RetryableStatusError({}, retry_after=3))) >= 3
+    # Retry-After never exceeds the longest backoff
+    assert policy._wait(State(1, RetryableStatusError({}, retry_after=60))) <= 4
+    assert not policy.is_retryable_status(429)
+
+
+def test_server_errors_are_retried_by_the_checker(run_with_mock_server):
+    async def test(server, api_urls):
+        retry_policy = RetryPolicy(max_attempts=10, backoff_base=0.001, min_retry_budget=1000)
+        async with BreachChecker(backend='leakcheck', api_urls=api_urls, rate_limit=1000, retry_policy=retry_policy) as breach_checker:
+            results = [result async for result in breach_checker.check_many([f'user{i}@x.com' for i in range(50)])]
+        return server, retry_policy, results
+
+    server, retry_policy, results = run_with_mock_server(test, error_rate=0.2)
+
+    assert server.errors > 0
+    assert retry_policy.retries == server.errors
+    assert all(result.is_conclusive for result in results)
@@ -0,0 +1,41 @@
+from breach_check.breach_factory.base import ResultSchema
+from breach_check.summary import BreachSummary, TopCounter
+
+
+def breached(email, *sources):
+    return ResultSchema(email=email, breaches=sources, total=len(sources))
+
+
+def test_summary_counts_sources_domains_and_keeps_first_rows():
+    summary = BreachSummary(max_rows=2)
+    summary.add(breached('a@x.com', 'Site1.com', 'Site1.com'))
+    summary.add(breached('b@y.com', 'Site1.com', 'Site2.com'))
+    summary.add(breached('c@x.com', 'Site2.com'))
+
+    assert (summary.breached_emails, summary.total_breaches) == (3, 5)
+    # a source is counted once per email
+    assert summary.sources.most_common() == [('Site1.com', 2), ('Site2.com', 2)]
+    assert summary.domains.most_common(1) == [('x.com', 2)]
+    assert [row.email for row in summary.rows] == ['a@x.com', 'b@y.com']
+
+
+def test_top_counter_memory_is_bounded():
+    counter = TopCounter(capacity=10)
+    for i in range(1000):
+        counter.add('popular')
+        counter.add(f'rare{i}')
+
+    assert len(counter.counts) <= 20
+    assert counter.most_common(1) == [('popular', 1000)]
+
+
+def test_merged_summaries():
+    first, second = BreachSummary(max_rows=2), BreachSummary(max_rows=2)
+    first.add(breached('a@x.com', 'Site1.com'))
+    second.add(breached('b@x.com', 'Site1.com'))
+    second.add(breached('c@x.com', 'Site2.com'))
+
+    summary = BreachSummary.merged([first, second], max_rows=2)
+    assert summary.breached_emails == 3
+    assert summary.sources.most_common(1) == [('Site1.com', 2)]
+    assert [row.email for row in summary.rows] == ['a@x.com', 'b@x.com']
@@ -0,0 +1,47 @@
+import bz2
+import gzip
+import io
+import lzma
+
+import pytest
+
+from breach_check import utils
+from breach_check.utils import iter_emails, normalize_email
+
+
+LINES = '# exported list\nAlice@Example.COM\n\n  bob@x.com  \n'
+EMAILS = ['Alice@example.com', 'bob@x.com']
+
+
+def test_normalize_email_lowercases_the_domain_only():
+    assert normalize_email(' John.Doe@GMail.com\n') == 'John.Doe@gmail.com'
+    assert normalize_email('# comment') is None
+    assert normalize_email('   ') is None
+
+
+@pytest.mark.parametrize('compress', [lambda data: data, gzip.compress, bz2.compress, lzma.compress])
+def test_compressed_inputs_are_detected_by_their_magic_bytes(tmp_path, compress):
+    # the file name never tells the format
+    path = tmp_path / 'emails.txt'
+    path.write_bytes(compress(LINES.encode()))
+
+    assert list(iter_emails(str(path))) == EMAILS
+
+
+def test_stdin_is_streamed_lazily(monkeypatch):
+    data = ''.join(f'user{i}@X.com\n' for i in range(100000)).encode()
+
+    class Stdin:
+        buffer = io.BytesIO(gzip.compress(data, compresslevel=1))
+
+    monkeypatch.setattr(utils, 'stdin', Stdin)
+    emails = iter_emails('-')
+
+    assert next(emails) == 'user0@x.com'
+    # only a chunk of the input was read so far
+    assert Stdin.buffer.tell() < len(Stdin.buffer.getvalue())
+    assert sum(1 for _ in emails) == 99999
+
+
+def test_missing_input_file(tmp_path):
+    assert iter_emails(str(tmp_path / 'missing.txt')) is None
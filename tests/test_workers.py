@@ -0,0 +1,50 @@
+import asyncio
+
+from breach_check.corpus import CorpusIndex
+from breach_check.dedupe import EmailDeduplicator
+from breach_check.workers import CheckerConfig, ShardedBreachChecker, shard_index
+
+
+def test_shard_index_is_stable_and_spreads_emails():
+    emails = [f'user{i}@x.com' for i in range(1000)]
+    shards = [shard_index(email, 4) for email in emails]
+
+    assert shards == [shard_index(email, 4) for email in emails]
+    assert all(150 < shards.count(worker_id) < 350 for worker_id in range(4))
+
+
+def test_workers_check_every_unique_email_once(tmp_path):
+    corpus_file = str(tmp_path / 'corpus.sqlite3')
+    dump = tmp_path / 'acme.txt'
+    dump.write_text('user0@x.com\nuser7@x.com\n')
+    with CorpusIndex(corpus_file, read_only=False) as corpus:
+        corpus.add_dump(str(dump))
+
+    emails = [f'user{i}@x.com' for i in range(40)]
+    # the same addresses again, differing only by case, must reach the same worker
+    duplicates = [email.upper() for email in emails[:10]]
+    sharded = ShardedBreachChecker(
+        workers=2,
+        config=CheckerConfig(checker_options={'backend': 'corpus', 'api_urls': {'corpus': corpus_file}}),
+        show_progress=False,
+        batch_size=8,
+    )
+
+    async def main():
+        return [result async for result in sharded.iter_check(emails + ['not an email'] + duplicates)]
+
+    results = [result for result in asyncio.run(main()) if result]
+    assert sorted(result['email'] for result in results) == sorted(emails + duplicates)
+    assert {result['email'] for result in results if result['total']} == {'user0@x.com', 'user7@x.com', 'USER0@X.COM', 'USER7@X.COM'}
+    assert sharded.stats['unique'] == 40
+    assert sharded.stats['duplicates'] == 10
+    assert sharded.stats['invalid'] == 1
+    assert sharded.summary.breached_emails == 2
+
+
+def test_shards_follow_the_canonical_email():
+    deduplicator = EmailDeduplicator(fold_plus_tags=['gmail.com'], fold_dots=['gmail.com'])
+    canonical = deduplicator.canonicalize('john.doe+news@gmail.com')
+
+    assert canonical == deduplicator.canonicalize('JohnDoe@gmail.com')
+    assert shard_index(canonical, 3) == shard_index(deduplicator.canonicalize('johndoe+x@gmail.com'), 3)